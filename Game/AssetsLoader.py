@@ -1,5 +1,20 @@
 """
-This modules has all the image assets for use in other files 
+This modules has all the image assets for use in other files
+
+The twelve pieces are packed into a single texture atlas, one column per piece
+type and one row per side, every piece being a subsurface of it. The surfaces
+are converted to the pixel format of the display so a blit does not have to
+convert them, and the board is put on black once so it is opaque.
+
+Nothing is loaded at import. The assets of a square size are made the first time
+they are asked for, which needs the display mode to be set, and the assets of the
+sizes used last are kept in memory, so resizing the window back and forth does not
+scale the images again. Decoding the large PNGs is most of the startup time, so
+the scaled surfaces of the starting size are also kept in a small cache file
+holding their raw pixels compressed with zlib, read instead of the PNGs on the
+next start. A cache file remembers the size and modification time of the PNGs it
+was made from and is made again when they change. Paths are found from this file,
+not from the current directory.
 
 Author: Anand Maurya
 Github: Syntax-Programmer
@@ -10,9 +25,26 @@ __author__ = "Anand Maurya/ Syntax-Programmer"
 __email__ = "anand6308anand@gmail.com"
 
 
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from typing import List, NamedTuple, Tuple
+
 import pygame
 import pygame.locals
-import os
+
+ASSETS_DIRECTORY = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Assets")
+)
+ASSET_CACHE_DIRECTORY = os.path.join(ASSETS_DIRECTORY, "Cache")
+CACHE_HEADER_STRUCT = struct.Struct("<4sBHI")
+CACHE_MAGIC = b"CHAS"
+CACHE_VERSION = 1
+# Default memory cap of the scaled surfaces kept by an AssetCache, in bytes.
+ASSET_CACHE_BYTES = 32 << 20
+# Per surface of a cache file its (width, height, bytes per pixel, compressed size).
+SURFACE_HEADER_STRUCT = struct.Struct("<HHBI")
 
 PIECE_TYPE_TO_INDEX_TABLE = {
     "WPawn": 0,
@@ -28,26 +60,394 @@ PIECE_TYPE_TO_INDEX_TABLE = {
     "BQueen": 10,
     "BKing": 11,
 }
+pieces = ["Pawn", "Rook", "Knight", "Bishop", "Queen", "King"]
 
+# The size of a piece and of the move marker and their offset from the top left corner
+# of their square, per 100 pixels of square size.
+PIECE_IMAGE_SIZE = 65
+MOVE_MARKER_SIZE = 70
+PIECE_OFFSET = 17
+# The font size of the messages shown over the board per 100 pixels of square size.
+FONT_SIZE = 50
+BLACK = (0, 0, 0)
 
-LOADED_IMAGES = []
-PIECE_IMAGE_SIZE = 65, 65
-pieces = ["Pawn", "Rook", "Knight", "Bishop", "Queen", "King"]
 
-directory_path_separator = "\\" if os.name == "nt" else "/" # For cross OS compatibility.
+def asset_path(*names: str) -> str:
+    """
+    Gives the path of a file in the Assets directory.
+
+    Parameters:
+    ----------
+    1. *names : str
+        The directories and the file name below the Assets directory.
+
+    Returns:
+    -------
+    str :
+        The path, it does not depend on the current directory.
+    """
+    return os.path.join(ASSETS_DIRECTORY, *names)
+
+
+SOURCE_PATHS = [
+    asset_path("Pieces", f"{side}Pieces", f"{side}{piece_type}.png")
+    for side in "WB"
+    for piece_type in pieces
+] + [asset_path("BoardImg.png"), asset_path("MoveMarker.png")]
+
+
+class BoardAssets(NamedTuple):
+    """
+    The surfaces drawing a board of one square size needs, converted for the display.
+
+    Attributes:
+    ----------
+    1. square_size : int
+        The width and height of a square in pixels.
+    2. board : pygame.Surface
+        The opaque board image, 8 squares wide and high.
+    3. atlas : pygame.Surface
+        The pieces packed in one surface, a column per piece type and a row per side.
+    4. pieces : List[pygame.Surface]
+        The subsurface of the atlas of every piece, in the order of PIECE_TYPE_TO_INDEX_TABLE.
+    5. move_marker : pygame.Surface
+        The marker of a square a piece can move to.
+    6. piece_offset : int
+        The distance of a piece and a marker from the top left corner of their square.
+    7. font : pygame.font.Font
+        The font of the messages shown over the board.
+    """
+
+    square_size: int
+    board: pygame.Surface
+    atlas: pygame.Surface
+    pieces: List[pygame.Surface]
+    move_marker: pygame.Surface
+    piece_offset: int
+    font: pygame.font.Font
+
+
+def sources_signature() -> int:
+    """
+    Sums the size and modification time of the source PNGs up into a checksum.
+
+    Returns:
+    -------
+    int :
+        A 32 bit number that changes when any of the PNGs does.
+    """
+    stats = [os.stat(path) for path in SOURCE_PATHS]
+    return zlib.crc32(
+        repr([(stat.st_size, stat.st_mtime_ns) for stat in stats]).encode()
+    )
+
+
+def source_images_loader() -> List[pygame.Surface]:
+    """
+    Decodes the PNGs, the slow path of the startup.
+
+    Returns:
+    -------
+    List[pygame.Surface] :
+        The images in the order of SOURCE_PATHS.
+    """
+    return [pygame.image.load(path) for path in SOURCE_PATHS]
+
+
+def scaled_surfaces_maker(
+    square_size: int, sources: List[pygame.Surface]
+) -> Tuple[pygame.Surface, pygame.Surface, pygame.Surface]:
+    """
+    Scales the images for a square size.
+
+    Parameters:
+    ----------
+    1. square_size : int
+        The width and height of a square in pixels.
+    2. sources : List[pygame.Surface]
+        The images given by source_images_loader.
+
+    Returns:
+    -------
+    Tuple[pygame.Surface, pygame.Surface, pygame.Surface] :
+        The (opaque board, piece atlas, move marker) surfaces, not converted yet.
+    """
+    board_size = square_size * 8
+    board = pygame.Surface((board_size, board_size))
+    board.fill(BLACK)
+    board.blit(
+        pygame.transform.scale(sources[12], (board_size, board_size)),
+        (0, 0),
+    )
+
+    piece_size = square_size * PIECE_IMAGE_SIZE // 100
+    atlas = pygame.Surface(
+        (piece_size * len(pieces), piece_size * 2), pygame.locals.SRCALPHA
+    )
+    for index, image in enumerate(sources[:12]):
+        atlas.blit(
+            pygame.transform.scale(image, (piece_size, piece_size)),
+            ((index % 6) * piece_size, (index // 6) * piece_size),
+        )
+
+    marker_size = square_size * MOVE_MARKER_SIZE // 100
+    move_marker = pygame.transform.scale(sources[13], (marker_size, marker_size))
+    return board, atlas, move_marker
+
+
+def cache_file_reader(
+    path: str, square_size: int, signature: int
+) -> List[pygame.Surface] | None:
+    """
+    Reads the scaled surfaces back from a cache file.
+
+    Parameters:
+    ----------
+    1. path : str
+        The cache file.
+    2. square_size : int
+        The square size the surfaces have to be made for.
+    3. signature : int
+        The checksum of the PNGs the surfaces have to be made from.
+
+    Returns:
+    -------
+    List[pygame.Surface] | None :
+        The surfaces in the order they were written, None if the file is missing, broken
+        or out of date.
+    """
+    try:
+        with open(path, "rb") as cache_file:
+            data = cache_file.read()
+    except OSError:
+        return None
+    if data[: CACHE_HEADER_STRUCT.size] != CACHE_HEADER_STRUCT.pack(
+        CACHE_MAGIC, CACHE_VERSION, square_size, signature
+    ):
+        return None
+    surfaces, offset = [], CACHE_HEADER_STRUCT.size
+    try:
+        while offset < len(data):
+            width, height, pixel_size, size = SURFACE_HEADER_STRUCT.unpack_from(
+                data, offset
+            )
+            offset += SURFACE_HEADER_STRUCT.size
+            surfaces.append(
+                pygame.image.frombytes(
+                    zlib.decompress(data[offset : offset + size]),
+                    (width, height),
+                    "RGBA" if pixel_size == 4 else "RGB",
+                )
+            )
+            offset += size
+    except (struct.error, zlib.error, ValueError):
+        return None
+    return surfaces
+
+
+def cache_file_writer(
+    path: str, square_size: int, signature: int, surfaces: List[pygame.Surface]
+) -> None:
+    """
+    Writes the scaled surfaces to a cache file.
+
+    The file is written next to its final name and then renamed, so a reader never sees
+    half of it. The cache only saves time, a directory that can't be written to just
+    leaves it out.
+
+    Parameters:
+    ----------
+    1. path : str
+        The cache file.
+    2. square_size : int
+        The square size the surfaces were made for.
+    3. signature : int
+        The checksum of the PNGs the surfaces were made from.
+    4. surfaces : List[pygame.Surface]
+        The surfaces, kept with an alpha channel only if they have one.
+    """
+    chunks = [
+        CACHE_HEADER_STRUCT.pack(CACHE_MAGIC, CACHE_VERSION, square_size, signature)
+    ]
+    for surface in surfaces:
+        has_alpha = bool(surface.get_flags() & pygame.locals.SRCALPHA)
+        pixels = zlib.compress(
+            pygame.image.tobytes(surface, "RGBA" if has_alpha else "RGB"), 1
+        )
+        chunks.append(
+            SURFACE_HEADER_STRUCT.pack(
+                *surface.get_size(), 4 if has_alpha else 3, len(pixels)
+            )
+        )
+        chunks.append(pixels)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary_path, "wb") as cache_file:
+            cache_file.write(b"".join(chunks))
+        os.replace(temporary_path, path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+class AssetCache:
+    """
+    This class makes the assets of a square size once and keeps those used last.
+
+    When adding the assets of a size would go over max_bytes the least recently used
+    sizes are dropped first. The decoded PNGs are kept too once they had to be loaded,
+    so the assets of a new size only cost the scaling.
+
+    Attributes:
+    ----------
+    1. cache_directory : str | None
+        The directory of the cache files, None to always load the PNGs.
+    2. max_bytes : int
+        The memory cap of the kept surfaces.
+    3. used_bytes : int
+        The memory the pixels of the kept surfaces use.
+    4. entries : OrderedDict[int, BoardAssets]
+        The square sizes mapped to their assets, oldest use first.
+    5. sources : List[pygame.Surface] | None
+        The decoded PNGs, None until they are needed.
+    """
+
+    def __init__(
+        self,
+        cache_directory: str | None = ASSET_CACHE_DIRECTORY,
+        max_bytes: int = ASSET_CACHE_BYTES,
+    ) -> None:
+        """
+        Initializes an AssetCache object.
+
+        Parameters:
+        ----------
+        1. cache_directory : str | None
+            The directory of the cache files, None to always load the PNGs.
+        2. max_bytes : int
+            The memory cap of the kept surfaces.
+        """
+        self.cache_directory = cache_directory
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+        self.sources = None
+
+    @staticmethod
+    def entry_size(assets: BoardAssets) -> int:
+        """
+        Counts the memory the pixels of the assets of a size use.
+
+        The pieces are subsurfaces sharing the pixels of the atlas so they are not counted.
+
+        Parameters:
+        ----------
+        1. assets : BoardAssets
+            The assets of a size.
+
+        Returns:
+        -------
+        int :
+            The size in bytes.
+        """
+        return sum(
+            surface.get_width() * surface.get_height() * surface.get_bytesize()
+            for surface in (assets.board, assets.atlas, assets.move_marker)
+        )
+
+    def scaled_surfaces(
+        self, square_size: int, keep_on_disk: bool
+    ) -> List[pygame.Surface]:
+        """
+        Reads the surfaces of a size from its cache file or scales them from the PNGs.
+
+        Parameters:
+        ----------
+        1. square_size : int
+            The width and height of a square in pixels.
+        2. keep_on_disk : bool
+            If True the cache file is used and written.
 
-for side in "WB":
-    for piece_type in pieces:
-        path = f"Assets{directory_path_separator}Pieces{directory_path_separator}{side}Pieces{directory_path_separator}{side}{piece_type}.png"
-        image = pygame.image.load(path)
-        LOADED_IMAGES.append(pygame.transform.scale(image, PIECE_IMAGE_SIZE))
+        Returns:
+        -------
+        List[pygame.Surface] :
+            The (opaque board, piece atlas, move marker) surfaces, not converted yet.
+        """
+        keep_on_disk = keep_on_disk and self.cache_directory is not None
+        if keep_on_disk:
+            path = os.path.join(self.cache_directory, f"Assets{square_size}.bin")
+            signature = sources_signature()
+            surfaces = cache_file_reader(
+                path=path, square_size=square_size, signature=signature
+            )
+            if surfaces is not None:
+                return surfaces
+        if self.sources is None:
+            self.sources = source_images_loader()
+        surfaces = scaled_surfaces_maker(square_size=square_size, sources=self.sources)
+        if keep_on_disk:
+            cache_file_writer(
+                path=path,
+                square_size=square_size,
+                signature=signature,
+                surfaces=surfaces,
+            )
+        return surfaces
 
+    def board_assets(self, square_size: int, keep_on_disk: bool = False) -> BoardAssets:
+        """
+        Gives the assets of a square size, making them if they are not kept.
 
-BOARD_SIZE = 800, 800
-board_image = pygame.image.load(f"Assets{directory_path_separator}BoardImg.png")
-board_image = pygame.transform.scale(board_image, BOARD_SIZE)
+        The display mode has to be set already, the surfaces are converted for it.
 
+        Parameters:
+        ----------
+        1. square_size : int
+            The width and height of a square in pixels.
+        2. keep_on_disk : bool
+            If True the surfaces are read from and written to a cache file, meant for the
+            size the game starts with. Other sizes are only kept in memory so a resize
+            does not leave a file behind for every size the window went through.
 
-MOVE_MARKER_SIZE = 70, 70
-move_maker = pygame.image.load(f"Assets{directory_path_separator}MoveMarker.png")
-move_maker = pygame.transform.scale(move_maker, MOVE_MARKER_SIZE)
+        Returns:
+        -------
+        BoardAssets :
+            The surfaces ready to be drawn.
+        """
+        assets = self.entries.get(square_size)
+        if assets is not None:
+            self.entries.move_to_end(square_size)
+            return assets
+        board, atlas, move_marker = self.scaled_surfaces(
+            square_size=square_size, keep_on_disk=keep_on_disk
+        )
+        atlas = atlas.convert_alpha()
+        piece_size = atlas.get_height() // 2
+        assets = BoardAssets(
+            square_size=square_size,
+            board=board.convert(),
+            atlas=atlas,
+            pieces=[
+                atlas.subsurface(
+                    ((index % 6) * piece_size, (index // 6) * piece_size),
+                    (piece_size, piece_size),
+                )
+                for index in range(12)
+            ],
+            move_marker=move_marker.convert_alpha(),
+            piece_offset=square_size * PIECE_OFFSET // 100,
+            font=pygame.font.Font(
+                asset_path("Font", "JetBrainsMono.ttf"),
+                max(square_size * FONT_SIZE // 100, 1),
+            ),
+        )
+        size = self.entry_size(assets=assets)
+        # Assets too big to be kept are still returned to be drawn.
+        if size <= self.max_bytes:
+            while self.used_bytes + size > self.max_bytes:
+                _, evicted_assets = self.entries.popitem(last=False)
+                self.used_bytes -= self.entry_size(assets=evicted_assets)
+            self.entries[square_size] = assets
+            self.used_bytes += size
+        return assets
@@ -0,0 +1,353 @@
+"""
+This module holds the attack tables of all the pieces.
+
+The tables are built once when the module is imported and are indexed by the
+square index (y * 8 + x) of the piece, pawn tables are further indexed by the
+side the pawn belongs to.
+
+Sliding pieces are handled line by line (row, column, diagonal and anti-diagonal).
+For every square and line the occupancy of that line, without the squares at the
+edge of the board which can never block anything, is used as the key of a table
+holding the attacked squares, so a blocker aware attack set is a single lookup.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+from typing import Dict, List, Tuple, Literal
+from Bitboard import (
+    BISHOP,
+    BLACK,
+    KING,
+    KNIGHT,
+    PAWN,
+    ROOK,
+    SQUARE_BB,
+    WHITE,
+    bitboard_squares,
+    locations_to_bitboard,
+)
+
+
+INT_RANGE = Literal[0, 1, 2, 3, 4, 5, 6, 7]
+
+KNIGHT_OFFSETS = [
+    (2, 1),
+    (2, -1),
+    (-2, 1),
+    (-2, -1),
+    (1, 2),
+    (-1, 2),
+    (1, -2),
+    (-1, -2),
+]
+KING_OFFSETS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, -1), (-1, -1), (-1, 1), (1, 1)]
+# White pawns move up the board (towards y = 0) and black pawns move down.
+PAWN_DIRECTIONS = {WHITE: -1, BLACK: 1}
+# Each line is made of the two opposite directions a sliding piece can move along it.
+ROW_DIRECTIONS = [(1, 0), (-1, 0)]
+COL_DIRECTIONS = [(0, 1), (0, -1)]
+DIAGONAL_DIRECTIONS = [(1, 1), (-1, -1)]
+ANTI_DIAGONAL_DIRECTIONS = [(1, -1), (-1, 1)]
+
+
+def offset_address_table_maker(
+    offsets: List[Tuple[int, int]],
+) -> List[Tuple[Tuple[INT_RANGE, INT_RANGE], ...]]:
+    """
+    Creates the table of the locations reachable by jumping with the given offsets.
+
+    Parameters:
+    ----------
+    1. offsets : List[Tuple[int, int]]
+        The (x, y) jumps that the piece can make.
+
+    Returns:
+    -------
+    List[Tuple[Tuple[INT_RANGE, INT_RANGE], ...]] :
+        For every square index the locations that stay on the board after the jump.
+    """
+    return [
+        tuple(
+            (square % 8 + x_step, square // 8 + y_step)
+            for x_step, y_step in offsets
+            if square % 8 + x_step in range(8) and square // 8 + y_step in range(8)
+        )
+        for square in range(64)
+    ]
+
+
+def pawn_address_table_maker(color: Literal[0, 1]) -> Tuple[
+    List[Tuple[Tuple[INT_RANGE, INT_RANGE], ...]],
+    List[Tuple[Tuple[INT_RANGE, INT_RANGE], ...]],
+]:
+    """
+    Creates the moving and the capturing tables of a pawn of the given side.
+
+    Parameters:
+    ----------
+    1. color : Literal[0, 1]
+        WHITE or BLACK.
+
+    Returns:
+    -------
+    Tuple[
+    List[Tuple[Tuple[INT_RANGE, INT_RANGE], ...]],
+    List[Tuple[Tuple[INT_RANGE, INT_RANGE], ...]],
+    ] :\n
+        Creates two tables :\n
+        1. Table1 : The one and two step pushes of a pawn on every square index.\n
+        2. Table2 : The squares a pawn on every square index can capture on.
+    """
+    movement_direction = PAWN_DIRECTIONS[color]
+    moving_table = [
+        tuple(
+            (square % 8, square // 8 + step * movement_direction)
+            for step in [1, 2]
+            if square // 8 + step * movement_direction in range(8)
+        )
+        for square in range(64)
+    ]
+    capturing_table = offset_address_table_maker(
+        offsets=[(1, movement_direction), (-1, movement_direction)]
+    )
+    return moving_table, capturing_table
+
+
+KNIGHT_ADDRESS_TABLE = offset_address_table_maker(offsets=KNIGHT_OFFSETS)
+KING_ADDRESS_TABLE = offset_address_table_maker(offsets=KING_OFFSETS)
+PAWN_MOVING_ADDRESS_TABLE, PAWN_CAPTURING_ADDRESS_TABLE = zip(
+    *(pawn_address_table_maker(color=color) for color in [WHITE, BLACK])
+)
+
+KNIGHT_ATTACKS = [locations_to_bitboard(address) for address in KNIGHT_ADDRESS_TABLE]
+KING_ATTACKS = [locations_to_bitboard(address) for address in KING_ADDRESS_TABLE]
+PAWN_ATTACKS = [
+    [locations_to_bitboard(address) for address in PAWN_CAPTURING_ADDRESS_TABLE[color]]
+    for color in [WHITE, BLACK]
+]
+
+
+def line_attacks_maker(
+    square: int, directions: List[Tuple[int, int]], occupancy: int
+) -> int:
+    """
+    Creates the attacks of a sliding piece by walking the board square by square.
+
+    Only used while building the lookup tables.
+
+    Parameters:
+    ----------
+    1. square : int
+        The square index of the sliding piece.
+    2. directions : List[Tuple[int, int]]
+        The (x, y) steps the piece slides along.
+    3. occupancy : int
+        The bitboard of all the occupied squares.
+
+    Returns:
+    -------
+    int :
+        The bitboard of the reachable squares including the first blocker in each direction.
+    """
+    attacks = 0
+    for x_step, y_step in directions:
+        x_pos, y_pos = square % 8 + x_step, square // 8 + y_step
+        while x_pos in range(8) and y_pos in range(8):
+            attacks |= SQUARE_BB[y_pos * 8 + x_pos]
+            if occupancy & SQUARE_BB[y_pos * 8 + x_pos]:
+                break
+            x_pos, y_pos = x_pos + x_step, y_pos + y_step
+    return attacks
+
+
+def line_table_maker(
+    directions: List[Tuple[int, int]],
+) -> Tuple[List[int], List[Dict[int, int]]]:
+    """
+    Creates the blocker masks and the attack tables of one line type.
+
+    Parameters:
+    ----------
+    1. directions : List[Tuple[int, int]]
+        The two opposite (x, y) steps making the line.
+
+    Returns:
+    -------
+    Tuple[List[int], List[Dict[int, int]]] :\n
+        Creates two lists :\n
+        1. List1 : For every square index the squares of the line that can hold a blocker.\n
+        2. List2 : For every square index a table mapping the blocker occupancy to the attacks.
+    """
+    masks, tables = [], []
+    for square in range(64):
+        # The last square of each direction can't block anything beyond it.
+        mask = line_attacks_maker(square=square, directions=directions, occupancy=0)
+        for x_step, y_step in directions:
+            x_pos, y_pos = square % 8 + x_step, square // 8 + y_step
+            if x_pos in range(8) and y_pos in range(8):
+                while (x_pos + x_step) in range(8) and (y_pos + y_step) in range(8):
+                    x_pos, y_pos = x_pos + x_step, y_pos + y_step
+                mask &= ~SQUARE_BB[y_pos * 8 + x_pos]
+        table = {}
+        # Walks through every subset of the mask (Carry-Rippler trick).
+        blockers = 0
+        while True:
+            table[blockers] = line_attacks_maker(
+                square=square, directions=directions, occupancy=blockers
+            )
+            blockers = (blockers - mask) & mask
+            if not blockers:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+ROW_MASKS, ROW_ATTACKS = line_table_maker(directions=ROW_DIRECTIONS)
+COL_MASKS, COL_ATTACKS = line_table_maker(directions=COL_DIRECTIONS)
+DIAGONAL_MASKS, DIAGONAL_ATTACKS = line_table_maker(directions=DIAGONAL_DIRECTIONS)
+ANTI_DIAGONAL_MASKS, ANTI_DIAGONAL_ATTACKS = line_table_maker(
+    directions=ANTI_DIAGONAL_DIRECTIONS
+)
+
+
+def line_relation_table_maker() -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Creates the tables of the squares related to two squares sharing a line.
+
+    Returns:
+    -------
+    Tuple[List[List[int]], List[List[int]]] :\n
+        Creates two tables indexed by two square indices :\n
+        1. Table1 : The squares strictly between the two squares.\n
+        2. Table2 : The whole line through the two squares, both of them included.\n
+        Both are 0 when the two squares do not share a row, column or diagonal.
+    """
+    between_table = [[0] * 64 for _ in range(64)]
+    line_table = [[0] * 64 for _ in range(64)]
+    for directions in [
+        ROW_DIRECTIONS,
+        COL_DIRECTIONS,
+        DIAGONAL_DIRECTIONS,
+        ANTI_DIAGONAL_DIRECTIONS,
+    ]:
+        for square in range(64):
+            line = line_attacks_maker(square=square, directions=directions, occupancy=0)
+            for other_square in bitboard_squares(line):
+                between_table[square][other_square] = line_attacks_maker(
+                    square=square,
+                    directions=directions,
+                    occupancy=SQUARE_BB[other_square],
+                ) & line_attacks_maker(
+                    square=other_square,
+                    directions=directions,
+                    occupancy=SQUARE_BB[square],
+                )
+                line_table[square][other_square] = line | SQUARE_BB[square]
+    return between_table, line_table
+
+
+BETWEEN, LINE = line_relation_table_maker()
+
+
+def rook_attacks(square: int, occupancy: int) -> int:
+    """
+    Gives the squares a rook/queen on the square attacks.
+
+    Parameters:
+    ----------
+    1. square : int
+        The square index of the piece.
+    2. occupancy : int
+        The bitboard of all the occupied squares.
+
+    Returns:
+    -------
+    int :
+        The bitboard of the attacked squares, the first blocker in every direction included.
+    """
+    return (
+        ROW_ATTACKS[square][occupancy & ROW_MASKS[square]]
+        | COL_ATTACKS[square][occupancy & COL_MASKS[square]]
+    )
+
+
+def bishop_attacks(square: int, occupancy: int) -> int:
+    """
+    Gives the squares a bishop/queen on the square attacks.
+
+    Parameters:
+    ----------
+    1. square : int
+        The square index of the piece.
+    2. occupancy : int
+        The bitboard of all the occupied squares.
+
+    Returns:
+    -------
+    int :
+        The bitboard of the attacked squares, the first blocker in every direction included.
+    """
+    return (
+        DIAGONAL_ATTACKS[square][occupancy & DIAGONAL_MASKS[square]]
+        | ANTI_DIAGONAL_ATTACKS[square][occupancy & ANTI_DIAGONAL_MASKS[square]]
+    )
+
+
+def queen_attacks(square: int, occupancy: int) -> int:
+    """
+    Gives the squares a queen on the square attacks.
+
+    Parameters:
+    ----------
+    1. square : int
+        The square index of the piece.
+    2. occupancy : int
+        The bitboard of all the occupied squares.
+
+    Returns:
+    -------
+    int :
+        The bitboard of the attacked squares, the first blocker in every direction included.
+    """
+    return rook_attacks(square=square, occupancy=occupancy) | bishop_attacks(
+        square=square, occupancy=occupancy
+    )
+
+
+def piece_attacks(piece: int, square: int, occupancy: int) -> int:
+    """
+    Gives the squares a piece on the square attacks.
+
+    Parameters:
+    ----------
+    1. piece : int
+        The piece index (see PIECE_NAMES), a pawn attacks the squares it captures on.
+    2. square : int
+        The square index of the piece.
+    3. occupancy : int
+        The bitboard of all the occupied squares.
+
+    Returns:
+    -------
+    int :
+        The bitboard of the attacked squares, the first blocker in every direction included.
+    """
+    piece_type = piece % 6
+    if piece_type == PAWN:
+        return PAWN_ATTACKS[piece >= 6][square]
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[square]
+    if piece_type == KING:
+        return KING_ATTACKS[square]
+    if piece_type == BISHOP:
+        return bishop_attacks(square=square, occupancy=occupancy)
+    if piece_type == ROOK:
+        return rook_attacks(square=square, occupancy=occupancy)
+    return queen_attacks(square=square, occupancy=occupancy)
@@ -0,0 +1,283 @@
+"""
+This module analyses a file of positions without pygame and writes one JSON
+line per position.
+
+The positions are read one line at a time, in FEN or EPD, from a file or the
+standard input. For each one the number of legal moves and whether the side to
+move is in check, checkmated or stalemated is written, and optionally the best
+move found by the search. The lines are handed out in chunks to a pool of
+worker processes with only a few chunks in flight at once, so the memory used
+stays the same however long the input is. The output keeps the input order.
+
+Usage:
+    python BatchAnalyser.py positions.epd --output results.jsonl
+    cat positions.fen | python BatchAnalyser.py --workers 4 --depth 3
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import argparse
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from os import cpu_count
+from typing import Dict, Iterator, List, TextIO, Tuple
+from Engine import Main, move_to_uci
+from Search import Searcher, TranspositionTable, score_formatter
+
+
+# The number of lines sent to a worker at once.
+CHUNK_SIZE = 64
+# The number of chunks waiting or running per worker.
+CHUNKS_PER_WORKER = 2
+# The search of every position gets a table of this size.
+ANALYSIS_TABLE_BYTES = 1 << 20
+
+# The engine of this process, created on the first position it analyses.
+worker_main = None
+
+
+def epd_parser(line: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Splits a FEN or EPD line into a FEN string and the EPD operations.
+
+    Parameters:
+    ----------
+    1. line : str
+        A FEN line, or an EPD line like 'rnbqkbnr/... w KQkq - bm e4; id "start";'.
+
+    Returns:
+    -------
+    Tuple[str, Dict[str, str]] :
+        The FEN string the engine can load and the operations mapped to their operands.
+    """
+    fields = line.split(maxsplit=4)
+    if len(fields) < 4:
+        raise ValueError(f"expected at least 4 fields, got {len(fields)}")
+    fen_fields, rest = fields[:4], fields[4] if len(fields) > 4 else ""
+    # A FEN carries the two move counters where an EPD has its operations.
+    counters = rest.split(maxsplit=2)
+    if len(counters) >= 2 and counters[0].isdigit() and counters[1].isdigit():
+        fen_fields += counters[:2]
+        rest = counters[2] if len(counters) > 2 else ""
+    operations = {}
+    for operation in rest.split(";"):
+        operation = operation.strip()
+        if operation:
+            opcode, _, operand = operation.partition(" ")
+            operations[opcode] = operand.strip().strip('"')
+    return " ".join(fen_fields), operations
+
+
+def position_analyser(
+    line: str, depth: int | None, node_limit: int | None
+) -> Dict[str, object]:
+    """
+    Analyses a single FEN or EPD line.
+
+    Parameters:
+    ----------
+    1. line : str
+        The position.
+    2. depth : int | None
+        The depth to search the best move to, no search is run if neither this nor
+        node_limit is provided.
+    3. node_limit : int | None
+        The nodes the search may visit.
+
+    Returns:
+    -------
+    Dict[str, object] :
+        The JSON record of the position, holding an "error" instead when it can't be read.
+    """
+    global worker_main
+    if worker_main is None:
+        worker_main = Main()
+    main = worker_main
+    try:
+        fen, operations = epd_parser(line=line)
+        main.load_fen(fen=fen)
+    except (ValueError, KeyError, IndexError) as error:
+        return {"input": line, "error": f"{type(error).__name__}: {error}"}
+    moves = main.generate_legal_moves()
+    in_check = main.is_own_king_attacked(move_count=main.move_count)
+    if moves:
+        status = "check" if in_check else "normal"
+    else:
+        status = "checkmate" if in_check else "stalemate"
+    record = {"fen": fen, "legal_moves": len(moves), "status": status}
+    if "id" in operations:
+        record["id"] = operations["id"]
+    if moves and (depth is not None or node_limit is not None):
+        # A fresh table keeps every result independent of the positions before it.
+        result = Searcher(
+            main=main,
+            transposition_table=TranspositionTable(max_bytes=ANALYSIS_TABLE_BYTES),
+        ).search(max_depth=depth or 64, node_limit=node_limit)
+        record["best_move"] = move_to_uci(move=result.best_move)
+        record["score"] = score_formatter(score=result.score)
+        record["depth"] = result.depth
+        record["nodes"] = result.nodes
+    return record
+
+
+def chunk_analyser(
+    lines: List[str], depth: int | None, node_limit: int | None
+) -> List[str]:
+    """
+    Analyses a chunk of lines, runs inside a worker process.
+
+    Parameters:
+    ----------
+    1. lines : List[str]
+        The positions.
+    2. depth : int | None
+        The depth to search the best move to.
+    3. node_limit : int | None
+        The nodes the search of each position may visit.
+
+    Returns:
+    -------
+    List[str] :
+        The JSON line of every position in the same order.
+    """
+    return [
+        json.dumps(position_analyser(line=line, depth=depth, node_limit=node_limit))
+        for line in lines
+    ]
+
+
+def position_lines(input_file: TextIO) -> Iterator[str]:
+    """
+    Yields the positions of the input skipping blank lines and "#" comments.
+
+    Parameters:
+    ----------
+    1. input_file : TextIO
+        The file to read from.
+
+    Returns:
+    -------
+    Iterator[str] :
+        The stripped position lines.
+    """
+    for line in input_file:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def batch_analyser(
+    input_file: TextIO,
+    output_file: TextIO,
+    workers: int,
+    depth: int | None = None,
+    node_limit: int | None = None,
+) -> int:
+    """
+    Analyses every position of the input and writes the JSON lines to the output.
+
+    Parameters:
+    ----------
+    1. input_file : TextIO
+        The file to read the positions from.
+    2. output_file : TextIO
+        The file to write the JSON lines to.
+    3. workers : int
+        The number of worker processes, 1 analyses in this process.
+    4. depth : int | None
+        The depth to search the best move to.
+    5. node_limit : int | None
+        The nodes the search of each position may visit.
+
+    Returns:
+    -------
+    int :
+        The number of positions analysed.
+    """
+    lines = position_lines(input_file=input_file)
+    chunks = iter(lambda: list(islice(lines, CHUNK_SIZE)), [])
+    count = 0
+    if workers <= 1:
+        for chunk in chunks:
+            for json_line in chunk_analyser(
+                lines=chunk, depth=depth, node_limit=node_limit
+            ):
+                output_file.write(json_line + "\n")
+            count += len(chunk)
+        return count
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(chunk_analyser, chunk, depth, node_limit))
+            count += len(chunk)
+            # Waiting on the oldest chunk keeps the output in order and the memory bounded.
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                output_file.writelines(
+                    json_line + "\n" for json_line in pending.popleft().result()
+                )
+        while pending:
+            output_file.writelines(
+                json_line + "\n" for json_line in pending.popleft().result()
+            )
+    return count
+
+
+def main_runner() -> int:
+    """
+    The command line entry point.
+
+    Returns:
+    -------
+    int :
+        The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Analyse a file of positions.")
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="the FEN/EPD file, the standard input by default",
+    )
+    parser.add_argument(
+        "--output", default="-", help="the JSONL file, the standard output by default"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="the number of processes, one per core by default"
+    )
+    parser.add_argument("--depth", type=int, help="search the best move to this depth")
+    parser.add_argument(
+        "--nodes", type=int, help="search the best move with this many nodes"
+    )
+    arguments = parser.parse_args()
+
+    input_file = sys.stdin if arguments.input == "-" else open(arguments.input)
+    output_file = sys.stdout if arguments.output == "-" else open(arguments.output, "w")
+    try:
+        count = batch_analyser(
+            input_file=input_file,
+            output_file=output_file,
+            workers=arguments.workers or cpu_count() or 1,
+            depth=arguments.depth,
+            node_limit=arguments.nodes,
+        )
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(f"{count} positions analysed", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_runner())
@@ -0,0 +1,501 @@
+"""
+This module scores many positions at once with NumPy array operations.
+
+A batch of positions is an (N, 12) array of uint64 bitboards, one per piece
+index, with an (N,) array of the sides to move. The bitboards can also be
+turned into an (N, 12, 64) array of bitplanes and back. Every term of the
+score is computed for the whole batch with array operations so the Python
+overhead is paid once per batch and not once per position:
+
+    1. The material and piece-square tables, the same values and the same
+       blend of the middlegame and endgame scores as Evaluation.py.
+    2. Mobility, the squares not held by its own pieces that each piece type
+       of a side attacks, the sliding attacks found by Kogge-Stone fills.
+    3. King safety, a malus for every square around the king attacked by the
+       opponent and a bonus for every own pawn in front of it.
+
+The batch is worked through in chunks so the memory used stays bounded. Files
+of packed positions (PackedPosition.py) are read straight from their mmap
+without going through the engine, which makes scoring a dataset fast.
+
+NumPy is needed by this module only, install it with "pip install numpy".
+
+Usage:
+    python BatchEvaluation.py positions.bin --output scores.txt
+    python BatchEvaluation.py positions.fen
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import argparse
+import sys
+from time import perf_counter
+from typing import Iterable, List, Tuple
+import numpy as np
+from BatchAnalyser import epd_parser
+from Bitboard import (
+    BISHOP,
+    COL_BB,
+    FULL_BB,
+    KING,
+    KNIGHT,
+    PAWN,
+    QUEEN,
+    ROOK,
+    ROW_BB,
+    Position,
+)
+from Engine import Main
+from Evaluation import (
+    ENDGAME_PIECE_SQUARE_VALUES,
+    MAX_PHASE,
+    MIDDLEGAME_PIECE_SQUARE_VALUES,
+    PIECE_PHASES,
+)
+from PackedPosition import PACKED_POSITION_SIZE, PackedPositionFile
+
+
+# The number of positions scored by one round of array operations.
+EVALUATION_CHUNK_SIZE = 4096
+# Centipawns per attacked square, indexed by piece type.
+MOBILITY_WEIGHTS = [0, 2, 4, 5, 1, 0]
+# Centipawns lost per square next to the king the opponent attacks.
+KING_ZONE_ATTACK_WEIGHT = 6
+# Centipawns won per own pawn shielding the king.
+PAWN_SHIELD_WEIGHT = 8
+
+# The numpy layout of a packed position, see PackedPosition.py.
+PACKED_POSITION_DTYPE = np.dtype(
+    [
+        ("occupancy", "<u8"),
+        ("pieces", "u1", 16),
+        ("flags", "u1"),
+        ("en_passant", "u1"),
+        ("halfmove_clock", "u1"),
+        ("fullmove", "<u2"),
+        ("padding", "V3"),
+    ]
+)
+assert PACKED_POSITION_DTYPE.itemsize == PACKED_POSITION_SIZE
+
+# The values of every (piece index, square index), flattened to match the bitplanes.
+PIECE_SQUARE_MATRIX = np.array(
+    [
+        np.array(MIDDLEGAME_PIECE_SQUARE_VALUES).reshape(768),
+        np.array(ENDGAME_PIECE_SQUARE_VALUES).reshape(768),
+        np.repeat(PIECE_PHASES, 64),
+    ],
+    dtype=np.float32,
+).T
+POPCOUNT_TABLE = np.array([bin(byte).count("1") for byte in range(256)], np.uint8)
+
+NOT_COL_0 = np.uint64(FULL_BB ^ COL_BB[0])
+NOT_COL_7 = np.uint64(FULL_BB ^ COL_BB[7])
+NOT_COL_01 = np.uint64(FULL_BB ^ COL_BB[0] ^ COL_BB[1])
+NOT_COL_67 = np.uint64(FULL_BB ^ COL_BB[6] ^ COL_BB[7])
+ALL_SQUARES = np.uint64(FULL_BB)
+# The (square index step, mask of the squares a step can land on) of the 8 directions.
+ROOK_DIRECTIONS = [(1, NOT_COL_0), (-1, NOT_COL_7), (8, ALL_SQUARES), (-8, ALL_SQUARES)]
+BISHOP_DIRECTIONS = [(9, NOT_COL_0), (7, NOT_COL_7), (-7, NOT_COL_0), (-9, NOT_COL_7)]
+KNIGHT_STEPS = [
+    (17, NOT_COL_0),
+    (15, NOT_COL_7),
+    (10, NOT_COL_01),
+    (6, NOT_COL_67),
+    (-6, NOT_COL_01),
+    (-10, NOT_COL_67),
+    (-15, NOT_COL_0),
+    (-17, NOT_COL_7),
+]
+KING_STEPS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+# White pawns move towards the 8th rank, the lower square indices.
+PAWN_CAPTURE_STEPS = [
+    [(-7, NOT_COL_0), (-9, NOT_COL_7)],
+    [(9, NOT_COL_0), (7, NOT_COL_7)],
+]
+# The three squares in front of a king.
+SHIELD_STEPS = [
+    PAWN_CAPTURE_STEPS[0] + [(-8, ALL_SQUARES)],
+    PAWN_CAPTURE_STEPS[1] + [(8, ALL_SQUARES)],
+]
+# Only a king on the first two rows of its side has a pawn shield.
+KING_HOME_ROWS = [np.uint64(ROW_BB[6] | ROW_BB[7]), np.uint64(ROW_BB[0] | ROW_BB[1])]
+
+
+def shifted(bitboards: np.ndarray, step: int) -> np.ndarray:
+    """
+    Moves every square of the bitboards by a square index step, squares falling off drop.
+
+    Parameters:
+    ----------
+    1. bitboards : np.ndarray
+        The uint64 bitboards.
+    2. step : int
+        The square index step, negative steps move towards the 8th rank.
+
+    Returns:
+    -------
+    np.ndarray :
+        The shifted bitboards, the wrap around the board edge is not masked.
+    """
+    if step > 0:
+        return bitboards << np.uint64(step)
+    return bitboards >> np.uint64(-step)
+
+
+def popcount(bitboards: np.ndarray) -> np.ndarray:
+    """
+    Counts the set bits of every bitboard.
+
+    Parameters:
+    ----------
+    1. bitboards : np.ndarray
+        The uint64 bitboards.
+
+    Returns:
+    -------
+    np.ndarray :
+        The int32 counts, in the same shape.
+    """
+    byte_counts = POPCOUNT_TABLE[np.ascontiguousarray(bitboards).view(np.uint8)]
+    return byte_counts.reshape(*bitboards.shape, 8).sum(axis=-1, dtype=np.int32)
+
+
+def sliding_attacks(
+    sliders: np.ndarray, empty: np.ndarray, directions: List[Tuple[int, np.uint64]]
+) -> np.ndarray:
+    """
+    Finds the squares sliding pieces attack with Kogge-Stone occluded fills.
+
+    Parameters:
+    ----------
+    1. sliders : np.ndarray
+        The uint64 bitboards of the sliding pieces.
+    2. empty : np.ndarray
+        The uint64 bitboards of the empty squares.
+    3. directions : List[Tuple[int, np.uint64]]
+        The directions the pieces slide in.
+
+    Returns:
+    -------
+    np.ndarray :
+        The uint64 bitboards of the squares attacked by any of the pieces.
+    """
+    attacks = np.zeros_like(sliders)
+    for step, mask in directions:
+        filled, propagators = sliders, empty & mask
+        # Every round doubles the distance the fill reaches.
+        for distance in [1, 2, 4]:
+            filled = filled | (propagators & shifted(filled, step * distance))
+            propagators = propagators & shifted(propagators, step * distance)
+        attacks |= shifted(filled, step) & mask
+    return attacks
+
+
+def step_attacks(pieces: np.ndarray, steps: List[Tuple[int, np.uint64]]) -> np.ndarray:
+    """
+    Finds the squares pieces moving a single step attack.
+
+    Parameters:
+    ----------
+    1. pieces : np.ndarray
+        The uint64 bitboards of the pieces.
+    2. steps : List[Tuple[int, np.uint64]]
+        The steps of the pieces.
+
+    Returns:
+    -------
+    np.ndarray :
+        The uint64 bitboards of the squares attacked by any of the pieces.
+    """
+    attacks = np.zeros_like(pieces)
+    for step, mask in steps:
+        attacks |= shifted(pieces, step) & mask
+    return attacks
+
+
+def side_attacks(
+    bitboards: np.ndarray, side: int, empty: np.ndarray
+) -> List[np.ndarray]:
+    """
+    Finds the squares attacked by every piece type of a side.
+
+    Parameters:
+    ----------
+    1. bitboards : np.ndarray
+        The (N, 12) uint64 bitboards.
+    2. side : int
+        The side whose attacks are found.
+    3. empty : np.ndarray
+        The (N,) uint64 bitboards of the empty squares.
+
+    Returns:
+    -------
+    List[np.ndarray] :
+        The (N,) uint64 attack bitboards indexed by piece type.
+    """
+    offset = 6 * side
+    queens = bitboards[:, offset + QUEEN]
+    attacks = [None] * 6
+    attacks[PAWN] = step_attacks(
+        pieces=bitboards[:, offset + PAWN], steps=PAWN_CAPTURE_STEPS[side]
+    )
+    attacks[KNIGHT] = step_attacks(
+        pieces=bitboards[:, offset + KNIGHT], steps=KNIGHT_STEPS
+    )
+    attacks[KING] = step_attacks(pieces=bitboards[:, offset + KING], steps=KING_STEPS)
+    attacks[BISHOP] = sliding_attacks(
+        sliders=bitboards[:, offset + BISHOP], empty=empty, directions=BISHOP_DIRECTIONS
+    )
+    attacks[ROOK] = sliding_attacks(
+        sliders=bitboards[:, offset + ROOK], empty=empty, directions=ROOK_DIRECTIONS
+    )
+    attacks[QUEEN] = sliding_attacks(
+        sliders=queens, empty=empty, directions=ROOK_DIRECTIONS
+    ) | sliding_attacks(sliders=queens, empty=empty, directions=BISHOP_DIRECTIONS)
+    return attacks
+
+
+def bitboards_to_planes(bitboards: np.ndarray) -> np.ndarray:
+    """
+    Unpacks bitboards into bitplanes.
+
+    Parameters:
+    ----------
+    1. bitboards : np.ndarray
+        The (N, 12) uint64 bitboards.
+
+    Returns:
+    -------
+    np.ndarray :
+        The (N, 12, 64) uint8 bitplanes, [position, piece index, square index].
+    """
+    bytes_view = np.ascontiguousarray(bitboards, dtype="<u8").view(np.uint8)
+    return np.unpackbits(
+        bytes_view.reshape(len(bitboards), 12, 8), axis=2, bitorder="little"
+    )
+
+
+def planes_to_bitboards(planes: np.ndarray) -> np.ndarray:
+    """
+    Packs bitplanes into bitboards.
+
+    Parameters:
+    ----------
+    1. planes : np.ndarray
+        The (N, 12, 64) bitplanes, any non zero value is a piece.
+
+    Returns:
+    -------
+    np.ndarray :
+        The (N, 12) uint64 bitboards.
+    """
+    packed = np.packbits(planes.astype(bool), axis=2, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8").reshape(len(planes), 12)
+
+
+def positions_to_bitboards(positions: Iterable[Position]) -> np.ndarray:
+    """
+    Copies the bitboards of engine positions into an array.
+
+    Parameters:
+    ----------
+    1. positions : Iterable[Position]
+        The positions, e.g. main.position of every Main object.
+
+    Returns:
+    -------
+    np.ndarray :
+        The (N, 12) uint64 bitboards.
+    """
+    return np.array(
+        [position.pieces for position in positions], dtype=np.uint64
+    ).reshape(-1, 12)
+
+
+def packed_positions_to_bitboards(
+    data: bytes | memoryview,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decodes a buffer of packed positions without going through the engine.
+
+    Parameters:
+    ----------
+    1. data : bytes | memoryview
+        Whole packed positions one after the other, e.g. the mapping of a PackedPositionFile.
+
+    Returns:
+    -------
+    Tuple[np.ndarray, np.ndarray] :
+        The (N, 12) uint64 bitboards and the (N,) sides to move.
+    """
+    records = np.frombuffer(data, dtype=PACKED_POSITION_DTYPE)
+    count = len(records)
+    occupied = np.unpackbits(
+        np.ascontiguousarray(records["occupancy"]).view(np.uint8).reshape(count, 8),
+        axis=1,
+        bitorder="little",
+    )
+    # The n-th occupied square holds the n-th nibble.
+    nibbles = np.stack(
+        [records["pieces"] & 15, records["pieces"] >> 4], axis=2
+    ).reshape(count, 32)
+    ranks = np.clip(np.cumsum(occupied, axis=1, dtype=np.int16) - 1, 0, 31)
+    square_pieces = np.take_along_axis(nibbles, ranks, axis=1)
+    planes = (square_pieces[:, None, :] == np.arange(12)[None, :, None]) & (
+        occupied[:, None, :] == 1
+    )
+    return planes_to_bitboards(planes=planes), (records["flags"] & 1).astype(np.int8)
+
+
+def chunk_evaluator(bitboards: np.ndarray, sides: np.ndarray) -> np.ndarray:
+    """
+    Scores a chunk of positions, see batch_evaluate.
+
+    Parameters:
+    ----------
+    1. bitboards : np.ndarray
+        The (N, 12) uint64 bitboards.
+    2. sides : np.ndarray
+        The (N,) sides to move.
+
+    Returns:
+    -------
+    np.ndarray :
+        The (N,) int32 scores from the point of view of the side to move.
+    """
+    count = len(bitboards)
+    planes = bitboards_to_planes(bitboards=bitboards).reshape(count, 768)
+    sums = np.rint(planes.astype(np.float32) @ PIECE_SQUARE_MATRIX).astype(np.int64)
+    phase = np.minimum(sums[:, 2], MAX_PHASE)
+    scores = (sums[:, 0] * phase + sums[:, 1] * (MAX_PHASE - phase)) // MAX_PHASE
+    scores = scores.astype(np.int32)
+
+    side_pieces = [
+        np.bitwise_or.reduce(bitboards[:, 6 * side : 6 * side + 6], axis=1)
+        for side in range(2)
+    ]
+    empty = ~(side_pieces[0] | side_pieces[1])
+    attacks = [
+        side_attacks(bitboards=bitboards, side=side, empty=empty) for side in range(2)
+    ]
+    for side, sign in [(0, 1), (1, -1)]:
+        for piece_type, weight in enumerate(MOBILITY_WEIGHTS):
+            if weight:
+                scores += (
+                    sign
+                    * weight
+                    * popcount(attacks[side][piece_type] & ~side_pieces[side])
+                )
+        king = bitboards[:, 6 * side + KING]
+        king_zone = king | attacks[side][KING]
+        opponent_attacks = np.bitwise_or.reduce(
+            np.stack(attacks[1 - side][:KING], axis=1), axis=1
+        )
+        scores -= (
+            sign * KING_ZONE_ATTACK_WEIGHT * popcount(king_zone & opponent_attacks)
+        )
+        shield = step_attacks(
+            pieces=king & KING_HOME_ROWS[side], steps=SHIELD_STEPS[side]
+        )
+        shield &= bitboards[:, 6 * side + PAWN]
+        scores += sign * PAWN_SHIELD_WEIGHT * popcount(shield)
+    return np.where(np.asarray(sides) % 2 == 1, -scores, scores)
+
+
+def batch_evaluate(
+    bitboards: np.ndarray,
+    sides: np.ndarray,
+    chunk_size: int = EVALUATION_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Scores a batch of positions with array operations.
+
+    Parameters:
+    ----------
+    1. bitboards : np.ndarray
+        The (N, 12) uint64 bitboards, planes_to_bitboards converts (N, 12, 64) bitplanes.
+    2. sides : np.ndarray
+        The (N,) sides to move, 0 for white and 1 for black.
+    3. chunk_size : int
+        The number of positions scored at once, bounds the memory used.
+
+    Returns:
+    -------
+    np.ndarray :
+        The (N,) int32 scores in centipawns, positive when the side to move is better.
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    sides = np.asarray(sides)
+    scores = np.empty(len(bitboards), dtype=np.int32)
+    for start in range(0, len(bitboards), chunk_size):
+        scores[start : start + chunk_size] = chunk_evaluator(
+            bitboards=bitboards[start : start + chunk_size],
+            sides=sides[start : start + chunk_size],
+        )
+    return scores
+
+
+def main_runner() -> int:
+    """
+    The command line entry point.
+
+    Returns:
+    -------
+    int :
+        The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Score a file of positions at once.")
+    parser.add_argument(
+        "input",
+        help="a file of packed positions, or of FEN lines if it ends in .fen/.epd",
+    )
+    parser.add_argument(
+        "--output", default="-", help="the scores file, the standard output by default"
+    )
+    arguments = parser.parse_args()
+
+    if arguments.input.endswith((".fen", ".epd")):
+        main, bitboard_rows, side_rows = Main(), [], []
+        with open(arguments.input) as input_file:
+            for line in input_file:
+                if line.strip() and not line.startswith("#"):
+                    main.load_fen(fen=epd_parser(line=line.strip())[0])
+                    bitboard_rows.append(list(main.position.pieces))
+                    side_rows.append(main.move_count % 2)
+        bitboards = np.array(bitboard_rows, dtype=np.uint64).reshape(-1, 12)
+        sides = np.array(side_rows, dtype=np.int8)
+    else:
+        with PackedPositionFile(path=arguments.input) as packed_file:
+            if packed_file.mapping is None:
+                bitboards, sides = np.zeros((0, 12), np.uint64), np.zeros(0, np.int8)
+            else:
+                bitboards, sides = packed_positions_to_bitboards(
+                    data=packed_file.mapping
+                )
+
+    start = perf_counter()
+    scores = batch_evaluate(bitboards=bitboards, sides=sides)
+    seconds = perf_counter() - start
+    output_file = sys.stdout if arguments.output == "-" else open(arguments.output, "w")
+    try:
+        output_file.writelines(f"{score}\n" for score in scores.tolist())
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(
+        f"{len(scores)} positions scored in {seconds:.3f}s "
+        f"({len(scores) / max(seconds, 1e-9):,.0f} positions/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_runner())
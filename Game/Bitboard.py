@@ -0,0 +1,343 @@
+"""
+This module holds the bitboard representation of a chess position that
+the engine runs on.
+
+Every piece type of every side gets its own 64-bit integer where bit n is set
+when such a piece stands on square n. Squares are numbered row by row starting
+from the top left corner of the board, so the (x, y) location used by the rest of
+the game maps to the square y * 8 + x.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+from typing import Dict, Iterator, List, Literal, MutableMapping, Tuple
+from Evaluation import (
+    ENDGAME_PIECE_SQUARE_VALUES,
+    MIDDLEGAME_PIECE_SQUARE_VALUES,
+    PIECE_PHASES,
+)
+from Zobrist import PIECE_KEYS
+
+
+INT_RANGE = Literal[0, 1, 2, 3, 4, 5, 6, 7]
+
+WHITE, BLACK = 0, 1
+PAWN, ROOK, KNIGHT, BISHOP, QUEEN, KING = range(6)
+EMPTY = -1
+# The piece types a pawn can promote to, the strongest first.
+PROMOTION_TYPES = [QUEEN, ROOK, BISHOP, KNIGHT]
+
+COLOR_NAMES = ["W", "B"]
+PIECE_TYPE_NAMES = ["Pawn", "Rook", "Knight", "Bishop", "Queen", "King"]
+# The piece index is color * 6 + piece type, the same order as AssetsLoader uses for the images.
+PIECE_NAMES = [
+    f"{color}{piece_type}" for color in COLOR_NAMES for piece_type in PIECE_TYPE_NAMES
+]
+PIECE_TYPE_TO_INDEX_TABLE = {name: index for index, name in enumerate(PIECE_NAMES)}
+
+SQUARE_BB = [1 << square for square in range(64)]
+SQUARE_LOCATIONS = [(square % 8, square // 8) for square in range(64)]
+FULL_BB = (1 << 64) - 1
+# The algebraic names of the squares e.g. "e4".
+SQUARE_NAMES = [f"{'abcdefgh'[square % 8]}{8 - square // 8}" for square in range(64)]
+# COL_BB[x] holds every square with that x and ROW_BB[y] every square with that y.
+COL_BB = [0x0101010101010101 << x_pos for x_pos in range(8)]
+ROW_BB = [0xFF << (y_pos * 8) for y_pos in range(8)]
+
+
+def square_index(location: Tuple[INT_RANGE, INT_RANGE]) -> int:
+    """
+    Maps a (x, y) location on the board to its square index.
+
+    Parameters:
+    ----------
+    1. location : Tuple[INT_RANGE, INT_RANGE]
+        A location on the board.
+
+    Returns:
+    -------
+    int :
+        The square index of the location in the range 0-63.
+    """
+    return location[1] * 8 + location[0]
+
+
+def lsb_index(bitboard: int) -> int:
+    """
+    Gives the square index of the least significant set bit of a non empty bitboard.
+
+    Parameters:
+    ----------
+    1. bitboard : int
+        A non empty bitboard.
+
+    Returns:
+    -------
+    int :
+        The square index of the lowest set bit.
+    """
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def bitboard_squares(bitboard: int) -> Iterator[int]:
+    """
+    Yields the square index of every set bit of the bitboard from lowest to highest.
+
+    Parameters:
+    ----------
+    1. bitboard : int
+        The bitboard to walk over.
+
+    Returns:
+    -------
+    Iterator[int] :
+        The square indices of all the set bits.
+    """
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+def locations_to_bitboard(locations: List[Tuple[INT_RANGE, INT_RANGE]]) -> int:
+    """
+    Converts a list of (x, y) locations into a bitboard.
+
+    Parameters:
+    ----------
+    1. locations : List[Tuple[INT_RANGE, INT_RANGE]]
+        The locations to be set in the bitboard.
+
+    Returns:
+    -------
+    int :
+        A bitboard having a bit set for every provided location.
+    """
+    bitboard = 0
+    for location in locations:
+        bitboard |= SQUARE_BB[location[1] * 8 + location[0]]
+    return bitboard
+
+
+def bitboard_to_locations(bitboard: int) -> List[Tuple[INT_RANGE, INT_RANGE]]:
+    """
+    Converts a bitboard into a list of (x, y) locations.
+
+    Parameters:
+    ----------
+    1. bitboard : int
+        The bitboard to be converted.
+
+    Returns:
+    -------
+    List[Tuple[INT_RANGE, INT_RANGE]] :
+        The locations of all the set bits in square index order.
+    """
+    return [SQUARE_LOCATIONS[square] for square in bitboard_squares(bitboard)]
+
+
+class Position:
+    """
+    This class is the bitboard representation of the pieces on the board.
+
+    Attributes:
+    ----------
+    1. pieces : List[int]
+        One bitboard per piece index (see PIECE_NAMES).
+    2. colors : List[int]
+        The combined bitboard of all the white pieces and of all the black pieces.
+    3. occupancy : int
+        The bitboard of all the occupied squares.
+    4. mailbox : List[int]
+        The piece index standing on each of the 64 squares or EMPTY.
+    5. occupied_squares : OccupiedSquares
+        A dictionary like view mapping occupied (x, y) locations to the piece names.
+    6. key : int
+        The Zobrist key of the pieces on the board, kept up to date on every change.
+    7. middlegame_score : int
+        The material and piece-square score with the middlegame values, positive when white
+        is better, kept up to date on every change.
+    8. endgame_score : int
+        The same with the endgame values.
+    9. phase : int
+        The game phase of the pieces on the board (see Evaluation.py).
+    """
+
+    __slots__ = (
+        "pieces",
+        "colors",
+        "occupancy",
+        "mailbox",
+        "occupied_squares",
+        "key",
+        "middlegame_score",
+        "endgame_score",
+        "phase",
+    )
+
+    def __init__(
+        self, occupied_squares: Dict[Tuple[INT_RANGE, INT_RANGE], str] | None = None
+    ) -> None:
+        """
+        Initializes a Position object.
+
+        Parameters:
+        ----------
+        1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str] | None
+            A dictionary of all the occupied squares mapped to the piece occupying that square,
+            an empty board is created if it is not provided.
+        """
+        self.occupied_squares = OccupiedSquares(position=self)
+        self.reset(occupied_squares=occupied_squares or {})
+
+    def reset(self, occupied_squares: Dict[Tuple[INT_RANGE, INT_RANGE], str]) -> None:
+        """
+        Clears the board in place and places the given pieces.
+
+        Parameters:
+        ----------
+        1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
+            A dictionary of all the occupied squares mapped to the piece occupying that square.
+        """
+        self.pieces = [0] * 12
+        self.colors = [0, 0]
+        self.occupancy = 0
+        self.mailbox = [EMPTY] * 64
+        self.key = 0
+        self.middlegame_score = self.endgame_score = self.phase = 0
+        for location, piece_name in occupied_squares.items():
+            self.put_piece(
+                piece=PIECE_TYPE_TO_INDEX_TABLE[piece_name],
+                square=square_index(location),
+            )
+
+    def put_piece(self, piece: int, square: int) -> None:
+        """
+        Places a piece on the square, removing whatever was standing there.
+
+        Parameters:
+        ----------
+        1. piece : int
+            The piece index to be placed.
+        2. square : int
+            The square index to place the piece on.
+        """
+        if self.mailbox[square] != EMPTY:
+            self.remove_piece(square=square)
+        bit = SQUARE_BB[square]
+        self.pieces[piece] |= bit
+        self.colors[piece >= 6] |= bit
+        self.occupancy |= bit
+        self.mailbox[square] = piece
+        self.key ^= PIECE_KEYS[piece][square]
+        self.middlegame_score += MIDDLEGAME_PIECE_SQUARE_VALUES[piece][square]
+        self.endgame_score += ENDGAME_PIECE_SQUARE_VALUES[piece][square]
+        self.phase += PIECE_PHASES[piece]
+
+    def remove_piece(self, square: int) -> int:
+        """
+        Removes the piece standing on the square.
+
+        Parameters:
+        ----------
+        1. square : int
+            The square index to be cleared.
+
+        Returns:
+        -------
+        int :
+            The piece index that was removed or EMPTY if the square was already empty.
+        """
+        piece = self.mailbox[square]
+        if piece != EMPTY:
+            bit = SQUARE_BB[square]
+            self.pieces[piece] ^= bit
+            self.colors[piece >= 6] ^= bit
+            self.occupancy ^= bit
+            self.mailbox[square] = EMPTY
+            self.key ^= PIECE_KEYS[piece][square]
+            self.middlegame_score -= MIDDLEGAME_PIECE_SQUARE_VALUES[piece][square]
+            self.endgame_score -= ENDGAME_PIECE_SQUARE_VALUES[piece][square]
+            self.phase -= PIECE_PHASES[piece]
+        return piece
+
+
+class OccupiedSquares(MutableMapping):
+    """
+    This class is a dictionary like view of a Position keyed by (x, y) locations.
+
+    Reading it gives the same data as the old occupied_squares dictionary and
+    writing to it updates the bitboards of the position it belongs to.
+
+    Attributes:
+    ----------
+    1. position : Position
+        The position this view reads from and writes to.
+    """
+
+    __slots__ = ("position",)
+
+    def __init__(self, position: Position) -> None:
+        """
+        Initializes an OccupiedSquares object.
+
+        Parameters:
+        ----------
+        1. position : Position
+            The position to be viewed.
+        """
+        self.position = position
+
+    def __getitem__(self, location: Tuple[INT_RANGE, INT_RANGE]) -> str:
+        piece = self._piece_at(location=location)
+        if piece == EMPTY:
+            raise KeyError(location)
+        return PIECE_NAMES[piece]
+
+    def __setitem__(
+        self, location: Tuple[INT_RANGE, INT_RANGE], piece_name: str
+    ) -> None:
+        self.position.put_piece(
+            piece=PIECE_TYPE_TO_INDEX_TABLE[piece_name], square=square_index(location)
+        )
+
+    def __delitem__(self, location: Tuple[INT_RANGE, INT_RANGE]) -> None:
+        if self._piece_at(location=location) == EMPTY:
+            raise KeyError(location)
+        self.position.remove_piece(square=square_index(location))
+
+    def __contains__(self, location: object) -> bool:
+        return self._piece_at(location=location) != EMPTY
+
+    def __iter__(self) -> Iterator[Tuple[INT_RANGE, INT_RANGE]]:
+        return iter(bitboard_to_locations(self.position.occupancy))
+
+    def __len__(self) -> int:
+        return self.position.occupancy.bit_count()
+
+    def _piece_at(self, location: object) -> int:
+        # Off the board or malformed locations behave like missing keys of a dict.
+        try:
+            x_pos, y_pos = location
+        except (TypeError, ValueError):
+            return EMPTY
+        if x_pos not in range(8) or y_pos not in range(8):
+            return EMPTY
+        return self.position.mailbox[y_pos * 8 + x_pos]
+
+    def copy(self) -> Dict[Tuple[INT_RANGE, INT_RANGE], str]:
+        """
+        Creates a plain dictionary copy of the occupied squares.
+
+        Returns:
+        -------
+        Dict[Tuple[INT_RANGE, INT_RANGE], str] :
+            A dictionary of all the occupied squares mapped to the piece occupying that square.
+        """
+        return dict(self.items())
@@ -0,0 +1,258 @@
+"""
+This module draws the board, the pieces and the move markers on the screen.
+
+The renderer remembers what every square showed in the last frame, the piece
+standing on it and whether it was marked as movable. A new frame only draws the
+squares that changed again, copying their tile from a cached opaque background
+and putting the piece and the marker back on top, and only their rectangles are
+pushed to the display with pygame.display.update. A move thus redraws a few
+tiles (the squares moved from and to, the rook of a castle, the pawn
+taken en passant and the old and new move markers) instead of the whole
+window. The whole window is drawn when it was exposed or resized or when the
+message over the board changes.
+
+The board is as big as the window allows and centered in it, board_layout gives
+the square size and the position of the board for a window size.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+from typing import Dict, List, Literal, Mapping, Tuple
+
+import pygame
+import AssetsLoader
+
+
+INT_RANGE = Literal[0, 1, 2, 3, 4, 5, 6, 7]
+
+BLACK = (0, 0, 0)
+# What an empty square without a move marker shows, (piece type, marked).
+EMPTY_TILE = (None, False)
+# The squares do not get smaller than this however small the window is.
+MIN_SQUARE_SIZE = 20
+
+
+def board_layout(window_size: Tuple[int, int]) -> Tuple[int, Tuple[int, int]]:
+    """
+    Fits the board in a window.
+
+    Parameters:
+    ----------
+    1. window_size : Tuple[int, int]
+        The width and height of the window.
+
+    Returns:
+    -------
+    Tuple[int, Tuple[int, int]] :
+        The square size and the position of the top left corner of the board.
+    """
+    square_size = max(min(window_size) // 8, MIN_SQUARE_SIZE)
+    return square_size, (
+        (window_size[0] - square_size * 8) // 2,
+        (window_size[1] - square_size * 8) // 2,
+    )
+
+
+class BoardRenderer:
+    """
+    This class draws the board on a screen, redrawing only the squares that changed.
+
+    Attributes:
+    ----------
+    1. screen : pygame.Surface
+        The display surface drawn on.
+    2. assets : AssetsLoader.BoardAssets
+        The surfaces drawn, the opaque board image is copied to cover what a tile showed.
+    3. origin : Tuple[int, int]
+        The position of the top left corner of the board on the screen.
+    4. shown_tiles : Dict[Tuple[INT_RANGE, INT_RANGE], Tuple[str | None, bool]]
+        The (piece type, marked) of every square that is not empty in the last frame.
+    5. shown_message : Tuple[str, Tuple[int, int]] | None
+        The (text, position) of the message in the last frame.
+    6. full_redraw : bool
+        If True the next frame draws the whole window.
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        assets: AssetsLoader.BoardAssets,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> None:
+        """
+        Initializes a BoardRenderer object.
+
+        Parameters:
+        ----------
+        1. screen : pygame.Surface
+            The display surface drawn on.
+        2. assets : AssetsLoader.BoardAssets
+            The surfaces drawn.
+        3. origin : Tuple[int, int]
+            The position of the top left corner of the board on the screen.
+        """
+        self.screen = screen
+        self.assets = assets
+        self.origin = origin
+        self.shown_tiles = {}
+        self.shown_message = None
+        self.full_redraw = True
+
+    def invalidate(self) -> None:
+        """
+        Makes the next frame draw the whole window, e.g. after it was exposed.
+        """
+        self.full_redraw = True
+
+    def resize(
+        self,
+        screen: pygame.Surface,
+        assets: AssetsLoader.BoardAssets,
+        origin: Tuple[int, int],
+    ) -> None:
+        """
+        Draws the board with new assets at a new position from the next frame on.
+
+        Parameters:
+        ----------
+        1. screen : pygame.Surface
+            The display surface drawn on.
+        2. assets : AssetsLoader.BoardAssets
+            The surfaces drawn.
+        3. origin : Tuple[int, int]
+            The position of the top left corner of the board on the screen.
+        """
+        self.screen, self.assets, self.origin = screen, assets, origin
+        self.full_redraw = True
+
+    def square_finder(
+        self, position: Tuple[int, int]
+    ) -> Tuple[INT_RANGE, INT_RANGE] | None:
+        """
+        Finds the square shown at a position of the screen.
+
+        Parameters:
+        ----------
+        1. position : Tuple[int, int]
+            The position on the screen, e.g. of a click.
+
+        Returns:
+        -------
+        Tuple[INT_RANGE, INT_RANGE] | None :
+            The location of the square, None if the position is not on the board.
+        """
+        square_size = self.assets.square_size
+        x_pos = (position[0] - self.origin[0]) // square_size
+        y_pos = (position[1] - self.origin[1]) // square_size
+        if 0 <= x_pos < 8 and 0 <= y_pos < 8:
+            return x_pos, y_pos
+        return None
+
+    def tile_drawer(
+        self,
+        location: Tuple[INT_RANGE, INT_RANGE],
+        tile: Tuple[str | None, bool],
+    ) -> pygame.Rect:
+        """
+        Draws a single square from the background with its piece and move marker.
+
+        Parameters:
+        ----------
+        1. location : Tuple[INT_RANGE, INT_RANGE]
+            The square to draw.
+        2. tile : Tuple[str | None, bool]
+            The piece type standing on the square, None if it is empty, and if the square
+            is marked as movable.
+
+        Returns:
+        -------
+        pygame.Rect :
+            The area of the screen drawn on.
+        """
+        assets = self.assets
+        square_size = assets.square_size
+        area = pygame.Rect(
+            location[0] * square_size,
+            location[1] * square_size,
+            square_size,
+            square_size,
+        )
+        rect = area.move(self.origin)
+        self.screen.blit(assets.board, rect, area=area)
+        piece_type, marked = tile
+        position = (rect.x + assets.piece_offset, rect.y + assets.piece_offset)
+        if piece_type is not None:
+            self.screen.blit(
+                assets.pieces[AssetsLoader.PIECE_TYPE_TO_INDEX_TABLE[piece_type]],
+                position,
+            )
+        if marked:
+            self.screen.blit(assets.move_marker, position)
+        return rect
+
+    def render(
+        self,
+        occupied_squares: Mapping[Tuple[INT_RANGE, INT_RANGE], str],
+        move_list: List[Tuple[INT_RANGE, INT_RANGE]],
+        message: Tuple[str, Tuple[int, int]] | None = None,
+    ) -> List[pygame.Rect]:
+        """
+        Brings the screen up to date with the position and the move markers.
+
+        Parameters:
+        ----------
+        1. occupied_squares : Mapping[Tuple[INT_RANGE, INT_RANGE], str]
+            The occupied squares mapped to the piece occupying that square.
+        2. move_list : List[Tuple[INT_RANGE, INT_RANGE]]
+            The locations to mark as movable.
+        3. message : Tuple[str, Tuple[int, int]] | None
+            The (text, position) of a message to show over the board, e.g. the result. The
+            position is on a board of 100 pixel squares and is scaled to the square size.
+
+        Returns:
+        -------
+        List[pygame.Rect] :
+            The areas of the screen that were drawn again, empty if nothing changed.
+        """
+        tiles: Dict[Tuple[INT_RANGE, INT_RANGE], Tuple[str | None, bool]] = {
+            location: (piece_type, False)
+            for location, piece_type in occupied_squares.items()
+        }
+        for location in move_list:
+            tiles[location] = (tiles.get(location, EMPTY_TILE)[0], True)
+
+        if self.full_redraw or message != self.shown_message:
+            assets, origin = self.assets, self.origin
+            self.screen.fill(BLACK)
+            self.screen.blit(assets.board, origin)
+            for location, tile in tiles.items():
+                self.tile_drawer(location=location, tile=tile)
+            if message is not None:
+                self.screen.blit(
+                    assets.font.render(message[0], False, BLACK),
+                    (
+                        origin[0] + message[1][0] * assets.square_size // 100,
+                        origin[1] + message[1][1] * assets.square_size // 100,
+                    ),
+                )
+            pygame.display.flip()
+            self.full_redraw = False
+            self.shown_tiles, self.shown_message = tiles, message
+            return [self.screen.get_rect()]
+
+        shown_tiles = self.shown_tiles
+        dirty_rects = [
+            self.tile_drawer(location=location, tile=tiles.get(location, EMPTY_TILE))
+            for location in shown_tiles.keys() | tiles.keys()
+            if shown_tiles.get(location, EMPTY_TILE) != tiles.get(location, EMPTY_TILE)
+        ]
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        self.shown_tiles = tiles
+        return dirty_rects
@@ -1,915 +1,1772 @@
-"""
-This module handles the creation of the all possible moveable
-locations of a piece and checking for attacks from opponent pieces 
-on any square.
-
-Author: Anand Maurya
-Github: Syntax-Programmer
-Email: anand6308anand@gmail.com
-"""
-
-__author__ = "Anand Maurya/ Syntax-Programmer"
-__email__ = "anand6308anand@gmail.com"
-
-
-from typing import List, Tuple, Dict, Literal
-
-
-INT_RANGE = Literal[0, 1, 2, 3, 4, 5, 6, 7]
-
-
-def pawn_address(
-    sq_index: Tuple[INT_RANGE, INT_RANGE], move_count: int
-) -> Tuple[
-    List[Tuple[INT_RANGE, INT_RANGE] | None], List[Tuple[INT_RANGE, INT_RANGE] | None]
-]:
-    """
-    Creates a general movable locations of a pawn.
-
-    Takes in a sq_index and creates all possible locations a pawn on that given sq_index can move to.\n
-    OR\n
-    An opponent pawn on the created locations can attack the provided sq_index.
-
-    Parameters:
-    ----------
-    1. sq_index : Tuple[INT_RANGE, INT_RANGE]
-        A location on the board w.r.t the address is to be made.
-    2. move_count : int
-        The move number going on.
-
-    Returns:
-    -------
-    Tuple[\n
-    List[Tuple[INT_RANGE, INT_RANGE] | None], \n
-    List[Tuple[INT_RANGE, INT_RANGE] | None]\n
-    ] :\n
-        Creates two lists :\n
-        1. List1 : A pawn on the provided sq_index can move to.\n
-        2. List2 : A pawn on the provided sq_index can capture an opponent piece to,\n
-                OR\n
-                An opponent pawn on the created locations can attack the provided sq_index.
-    """
-    movement_direction = -1 if move_count % 2 == 0 else 1
-    moving_address = [
-        (sq_index[0], sq_index[1] + (step * movement_direction))
-        for step in [1, 2]
-        if sq_index[1] + (step * movement_direction) in range(8)
-    ]
-    capturing_address = [
-        (sq_index[0] + step, sq_index[1] + movement_direction)
-        for step in [1, -1]
-        if sq_index[0] + step in range(8)
-        and sq_index[1] + movement_direction in range(8)
-    ]
-    return moving_address, capturing_address
-
-
-def knight_address(
-    sq_index: Tuple[INT_RANGE, INT_RANGE]
-) -> List[Tuple[INT_RANGE, INT_RANGE]]:
-    """
-    Creates a general movable locations of a knight.
-
-    Takes in a sq_index and creates all possible locations a knight on that given sq_index can move to.\n
-    OR\n
-    An opponent knight on the created locations can attack the provided sq_index.
-
-    Parameters:
-    ----------
-    1. sq_index : Tuple[INT_RANGE, INT_RANGE]
-        A location on the board w.r.t the address is to be made.
-
-    Returns:
-    -------
-    List[Tuple[INT_RANGE, INT_RANGE]] :
-        Creates general move list where a knight on provided sq_index can move to.\n
-        OR\n
-        An opponent knight on the created squares can attack the given sq_index.
-    """
-    address = [
-        (sq_index[0] + 2, sq_index[1] + 1),
-        (sq_index[0] + 2, sq_index[1] - 1),
-        (sq_index[0] - 2, sq_index[1] + 1),
-        (sq_index[0] - 2, sq_index[1] - 1),
-        (sq_index[0] + 1, sq_index[1] + 2),
-        (sq_index[0] - 1, sq_index[1] + 2),
-        (sq_index[0] + 1, sq_index[1] - 2),
-        (sq_index[0] - 1, sq_index[1] - 2),
-    ]
-    return list(
-        filter(
-            lambda locations: locations[0] in range(8) and locations[1] in range(8),
-            address,
-        )
-    )
-
-
-def king_address(
-    sq_index: Tuple[INT_RANGE, INT_RANGE]
-) -> List[Tuple[INT_RANGE, INT_RANGE]]:
-    """
-    Creates a general movable locations of a king.
-
-    Takes in a sq_index and creates all possible locations a king on that given sq_index can move to.\n
-    OR\n
-    An opponent king on the created locations can attack the provided sq_index.
-
-    Parameters:
-    ----------
-    1. sq_index : Tuple[INT_RANGE, INT_RANGE]
-        A location on the board w.r.t the address is to be made.
-
-    Returns:
-    -------
-    List[Tuple[INT_RANGE, INT_RANGE]] :
-        Creates general move list where a king on provided sq_index can move to.\n
-        OR\n
-        An opponent king on the created squares can attack the given sq_index.
-    """
-    address = [
-        (sq_index[0] + 1, sq_index[1]),
-        (sq_index[0] - 1, sq_index[1]),
-        (sq_index[0], sq_index[1] + 1),
-        (sq_index[0], sq_index[1] - 1),
-        (sq_index[0] + 1, sq_index[1] - 1),
-        (sq_index[0] - 1, sq_index[1] - 1),
-        (sq_index[0] - 1, sq_index[1] + 1),
-        (sq_index[0] + 1, sq_index[1] + 1),
-    ]
-    return list(
-        filter(
-            lambda locations: locations[0] in range(8) and locations[1] in range(8),
-            address,
-        )
-    )
-
-
-def sliding_address_filter(
-    constructor: Tuple[INT_RANGE, INT_RANGE],
-    to_filter: List[Tuple[INT_RANGE, INT_RANGE]],
-    occupied_squares: Dict[Tuple[INT_RANGE, INT_RANGE], str],
-) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
-    """
-    Filter the given general address of a sliding piece.
-
-    Takes in a generally made sliding address and restricts it to only those squares
-    that the piece on the provided constructor can move to.
-
-    Parameters:
-    ----------
-    1. constructor : Tuple[INT_RANGE, INT_RANGE]
-        A location on the board w.r.t the address was made.
-    2. to_filter : List[Tuple[INT_RANGE, INT_RANGE]]
-        A address that was made w.r.t constructor and is to be filtered.
-    3. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-        A dictionary of all the occupied squares mapped to the piece occupying that square.
-
-    Returns:
-    -------
-    List[Tuple[INT_RANGE, INT_RANGE]] :
-        The filtered address only containing the reachable squares
-    """
-    left_reach_index = 0
-    right_reach_index = len(to_filter) - 1
-    constructor_index = to_filter.index(constructor)
-    for indices in range(len(to_filter)):
-        if indices < constructor_index and to_filter[indices] in occupied_squares:
-            left_reach_index = indices
-        if indices > constructor_index and to_filter[indices] in occupied_squares:
-            right_reach_index = indices
-            # Because we need the first occurrence of a piece to the right of the gives constructor.
-            break
-    to_filter = to_filter[left_reach_index : right_reach_index + 1]
-    # Because a piece can't move to it's own location.
-    to_filter.remove(constructor)
-    return to_filter
-
-
-def straight_sliding_address(
-    sq_index: Tuple[INT_RANGE, INT_RANGE],
-    occupied_squares: Dict[Tuple[INT_RANGE, INT_RANGE], str],
-) -> Tuple[
-    List[Tuple[INT_RANGE, INT_RANGE] | None], List[Tuple[INT_RANGE, INT_RANGE] | None]
-]:
-    """
-    Creates a general movable locations of a rook/queen.
-
-    Takes in a sq_index and creates all possible locations a rook/queen on that given sq_index can move to.\n
-    OR\n
-    An opponent rook/queen on the created locations can attack the provided sq_index.
-
-    Parameters:
-    ----------
-    1. sq_index : Tuple[INT_RANGE, INT_RANGE]
-        A location on the board w.r.t the address is to be made.
-    2. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-        A dictionary of all the occupied squares mapped to the piece occupying that square.
-
-    Returns:
-    -------
-    Tuple[
-    List[Tuple[INT_RANGE, INT_RANGE] | None], List[Tuple[INT_RANGE, INT_RANGE] | None]
-    ] :\n
-        Creates two lists :\n
-        1. List1 : All the reachable squares in the same row as the rook/queen.\n
-                OR\n
-                An opponent rook/queen on the created locations can attack the provided sq_index.\n
-        2. List2 : All the reachable squares in the same col as the rook/queen.\n
-                OR\n
-                An opponent rook/queen on the created locations can attack the provided sq_index.
-    """
-    # No out of the board indices filter needed because it is already controlled.
-    piece_row = [(x_pos, sq_index[1]) for x_pos in range(8)]
-    piece_col = [(sq_index[0], y_pos) for y_pos in range(8)]
-    return (
-        sliding_address_filter(
-            constructor=sq_index, to_filter=piece_row, occupied_squares=occupied_squares
-        ),
-        sliding_address_filter(
-            constructor=sq_index, to_filter=piece_col, occupied_squares=occupied_squares
-        ),
-    )
-
-
-def diagonal_sliding_address(
-    sq_index: Tuple[INT_RANGE, INT_RANGE],
-    occupied_squares: Dict[Tuple[INT_RANGE, INT_RANGE], str],
-) -> Tuple[
-    List[Tuple[INT_RANGE, INT_RANGE] | None], List[Tuple[INT_RANGE, INT_RANGE] | None]
-]:
-    """
-    Creates a general movable locations of a bishop/queen.
-
-    Takes in a sq_index and creates all possible locations a bishop/queen on that given sq_index can move to.
-    OR
-    An opponent bishop/queen on the created locations can attack the provided sq_index.
-
-    Parameters:
-    ----------
-    1. sq_index : Tuple[INT_RANGE, INT_RANGE]
-        A location on the board w.r.t the address is to be made.
-    2. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-        A dictionary of all the occupied squares mapped to the piece occupying that square.
-
-    Returns:
-    -------
-    Tuple[
-    List[Tuple[INT_RANGE, INT_RANGE] | None], List[Tuple[INT_RANGE, INT_RANGE] | None]
-    ] :\n
-        Creates two lists :\n
-        1. List1 : All the reachable squares in the same anti-diagonal as the bishop/queen.\n
-                OR\n
-                An opponent rook/queen on the created locations can attack the provided sq_index.\n
-        2. List2 : All the reachable squares in the same main-diagonal as the bishop/queen.\n
-                OR\n
-                An opponent rook/queen on the created locations can attack the provided sq_index.
-    """
-    piece_diagonal1 = [
-        (sq_index[0] + step, sq_index[1] - step)
-        for step in range(-7, 8)
-        if sq_index[0] + step in range(8) and sq_index[1] - step in range(8)
-    ]
-    piece_diagonal2 = [
-        (sq_index[0] + step, sq_index[1] + step)
-        for step in range(-7, 8)
-        if sq_index[0] + step in range(8) and sq_index[1] + step in range(8)
-    ]
-    return (
-        sliding_address_filter(
-            constructor=sq_index,
-            to_filter=piece_diagonal1,
-            occupied_squares=occupied_squares,
-        ),
-        sliding_address_filter(
-            constructor=sq_index,
-            to_filter=piece_diagonal2,
-            occupied_squares=occupied_squares,
-        ),
-    )
-
-
-class IsAttacked:
-    """
-    This class determines if a given square or the king is attacked by any opponent pieces on the chessboard.
-
-    Attributes:
-    ----------
-    1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-        A dictionary of all the occupied squares mapped to the piece occupying that square.
-    2. white_king_location : Tuple[INT_RANGE, INT_RANGE]
-        The location of the white king.
-    3. black_king_location : Tuple[INT_RANGE, INT_RANGE]
-        The location of the black king.
-    """
-
-    def __init__(
-        self, occupied_squares: Dict[Tuple[INT_RANGE, INT_RANGE], str]
-    ) -> None:
-        """
-        Initializes an IsAttacked object.
-
-        Parameters:
-        ----------
-        1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-            A dictionary of all the occupied squares mapped to the piece occupying that square.
-        """
-        self.occupied_squares = occupied_squares
-        self.white_king_location = (4, 7)
-        self.black_king_location = (4, 0)
-
-    def attacked_by_non_sliding_pieces(
-        self, location_to_check: Tuple[INT_RANGE, INT_RANGE], move_count: int
-    ) -> bool:
-        """
-        Checks if the provided location_to_check is attacked by a pawn or a knight.
-
-        Takes the location_to_check and creates all valid addresses and then checks for
-        attacking piece in them.
-
-        Parameters:
-        ----------
-        1. location_to_check : Tuple[INT_RANGE, INT_RANGE]
-            A location on the board that has to be checked.
-        2. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        bool :
-            True if the provided location_to_check is attacked by a pawn or a knight.
-        """
-        sq_pawn_attacking = pawn_address(
-            sq_index=location_to_check, move_count=move_count
-        )[1]
-        sq_knight_attacking = knight_address(sq_index=location_to_check)
-        opponent_color = "B" if move_count % 2 == 0 else "W"
-        return any(
-            self.occupied_squares.get(locations) == f"{opponent_color}Pawn"
-            for locations in sq_pawn_attacking
-        ) or any(
-            self.occupied_squares.get(locations) == f"{opponent_color}Knight"
-            for locations in sq_knight_attacking
-        )
-
-    def attacked_by_sliding_pieces(
-        self, location_to_check: Tuple[INT_RANGE, INT_RANGE], move_count: int
-    ) -> bool:
-        """
-        Checks if the provided location_to_check is attacked by a rook or a bishop or a queen.
-
-        Takes the location_to_check and creates all valid addresses and then checks for
-        attacking piece in them.
-
-        Parameters:
-        ----------
-        1. location_to_check : Tuple[INT_RANGE, INT_RANGE]
-            A location on the board that has to be checked.
-        2. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        bool :
-            True if the provided location_to_check is attacked by a rook or a bishop or a queen.
-        """
-        piece_row, piece_col = straight_sliding_address(
-            sq_index=location_to_check, occupied_squares=self.occupied_squares
-        )
-        piece_diagonal1, piece_diagonal2 = diagonal_sliding_address(
-            sq_index=location_to_check, occupied_squares=self.occupied_squares
-        )
-        # The if-else used to correct the indexation error in empty address(if empty address was created).
-        sq_straight_sliding_attacking, sq_diagonal_sliding_attacking = (
-            ((piece_row[0], piece_row[-1]) if piece_row else ())
-            + ((piece_col[0], piece_col[-1]) if piece_col else ()),
-            ((piece_diagonal1[0], piece_diagonal1[-1]) if piece_diagonal1 else ())
-            + ((piece_diagonal2[0], piece_diagonal2[-1]) if piece_diagonal2 else ()),
-        )
-        opponent_color = "B" if move_count % 2 == 0 else "W"
-        return any(
-            self.occupied_squares.get(locations)
-            in [f"{opponent_color}Rook", f"{opponent_color}Queen"]
-            for locations in sq_straight_sliding_attacking
-        ) or any(
-            self.occupied_squares.get(locations)
-            in [f"{opponent_color}Bishop", f"{opponent_color}Queen"]
-            for locations in sq_diagonal_sliding_attacking
-        )
-
-    def attacked_by_king(
-        self, location_to_check: Tuple[INT_RANGE, INT_RANGE], move_count: int
-    ) -> bool:
-        """
-        Checks if the provided location_to_check is attacked by a king.
-
-        Takes the location_to_check and creates all valid addresses and then checks for
-        attacking piece in them.
-
-        Parameters:
-        ----------
-        1. location_to_check : Tuple[INT_RANGE, INT_RANGE]
-            A location on the board that has to be checked.
-        2. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        bool :
-            True if the provided location_to_check is attacked by a king.
-        """
-        opponent_color = "B" if move_count % 2 == 0 else "W"
-        from_king_attacking = king_address(sq_index=location_to_check)
-        return any(
-            self.occupied_squares.get(locations) == f"{opponent_color}King"
-            for locations in from_king_attacking
-        )
-
-    def is_own_king_attacked(self, move_count: int) -> bool:
-        """
-        Checks if the king of the current side is attacked.
-
-        Takes the move count to determine the side and check if the king of that side is attacked.
-
-        Parameters:
-        ----------
-        1. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        bool :
-            True if the king of the current side is attacked by every piece other than a king.
-        """
-        king_location = (
-            self.white_king_location
-            if move_count % 2 == 0
-            else self.black_king_location
-        )
-        own_color = "W" if move_count % 2 == 0 else "B"
-        # Check if the current king location is in consistent with the actual data.
-        # If not then it corrects it.
-        # Done like this to save computation.
-        if self.occupied_squares.get(king_location) != f"{own_color}King":
-            for locations in self.occupied_squares:
-                if self.occupied_squares[locations] == f"{own_color}King":
-                    king_location = locations
-                    if own_color == "W":
-                        self.white_king_location = locations
-                    else:
-                        self.black_king_location = locations
-                    break
-        return self.attacked_by_non_sliding_pieces(
-            location_to_check=king_location, move_count=move_count
-        ) or self.attacked_by_sliding_pieces(
-            location_to_check=king_location, move_count=move_count
-        )
-
-
-class MoveList(IsAttacked):
-    """
-    This class determines all the possible locations that a piece on the provided square
-    can move to.
-
-    Attributes:
-    ----------
-    1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-        A dictionary of all the occupied squares mapped to the piece occupying that square.
-    2. white_king_location : Tuple[INT_RANGE, INT_RANGE]
-        The location of the white king.
-    3. black_king_location : Tuple[INT_RANGE, INT_RANGE]
-        The location of the black king.
-    4. white_short_castle : bool
-        The right of wether the white side can castle short.
-    5. white_long_castle : bool
-        The right of wether the white side can castle long.
-    6. black_short_castle : bool
-        The right of wether the black side can castle short.
-    7. black_long_castle : bool
-        The right of wether the black side can castle long.
-    """
-
-    def __init__(
-        self, occupied_squares: Dict[Tuple[INT_RANGE, INT_RANGE], str]
-    ) -> None:
-        """
-        Initializes an MoveList object.
-
-        Parameters:
-        ----------
-        1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-            A dictionary of all the occupied squares mapped to the piece occupying that square.
-        """
-        self.white_short_castle = self.white_long_castle = True
-        self.black_short_castle = self.black_long_castle = True
-        super().__init__(occupied_squares=occupied_squares)
-
-    def squares_that_put_king_in_check_remover(
-        self,
-        piece_location: Tuple[INT_RANGE, INT_RANGE],
-        to_filter: List[Tuple[INT_RANGE, INT_RANGE] | None],
-        move_count: int,
-    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
-        """
-        Filters out all the squares that put king in check.
-
-        The functions removes all the squares to which the piece on the provided piece_location
-        if moves to puts their own king in check.
-
-        Parameters:
-        ----------
-        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
-            A location of the piece w.r.t the to_filter was made.
-        2. to_filter : List[Tuple[INT_RANGE, INT_RANGE] | None]
-            A address that was made w.r.t piece_location.
-        3. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        List[Tuple[INT_RANGE, INT_RANGE] | None] :
-            A single list of all the possible squares that piece on the provided piece_location
-            can finally move to.
-        """
-        occupied_squares_cache = self.occupied_squares.copy()
-        piece_present = self.occupied_squares[piece_location]
-        for location in to_filter[:]:
-            self.occupied_squares.pop(piece_location)
-            self.occupied_squares[location] = piece_present
-            if self.is_own_king_attacked(move_count=move_count):
-                to_filter.remove(location)
-            self.occupied_squares = occupied_squares_cache.copy()
-        return to_filter
-
-    def pawn_move_list(
-        self, piece_location: Tuple[INT_RANGE, INT_RANGE], move_count: int
-    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
-        """
-        Creates all the possible locations a piece on provided piece_location can move to.
-
-        The general address of a pawn is filtered to remove squares holding the same side piece,
-        squares that put the king in check and finally gives the list of locations a pawn on the
-        provided piece_location can move to.
-
-        Parameters:
-        ----------
-        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
-            A location of the piece w.r.t the address is to be made.
-        2. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        List[Tuple[INT_RANGE, INT_RANGE] | None] :
-            A final list of locations that a pawn on the provided sq_index can move to.
-        """
-        own_color = "W" if move_count % 2 == 0 else "B"
-        moving_list, capturing_list = pawn_address(
-            sq_index=piece_location, move_count=move_count
-        )
-        if moving_list[0] in self.occupied_squares:
-            moving_list.clear()
-        elif moving_list[1] in self.occupied_squares or not (
-            (piece_location[1] == 6 and own_color == "W")
-            or (piece_location[1] == 1 and own_color == "B")
-        ):
-            moving_list.pop(1)
-        capturing_list = list(
-            filter(
-                lambda locations: locations in self.occupied_squares
-                and self.occupied_squares[locations][0] != own_color,
-                capturing_list,
-            )
-        )
-        return self.squares_that_put_king_in_check_remover(
-            piece_location=piece_location, to_filter=moving_list, move_count=move_count
-        ) + self.squares_that_put_king_in_check_remover(
-            piece_location=piece_location,
-            to_filter=capturing_list,
-            move_count=move_count,
-        )
-
-    def knight_move_list(
-        self, piece_location: Tuple[INT_RANGE, INT_RANGE], move_count: int
-    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
-        """
-        Creates all the possible locations a piece on provided piece_location can move to.
-
-        The general address of a knight is filtered to remove squares holding the same side piece,
-        squares that put the king in check and finally gives the list of locations a knight on the
-        provided piece_location can move to.
-
-        Parameters:
-        ----------
-        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
-            A location of the piece w.r.t the address is to be made.
-        2. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        List[Tuple[INT_RANGE, INT_RANGE] | None] :
-            A final list of locations that a knight on the provided sq_index can move to.
-        """
-        own_color = "W" if move_count % 2 == 0 else "B"
-        move_list = knight_address(sq_index=piece_location)
-        move_list = list(
-            filter(
-                lambda locations: locations not in self.occupied_squares
-                or self.occupied_squares[locations][0] != own_color,
-                move_list,
-            )
-        )
-        return self.squares_that_put_king_in_check_remover(
-            piece_location=piece_location, to_filter=move_list, move_count=move_count
-        )
-
-    def king_move_list(
-        self, piece_location: Tuple[INT_RANGE, INT_RANGE], move_count: int
-    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
-        """
-        Creates all the possible locations a piece on provided piece_location can move to.
-
-        The general address of a king is filtered to remove squares holding the same side piece,
-        squares that put the king in check and finally gives the list of locations a king on the
-        provided piece_location can move to.
-
-        Parameters:
-        ----------
-        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
-            A location of the piece w.r.t the address is to be made.
-        2. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        List[Tuple[INT_RANGE, INT_RANGE] | None] :
-            A final list of locations that a king on the provided sq_index can move to.
-        """
-
-        def castle_move_list_maker(
-            move_count: int,
-        ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
-            """
-            Creates those location where king moves to in a castle.
-
-            Creates the general move_list and then filters it out according to the
-            conditions of castling.
-
-            Parameters:
-            ----------
-            1. move_count : int
-                The move number going on.
-
-            Returns:
-            -------
-            List[Tuple[INT_RANGE, INT_RANGE] | None] :
-                A list of locations where the king can possibly castle to.
-            """
-            castle_table = {
-                "W": {
-                    (6, 7): [[(5, 7), (6, 7)], [(4, 7), (5, 7), (6, 7)]],
-                    (2, 7): [[(3, 7), (2, 7), (1, 7)], [(4, 7), (3, 7), (2, 7)]],
-                },
-                "B": {
-                    (6, 0): [[(5, 0), (6, 0)], [(4, 0), (5, 0), (6, 0)]],
-                    (2, 0): [[(3, 0), (2, 0), (1, 0)], [(4, 0), (3, 0), (2, 0)]],
-                },
-            }
-            short_right, long_right = (
-                (self.white_short_castle, self.white_long_castle)
-                if move_count % 2 == 0
-                else (
-                    self.black_short_castle,
-                    self.black_long_castle,
-                )
-            )
-            own_color = "W" if move_count % 2 == 0 else "B"
-            row = 7 if move_count % 2 == 0 else 0
-            move_list = [(6, row), (2, row)]
-            if not short_right:
-                move_list.pop(0)
-            if not long_right:
-                move_list.pop(-1)
-            castle_data = castle_table[own_color]
-            for locations in move_list[:]:
-                castle_type_data = castle_data[locations]
-                if any(
-                    squares in self.occupied_squares for squares in castle_type_data[0]
-                ) or any(
-                    self.attacked_by_king(
-                        location_to_check=squares, move_count=move_count
-                    )
-                    or self.attacked_by_non_sliding_pieces(
-                        location_to_check=squares, move_count=move_count
-                    )
-                    or self.attacked_by_sliding_pieces(
-                        location_to_check=squares, move_count=move_count
-                    )
-                    for squares in castle_type_data[1]
-                ):
-                    move_list.remove(locations)
-            return move_list
-
-        own_color = "W" if move_count % 2 == 0 else "B"
-        move_list = king_address(sq_index=piece_location)
-        move_list = list(
-            filter(
-                lambda locations: (
-                    locations not in self.occupied_squares
-                    or self.occupied_squares[locations][0] != own_color
-                )
-                and not self.attacked_by_king(
-                    location_to_check=locations, move_count=move_count
-                )
-                and not self.attacked_by_non_sliding_pieces(
-                    location_to_check=locations, move_count=move_count
-                )
-                and not self.attacked_by_sliding_pieces(
-                    location_to_check=locations, move_count=move_count
-                ),
-                move_list,
-            )
-        )
-        return move_list + castle_move_list_maker(move_count=move_count)
-
-    def sliding_pieces_move_list(
-        self,
-        piece_location: Tuple[INT_RANGE, INT_RANGE],
-        move_count: int,
-        piece_type: Literal["s", "d"],
-    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
-        """
-        Creates all the possible locations a piece on provided piece_location can move to.
-
-        The general address of a rook/queen/bishop is filtered to remove squares holding the same side piece,
-        squares that put the king in check and finally gives the list of locations a rook/queen/bishop on the
-        provided piece_location can move to.
-
-        Parameters:
-        ----------
-        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
-            A location of the piece w.r.t the address is to be made.
-        2. move_count : int
-            The move number going on.
-
-        Returns:
-        -------
-        List[Tuple[INT_RANGE, INT_RANGE] | None] :
-            A final list of locations that a rook/queen/bishop on the provided sq_index can move to.
-        """
-        own_color = "W" if move_count % 2 == 0 else "B"
-        move_list1, move_list2 = (
-            straight_sliding_address(
-                sq_index=piece_location, occupied_squares=self.occupied_squares
-            )
-            if piece_type == "s"
-            else diagonal_sliding_address(
-                sq_index=piece_location, occupied_squares=self.occupied_squares
-            )
-        )
-        move_list1, move_list2 = list(
-            filter(
-                lambda locations: locations not in self.occupied_squares
-                or self.occupied_squares[locations][0] != own_color,
-                move_list1,
-            )
-        ), list(
-            filter(
-                lambda locations: locations not in self.occupied_squares
-                or self.occupied_squares[locations][0] != own_color,
-                move_list2,
-            )
-        )
-        return self.squares_that_put_king_in_check_remover(
-            piece_location=piece_location,
-            to_filter=move_list1,
-            move_count=move_count,
-        ) + self.squares_that_put_king_in_check_remover(
-            piece_location=piece_location,
-            to_filter=move_list2,
-            move_count=move_count,
-        )
-
-
-class Main(MoveList):
-    """
-    This class is the main class that interfaces with the user input.
-
-    Attributes:
-    ----------
-    1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-        A dictionary of all the occupied squares mapped to the piece occupying that square.
-    2. white_king_location : Tuple[INT_RANGE, INT_RANGE]
-        The location of the white king.
-    3. black_king_location : Tuple[INT_RANGE, INT_RANGE]
-        The location of the black king.
-    4. move_count : int
-        The current move number going on.
-    5. white_short_castle : bool
-        The right of wether the white side can castle short.
-    6. white_long_castle : bool
-        The right of wether the white side can castle long.
-    7. black_short_castle : bool
-        The right of wether the black side can castle short.
-    8. black_long_castle : bool
-        The right of wether the black side can castle long.
-    9. move_list : List[Tuple[INT_RANGE, INT_RANGE] | None]
-        The locations of possible movable locations of a given piece.
-    """
-
-    def __init__(self) -> None:
-        """
-        Initializes an Main object.
-        """
-        self.occupied_squares = {
-            (0, 6): "WPawn",
-            (1, 6): "WPawn",
-            (2, 6): "WPawn",
-            (3, 6): "WPawn",
-            (4, 6): "WPawn",
-            (5, 6): "WPawn",
-            (6, 6): "WPawn",
-            (7, 6): "WPawn",
-            (0, 7): "WRook",
-            (7, 7): "WRook",
-            (1, 7): "WKnight",
-            (6, 7): "WKnight",
-            (2, 7): "WBishop",
-            (5, 7): "WBishop",
-            (3, 7): "WQueen",
-            (4, 7): "WKing",
-            (0, 1): "BPawn",
-            (1, 1): "BPawn",
-            (2, 1): "BPawn",
-            (3, 1): "BPawn",
-            (4, 1): "BPawn",
-            (5, 1): "BPawn",
-            (6, 1): "BPawn",
-            (7, 1): "BPawn",
-            (0, 0): "BRook",
-            (7, 0): "BRook",
-            (1, 0): "BKnight",
-            (6, 0): "BKnight",
-            (2, 0): "BBishop",
-            (5, 0): "BBishop",
-            (3, 0): "BQueen",
-            (4, 0): "BKing",
-        }
-        self.move_count = 0
-        self.move_list = []
-        self.move_list_mapping_table = {
-            "Pawn": lambda location, move_count: self.pawn_move_list(
-                piece_location=location, move_count=move_count
-            ),
-            "Rook": lambda location, move_count: self.sliding_pieces_move_list(
-                piece_location=location,
-                move_count=move_count,
-                piece_type="s",
-            ),
-            "Knight": lambda location, move_count: self.knight_move_list(
-                piece_location=location, move_count=move_count
-            ),
-            "Bishop": lambda location, move_count: self.sliding_pieces_move_list(
-                piece_location=location,
-                move_count=move_count,
-                piece_type="d",
-            ),
-            "Queen": lambda location, move_count: self.sliding_pieces_move_list(
-                piece_location=location,
-                move_count=move_count,
-                piece_type="s",
-            )
-            + self.sliding_pieces_move_list(
-                piece_location=location,
-                move_count=move_count,
-                piece_type="d",
-            ),
-            "King": lambda location, move_count: self.king_move_list(
-                piece_location=location, move_count=move_count
-            ),
-        }
-        super().__init__(occupied_squares=self.occupied_squares)
-
-    def logic(self, mouse_grid_pos: Tuple[INT_RANGE, INT_RANGE]) -> None:
-        """
-        This function takes in a user click pos and creates appropriate move list.
-
-        Takes the user click pos and determines if the click is valid to act upon,
-        if yes then then creates the appropriate move_list else the click is ignored.
-
-        Parameters:
-        ----------
-        1. mouse_grid_pos: Tuple[INT_RANGE, INT_RANGE]
-            The click of them user mapped to a certain square on the board.
-        """
-
-        own_color = "W" if self.move_count % 2 == 0 else "B"
-        if (
-            mouse_grid_pos not in self.occupied_squares
-            or self.occupied_squares[mouse_grid_pos][0] != own_color
-        ):
-            self.move_list = []
-        else:
-            self.move_list = self.move_list_mapping_table[
-                self.occupied_squares[mouse_grid_pos][1:]
-            ](location=mouse_grid_pos, move_count=self.move_count)
+"""
+This module handles the creation of the all possible moveable
+locations of a piece and checking for attacks from opponent pieces 
+on any square.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+from functools import reduce
+from operator import or_, xor
+from typing import Callable, List, Tuple, Dict, Literal
+from Bitboard import (
+    BISHOP,
+    FULL_BB,
+    KING,
+    KNIGHT,
+    PAWN,
+    PROMOTION_TYPES,
+    QUEEN,
+    ROOK,
+    EMPTY,
+    SQUARE_BB,
+    SQUARE_LOCATIONS,
+    SQUARE_NAMES,
+    Position,
+    bitboard_squares,
+    bitboard_to_locations,
+    lsb_index,
+)
+from MoveCache import MOVE_LIST_CACHE_BYTES, MoveListCache
+from Zobrist import (
+    CASTLING_KEYS,
+    EN_PASSANT_KEYS,
+    SIDE_KEY,
+    zobrist_key_maker,
+)
+from Attacks import (
+    BETWEEN,
+    KING_ADDRESS_TABLE,
+    KING_ATTACKS,
+    KNIGHT_ADDRESS_TABLE,
+    KNIGHT_ATTACKS,
+    PAWN_ATTACKS,
+    PAWN_CAPTURING_ADDRESS_TABLE,
+    LINE,
+    PAWN_MOVING_ADDRESS_TABLE,
+    bishop_attacks,
+    piece_attacks,
+    queen_attacks,
+    rook_attacks,
+)
+
+
+INT_RANGE = Literal[0, 1, 2, 3, 4, 5, 6, 7]
+
+
+def pawn_address(
+    sq_index: Tuple[INT_RANGE, INT_RANGE], move_count: int
+) -> Tuple[
+    List[Tuple[INT_RANGE, INT_RANGE] | None], List[Tuple[INT_RANGE, INT_RANGE] | None]
+]:
+    """
+    Creates a general movable locations of a pawn.
+
+    Takes in a sq_index and reads from the precomputed tables all possible locations a pawn on that given sq_index can move to.\n
+    OR\n
+    An opponent pawn on the created locations can attack the provided sq_index.
+
+    Parameters:
+    ----------
+    1. sq_index : Tuple[INT_RANGE, INT_RANGE]
+        A location on the board w.r.t the address is to be made.
+    2. move_count : int
+        The move number going on.
+
+    Returns:
+    -------
+    Tuple[\n
+    List[Tuple[INT_RANGE, INT_RANGE] | None], \n
+    List[Tuple[INT_RANGE, INT_RANGE] | None]\n
+    ] :\n
+        Creates two lists :\n
+        1. List1 : A pawn on the provided sq_index can move to.\n
+        2. List2 : A pawn on the provided sq_index can capture an opponent piece to,\n
+                OR\n
+                An opponent pawn on the created locations can attack the provided sq_index.
+    """
+    square = sq_index[1] * 8 + sq_index[0]
+    return (
+        list(PAWN_MOVING_ADDRESS_TABLE[move_count % 2][square]),
+        list(PAWN_CAPTURING_ADDRESS_TABLE[move_count % 2][square]),
+    )
+
+
+def knight_address(
+    sq_index: Tuple[INT_RANGE, INT_RANGE]
+) -> List[Tuple[INT_RANGE, INT_RANGE]]:
+    """
+    Creates a general movable locations of a knight.
+
+    Takes in a sq_index and reads from the precomputed tables all possible locations a knight on that given sq_index can move to.\n
+    OR\n
+    An opponent knight on the created locations can attack the provided sq_index.
+
+    Parameters:
+    ----------
+    1. sq_index : Tuple[INT_RANGE, INT_RANGE]
+        A location on the board w.r.t the address is to be made.
+
+    Returns:
+    -------
+    List[Tuple[INT_RANGE, INT_RANGE]] :
+        Creates general move list where a knight on provided sq_index can move to.\n
+        OR\n
+        An opponent knight on the created squares can attack the given sq_index.
+    """
+    return list(KNIGHT_ADDRESS_TABLE[sq_index[1] * 8 + sq_index[0]])
+
+
+def king_address(
+    sq_index: Tuple[INT_RANGE, INT_RANGE]
+) -> List[Tuple[INT_RANGE, INT_RANGE]]:
+    """
+    Creates a general movable locations of a king.
+
+    Takes in a sq_index and reads from the precomputed tables all possible locations a king on that given sq_index can move to.\n
+    OR\n
+    An opponent king on the created locations can attack the provided sq_index.
+
+    Parameters:
+    ----------
+    1. sq_index : Tuple[INT_RANGE, INT_RANGE]
+        A location on the board w.r.t the address is to be made.
+
+    Returns:
+    -------
+    List[Tuple[INT_RANGE, INT_RANGE]] :
+        Creates general move list where a king on provided sq_index can move to.\n
+        OR\n
+        An opponent king on the created squares can attack the given sq_index.
+    """
+    return list(KING_ADDRESS_TABLE[sq_index[1] * 8 + sq_index[0]])
+
+
+def encode_move(
+    move_from: Tuple[INT_RANGE, INT_RANGE],
+    move_to: Tuple[INT_RANGE, INT_RANGE],
+    promotion: int = PAWN,
+) -> int:
+    """
+    Packs a move into a single int.
+
+    The square index of move_from is kept in the lowest 6 bits, the one of move_to in the
+    next 6 bits and the piece type a pawn promotes to in the 3 bits above, 0 (PAWN) when
+    the move is not a promotion.
+
+    Parameters:
+    ----------
+    1. move_from : Tuple[INT_RANGE, INT_RANGE]
+        The location the piece moves from.
+    2. move_to : Tuple[INT_RANGE, INT_RANGE]
+        The location the piece moves to.
+    3. promotion : int
+        The piece type the pawn promotes to, one of PROMOTION_TYPES.
+
+    Returns:
+    -------
+    int :
+        The packed move.
+    """
+    return (
+        (move_from[1] * 8 + move_from[0])
+        | (move_to[1] * 8 + move_to[0]) << 6
+        | promotion << 12
+    )
+
+
+def decode_move(
+    move: int,
+) -> Tuple[Tuple[INT_RANGE, INT_RANGE], Tuple[INT_RANGE, INT_RANGE]]:
+    """
+    Unpacks a move made by encode_move.
+
+    Parameters:
+    ----------
+    1. move : int
+        The packed move.
+
+    Returns:
+    -------
+    Tuple[Tuple[INT_RANGE, INT_RANGE], Tuple[INT_RANGE, INT_RANGE]] :
+        The (move_from, move_to) locations.
+    """
+    return SQUARE_LOCATIONS[move & 63], SQUARE_LOCATIONS[move >> 6 & 63]
+
+
+def move_to_uci(move: int) -> str:
+    """
+    Writes a move in the coordinate notation used by UCI e.g. "e2e4" or "e7e8q".
+
+    Parameters:
+    ----------
+    1. move : int
+        The packed move.
+
+    Returns:
+    -------
+    str :
+        The names of the from and the to squares joined together, followed by the lower
+        case letter of the promotion piece if any.
+    """
+    promotion = move >> 12
+    return (
+        SQUARE_NAMES[move & 63]
+        + SQUARE_NAMES[move >> 6 & 63]
+        + (FEN_PIECE_LETTERS[6 + promotion] if promotion else "")
+    )
+
+
+# The (from, to) square indices of the king in a castle mapped to the ones of the rook.
+CASTLE_ROOK_MOVES = {
+    (60, 62): (63, 61),
+    (60, 58): (56, 59),
+    (4, 6): (7, 5),
+    (4, 2): (0, 3),
+}
+# The castling rights are kept as a bitmask of these flags.
+WHITE_SHORT_CASTLE, WHITE_LONG_CASTLE = 1, 2
+BLACK_SHORT_CASTLE, BLACK_LONG_CASTLE = 4, 8
+ALL_CASTLING_RIGHTS = 15
+# Per side the (castling right, king destination, squares that must be empty, squares
+# that must not be attacked) of the short and the long castle.
+CASTLE_PATHS = [
+    [
+        (
+            WHITE_SHORT_CASTLE,
+            62,
+            SQUARE_BB[61] | SQUARE_BB[62],
+            SQUARE_BB[60] | SQUARE_BB[61] | SQUARE_BB[62],
+        ),
+        (
+            WHITE_LONG_CASTLE,
+            58,
+            SQUARE_BB[57] | SQUARE_BB[58] | SQUARE_BB[59],
+            SQUARE_BB[60] | SQUARE_BB[59] | SQUARE_BB[58],
+        ),
+    ],
+    [
+        (
+            BLACK_SHORT_CASTLE,
+            6,
+            SQUARE_BB[5] | SQUARE_BB[6],
+            SQUARE_BB[4] | SQUARE_BB[5] | SQUARE_BB[6],
+        ),
+        (
+            BLACK_LONG_CASTLE,
+            2,
+            SQUARE_BB[1] | SQUARE_BB[2] | SQUARE_BB[3],
+            SQUARE_BB[4] | SQUARE_BB[3] | SQUARE_BB[2],
+        ),
+    ],
+]
+# The (castling right, king square, rook square, color) of every castle. load_position
+# only keeps a right when its king and rook stand on these squares.
+CASTLING_HOMES = [
+    (WHITE_SHORT_CASTLE, 60, 63, 0),
+    (WHITE_LONG_CASTLE, 60, 56, 0),
+    (BLACK_SHORT_CASTLE, 4, 7, 1),
+    (BLACK_LONG_CASTLE, 4, 0, 1),
+]
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+# The FEN letters of the pieces mapped to the piece types.
+FEN_PIECE_TYPES = {
+    "p": "Pawn",
+    "r": "Rook",
+    "n": "Knight",
+    "b": "Bishop",
+    "q": "Queen",
+    "k": "King",
+}
+# The FEN letter of every piece index.
+FEN_PIECE_LETTERS = "PRNBQKprnbqk"
+# The castling rights in the order FEN writes their letters.
+CASTLING_LETTERS = [
+    (WHITE_SHORT_CASTLE, "K"),
+    (WHITE_LONG_CASTLE, "Q"),
+    (BLACK_SHORT_CASTLE, "k"),
+    (BLACK_LONG_CASTLE, "q"),
+]
+# The castling rights that survive a move from or to each square, a king or a rook
+# leaving its starting square or a rook being captured there cancels the matching rights.
+CASTLING_RIGHTS_KEPT = [ALL_CASTLING_RIGHTS] * 64
+CASTLING_RIGHTS_KEPT[60] ^= WHITE_SHORT_CASTLE | WHITE_LONG_CASTLE
+CASTLING_RIGHTS_KEPT[63] ^= WHITE_SHORT_CASTLE
+CASTLING_RIGHTS_KEPT[56] ^= WHITE_LONG_CASTLE
+CASTLING_RIGHTS_KEPT[4] ^= BLACK_SHORT_CASTLE | BLACK_LONG_CASTLE
+CASTLING_RIGHTS_KEPT[7] ^= BLACK_SHORT_CASTLE
+CASTLING_RIGHTS_KEPT[0] ^= BLACK_LONG_CASTLE
+
+
+def castling_right_property(castling_right: int) -> property:
+    """
+    Creates a bool attribute reading and writing one flag of castling_rights.
+
+    Parameters:
+    ----------
+    1. castling_right : int
+        The flag of the castling right e.g. WHITE_SHORT_CASTLE.
+
+    Returns:
+    -------
+    property :
+        The attribute, writing to it goes through castling_rights_updater.
+    """
+
+    def getter(self: "MoveList") -> bool:
+        return bool(self.castling_rights & castling_right)
+
+    def setter(self: "MoveList", value: bool) -> None:
+        self.castling_rights_updater(
+            castling_rights=(
+                self.castling_rights | castling_right
+                if value
+                else self.castling_rights & ~castling_right
+            )
+        )
+
+    return property(getter, setter)
+
+
+class IsAttacked:
+    """
+    This class determines if a given square or the king is attacked by any opponent pieces on the chessboard.
+
+    The squares attacked by every piece are kept per square and only the squares changed
+    since the last query, plus the sliding pieces looking at them, are worked out again.
+    The changed squares are found at the query by comparing the piece bitboards with the
+    ones the attacks were worked out for, so making and taking back moves costs nothing.
+    The attacked squares of every piece index and of both sides are then single
+    bitboards, so asking whether a square is attacked is a single AND.
+
+    Attributes:
+    ----------
+    1. position : Position
+        The bitboards of all the pieces on the board.
+    2. occupied_squares : OccupiedSquares
+        A dictionary like view of the position mapping the occupied squares to the piece occupying that square.
+    3. white_king_location : Tuple[INT_RANGE, INT_RANGE]
+        The location of the white king.
+    4. black_king_location : Tuple[INT_RANGE, INT_RANGE]
+        The location of the black king.
+    5. attacks_from : List[int]
+        The squares attacked by the piece standing on every square, 0 for an empty square.
+    6. synced_pieces : List[int]
+        The bitboards of all the pieces attacks_from was last brought up to date for.
+    7. attack_maps : List[int | None]
+        The squares attacked by every piece index, then by all the white and by all the
+        black pieces, None until asked for after a change.
+    """
+
+    def __init__(self, position: Position) -> None:
+        """
+        Initializes an IsAttacked object.
+
+        Parameters:
+        ----------
+        1. position : Position
+            The bitboards of all the pieces on the board.
+        """
+        self.position = position
+        self.occupied_squares = position.occupied_squares
+        self.attacks_from = [0] * 64
+        self.synced_pieces = [0] * 12
+        self.attack_maps = [None] * 14
+
+    @property
+    def white_king_location(self) -> Tuple[INT_RANGE, INT_RANGE]:
+        return SQUARE_LOCATIONS[lsb_index(self.position.pieces[KING])]
+
+    @property
+    def black_king_location(self) -> Tuple[INT_RANGE, INT_RANGE]:
+        return SQUARE_LOCATIONS[lsb_index(self.position.pieces[6 + KING])]
+
+    def attack_map(self, index: int) -> int:
+        """
+        Gives one attack map, bringing the attacks of the changed squares up to date first.
+
+        A piece's attacks can only change if it stands on a changed square or is a sliding
+        piece looking at one, so only those are worked out again. A map is put together
+        from attacks_from the first time it is asked for after a change. Nothing is kept on
+        the undo_stack, the squares changed by a move taken back are simply found again.
+
+        Parameters:
+        ----------
+        1. index : int
+            A piece index, or 12 + color for all the pieces of a side.
+
+        Returns:
+        -------
+        int :
+            The bitboard of the attacked squares.
+        """
+        position = self.position
+        pieces = position.pieces
+        if pieces != self.synced_pieces:
+            dirty_squares = reduce(or_, map(xor, pieces, self.synced_pieces))
+            mailbox, occupancy = position.mailbox, position.occupancy
+            straight = (
+                pieces[ROOK] | pieces[QUEEN] | pieces[6 + ROOK] | pieces[6 + QUEEN]
+            )
+            diagonal = (
+                pieces[BISHOP] | pieces[QUEEN] | pieces[6 + BISHOP] | pieces[6 + QUEEN]
+            )
+            to_update = dirty_squares
+            for square in bitboard_squares(dirty_squares):
+                to_update |= rook_attacks(
+                    square=square, occupancy=occupancy
+                ) & straight | bishop_attacks(square=square, occupancy=occupancy) & (
+                    diagonal
+                )
+            attacks_from = self.attacks_from
+            for square in bitboard_squares(to_update):
+                piece = mailbox[square]
+                attacks_from[square] = (
+                    0
+                    if piece == EMPTY
+                    else piece_attacks(piece=piece, square=square, occupancy=occupancy)
+                )
+            self.synced_pieces = pieces[:]
+            self.attack_maps = [None] * 14
+        attacked = self.attack_maps[index]
+        if attacked is None:
+            attacked = reduce(
+                or_,
+                map(
+                    self.attacks_from.__getitem__,
+                    bitboard_squares(
+                        position.colors[index - 12] if index >= 12 else pieces[index]
+                    ),
+                ),
+                0,
+            )
+            self.attack_maps[index] = attacked
+        return attacked
+
+    def attacked_squares(self, color: int) -> int:
+        """
+        Gives the squares attacked by all the pieces of a side.
+
+        Parameters:
+        ----------
+        1. color : int
+            The attacking side, WHITE or BLACK.
+
+        Returns:
+        -------
+        int :
+            The bitboard of the attacked squares.
+        """
+        return self.attack_map(index=12 + color)
+
+    def attacked_by_non_sliding_pieces(
+        self, location_to_check: Tuple[INT_RANGE, INT_RANGE], move_count: int
+    ) -> bool:
+        """
+        Checks if the provided location_to_check is attacked by a pawn or a knight.
+
+        Parameters:
+        ----------
+        1. location_to_check : Tuple[INT_RANGE, INT_RANGE]
+            A location on the board that has to be checked.
+        2. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        bool :
+            True if the provided location_to_check is attacked by a pawn or a knight.
+        """
+        opponent_offset = 6 if move_count % 2 == 0 else 0
+        return bool(
+            SQUARE_BB[location_to_check[1] * 8 + location_to_check[0]]
+            & (
+                self.attack_map(index=opponent_offset + PAWN)
+                | self.attack_map(index=opponent_offset + KNIGHT)
+            )
+        )
+
+    def attacked_by_sliding_pieces(
+        self, location_to_check: Tuple[INT_RANGE, INT_RANGE], move_count: int
+    ) -> bool:
+        """
+        Checks if the provided location_to_check is attacked by a rook or a bishop or a queen.
+
+        Parameters:
+        ----------
+        1. location_to_check : Tuple[INT_RANGE, INT_RANGE]
+            A location on the board that has to be checked.
+        2. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        bool :
+            True if the provided location_to_check is attacked by a rook or a bishop or a queen.
+        """
+        opponent_offset = 6 if move_count % 2 == 0 else 0
+        return bool(
+            SQUARE_BB[location_to_check[1] * 8 + location_to_check[0]]
+            & (
+                self.attack_map(index=opponent_offset + ROOK)
+                | self.attack_map(index=opponent_offset + BISHOP)
+                | self.attack_map(index=opponent_offset + QUEEN)
+            )
+        )
+
+    def attacked_by_king(
+        self, location_to_check: Tuple[INT_RANGE, INT_RANGE], move_count: int
+    ) -> bool:
+        """
+        Checks if the provided location_to_check is attacked by a king.
+
+        Parameters:
+        ----------
+        1. location_to_check : Tuple[INT_RANGE, INT_RANGE]
+            A location on the board that has to be checked.
+        2. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        bool :
+            True if the provided location_to_check is attacked by a king.
+        """
+        opponent_offset = 6 if move_count % 2 == 0 else 0
+        return bool(
+            SQUARE_BB[location_to_check[1] * 8 + location_to_check[0]]
+            & self.attack_map(index=opponent_offset + KING)
+        )
+
+    def square_attacked(self, square: int, move_count: int, occupancy: int) -> bool:
+        """
+        Checks if the square is attacked by any opponent piece.
+
+        Parameters:
+        ----------
+        1. square : int
+            The square index that has to be checked.
+        2. move_count : int
+            The move number going on.
+        3. occupancy : int
+            The occupancy the sliding pieces are blocked by, it can differ from the real one
+            e.g. to look through the own king.
+
+        Returns:
+        -------
+        bool :
+            True if the square is attacked by any opponent piece.
+        """
+        pieces = self.position.pieces
+        opponent_offset = 6 if move_count % 2 == 0 else 0
+        return bool(
+            KNIGHT_ATTACKS[square] & pieces[opponent_offset + KNIGHT]
+            or PAWN_ATTACKS[move_count % 2][square] & pieces[opponent_offset + PAWN]
+            or KING_ATTACKS[square] & pieces[opponent_offset + KING]
+            or rook_attacks(square=square, occupancy=occupancy)
+            & (pieces[opponent_offset + ROOK] | pieces[opponent_offset + QUEEN])
+            or bishop_attacks(square=square, occupancy=occupancy)
+            & (pieces[opponent_offset + BISHOP] | pieces[opponent_offset + QUEEN])
+        )
+
+    def is_own_king_attacked(self, move_count: int) -> bool:
+        """
+        Checks if the king of the current side is attacked.
+
+        Takes the move count to determine the side and check if the king of that side is attacked.
+
+        Parameters:
+        ----------
+        1. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        bool :
+            True if the king of the current side is attacked by any opponent piece.
+        """
+        own_color = move_count % 2
+        return bool(
+            self.position.pieces[6 * own_color + KING]
+            & self.attack_map(index=13 - own_color)
+        )
+
+
+class MoveList(IsAttacked):
+    """
+    This class determines all the possible locations that a piece on the provided square
+    can move to.
+
+    Attributes:
+    ----------
+    1. position : Position
+        The bitboards of all the pieces on the board.
+    2. occupied_squares : OccupiedSquares
+        A dictionary like view of the position mapping the occupied squares to the piece occupying that square.
+    3. white_king_location : Tuple[INT_RANGE, INT_RANGE]
+        The location of the white king.
+    4. black_king_location : Tuple[INT_RANGE, INT_RANGE]
+        The location of the black king.
+    5. white_short_castle : bool
+        The right of wether the white side can castle short.
+    6. white_long_castle : bool
+        The right of wether the white side can castle long.
+    7. black_short_castle : bool
+        The right of wether the black side can castle short.
+    8. black_long_castle : bool
+        The right of wether the black side can castle long.
+    9. move_count : int
+        The current move number going on.
+    10. undo_stack : List[Tuple]
+        One entry per made move holding everything unmake_move needs to take it back.
+    11. legal_moves_cache : Tuple[int, ...] | None
+        The legal moves of the current position once they have been generated.
+    12. castling_rights : int
+        The bitmask of the four castling rights above.
+    13. en_passant_square : int | None
+        The square index skipped by a pawn that just moved two squares, set only when an
+        opponent pawn stands next to it.
+    14. state_key : int
+        The Zobrist key of the side to move, castling rights and en passant square.
+    15. zobrist_key : int
+        The Zobrist key of the whole position.
+    16. halfmove_clock : int
+        The plies played since the last capture or pawn move.
+    17. attacks_from : List[int]
+        The squares attacked by the piece standing on every square, 0 for an empty square.
+    18. synced_pieces : List[int]
+        The bitboards of all the pieces attacks_from was last brought up to date for.
+    19. attack_maps : List[int | None]
+        The squares attacked by every piece index, then by all the white and by all the
+        black pieces, None until asked for after a change.
+    20. key_history : List[int]
+        The Zobrist key of every position left by a made move, the oldest first.
+    """
+
+    white_short_castle = castling_right_property(castling_right=WHITE_SHORT_CASTLE)
+    white_long_castle = castling_right_property(castling_right=WHITE_LONG_CASTLE)
+    black_short_castle = castling_right_property(castling_right=BLACK_SHORT_CASTLE)
+    black_long_castle = castling_right_property(castling_right=BLACK_LONG_CASTLE)
+
+    # Turned on to compare the incremental Zobrist key with a full recompute on every move.
+    debug_checks = False
+
+    def __init__(self, position: Position) -> None:
+        """
+        Initializes an MoveList object.
+
+        Parameters:
+        ----------
+        1. position : Position
+            The bitboards of all the pieces on the board.
+        """
+        self.castling_rights = ALL_CASTLING_RIGHTS
+        self.en_passant_square = None
+        self.move_count = 0
+        self.halfmove_clock = 0
+        self.state_key = CASTLING_KEYS[ALL_CASTLING_RIGHTS]
+        self.undo_stack = []
+        self.key_history = []
+        self.legal_moves_cache = None
+        super().__init__(position=position)
+
+    @property
+    def zobrist_key(self) -> int:
+        return self.position.key ^ self.state_key
+
+    def zobrist_key_checker(self) -> None:
+        """
+        Compares the incrementally updated Zobrist key with a full recompute.
+
+        Raises:
+        ------
+        AssertionError :
+            If the two keys differ.
+        """
+        full_key = zobrist_key_maker(
+            mailbox=self.position.mailbox,
+            move_count=self.move_count,
+            castling_rights=self.castling_rights,
+            en_passant_square=self.en_passant_square,
+        )
+        if full_key != self.zobrist_key:
+            raise AssertionError(
+                f"Zobrist key {self.zobrist_key:#018x} differs from the recomputed "
+                f"{full_key:#018x} after {len(self.undo_stack)} moves."
+            )
+
+    def repetition_count(self) -> int:
+        """
+        Counts how many times the current position has been reached.
+
+        Positions are compared by their Zobrist keys, which like the rules take the side to
+        move, the castling rights and the en passant square into account. Nothing played
+        before the last capture or pawn move can come back, so key_history is only looked
+        at as far back as the halfmove clock goes.
+
+        Returns:
+        -------
+        int :
+            The number of times, 1 for a position reached for the first time.
+        """
+        key_history = self.key_history
+        return 1 + key_history[max(len(key_history) - self.halfmove_clock, 0) :].count(
+            self.zobrist_key
+        )
+
+    def is_draw_by_rule(self, repetitions: int = 3) -> bool:
+        """
+        Checks the 50-move rule and the repetition rule.
+
+        A checkmate given on the move reaching the 50-move limit still wins, so the caller
+        has to look for it first.
+
+        Parameters:
+        ----------
+        1. repetitions : int
+            The number of times the position has to be reached to be drawn, the search
+            already scores the first repetition as a draw.
+
+        Returns:
+        -------
+        bool :
+            True if 50 moves of each side were played without a capture or a pawn move or the
+            position was reached repetitions times.
+        """
+        return self.halfmove_clock >= 100 or self.repetition_count() >= repetitions
+
+    def castling_rights_updater(self, castling_rights: int) -> None:
+        """
+        Replaces the castling rights and updates the Zobrist key accordingly.
+
+        Parameters:
+        ----------
+        1. castling_rights : int
+            The new castling rights bitmask.
+        """
+        self.state_key ^= (
+            CASTLING_KEYS[self.castling_rights] ^ CASTLING_KEYS[castling_rights]
+        )
+        self.castling_rights = castling_rights
+
+    def castle_rook_mover(
+        self, piece: int, move_from: int, move_to: int, undo: bool = False
+    ) -> None:
+        """
+        Moves the rook of a castle.
+
+        Does nothing if the king move from move_from to move_to is not a castle. The
+        position updates the Zobrist key of the pieces by itself.
+
+        Parameters:
+        ----------
+        1. piece : int
+            The piece index that moved.
+        2. move_from : int
+            The square index the piece moved from.
+        3. move_to : int
+            The square index the piece moved to.
+        4. undo : bool
+            If True the rook is put back on its corner instead.
+        """
+        if piece % 6 != KING or (move_from, move_to) not in CASTLE_ROOK_MOVES:
+            return None
+        rook_from, rook_to = CASTLE_ROOK_MOVES[(move_from, move_to)]
+        if undo:
+            rook_from, rook_to = rook_to, rook_from
+        rook = piece - KING + ROOK
+        # Only reachable with castling rights that don't match the board, the empty square
+        # would otherwise be put back as the piece with index EMPTY.
+        if self.position.mailbox[rook_from] != rook:
+            raise AssertionError(
+                f"Castle {SQUARE_NAMES[move_from]}{SQUARE_NAMES[move_to]} has no rook on "
+                f"{SQUARE_NAMES[rook_from]}."
+            )
+        self.position.put_piece(
+            piece=self.position.remove_piece(square=rook_from), square=rook_to
+        )
+
+    def castling_rights_manager(self, move_from: int, move_to: int) -> None:
+        """
+        Cancels the appropriate castling rights.
+
+        Cancels the rights if the king or rook of one side moves or if a rook is captured
+        on its starting square.
+
+        Parameters:
+        ----------
+        1. move_from : int
+            The square index the piece moved from.
+        2. move_to : int
+            The square index the piece moved to.
+        """
+        castling_rights = (
+            self.castling_rights
+            & CASTLING_RIGHTS_KEPT[move_from]
+            & CASTLING_RIGHTS_KEPT[move_to]
+        )
+        if castling_rights != self.castling_rights:
+            self.castling_rights_updater(castling_rights=castling_rights)
+
+    def make_move(self, move: int) -> None:
+        """
+        Plays a move on the board in place.
+
+        Moves the piece, captures whatever stands on the destination or the pawn taken en
+        passant, promotes a pawn, moves the rook of a castle, updates the castling rights,
+        the en passant square, the halfmove clock and the Zobrist key, marks the changed
+        squares for the attack maps and passes the turn. Everything needed to take the move
+        back is pushed on the undo_stack, the king locations come back with the king
+        bitboards. The legal moves cache and the attacks of the position left behind are
+        kept on the stack too and its Zobrist key on the key_history.
+
+        Parameters:
+        ----------
+        1. move : int
+            The move created by encode_move.
+        """
+        move_from, move_to = move & 63, move >> 6 & 63
+        position = self.position
+        piece = position.mailbox[move_from]
+        captured = position.mailbox[move_to]
+        state_key = self.state_key
+        self.key_history.append(position.key ^ state_key)
+        self.undo_stack.append(
+            (
+                move,
+                piece,
+                captured,
+                self.castling_rights,
+                self.en_passant_square,
+                state_key,
+                self.legal_moves_cache,
+                self.halfmove_clock,
+            )
+        )
+        self.legal_moves_cache = None
+        is_pawn = piece % 6 == PAWN
+        if is_pawn or captured != EMPTY:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        position.remove_piece(square=move_from)
+        # The promotion piece type is added to the pawn's piece index of the same side.
+        position.put_piece(piece=piece + (move >> 12), square=move_to)
+        state_key ^= SIDE_KEY
+        if self.en_passant_square is not None:
+            if is_pawn and move_to == self.en_passant_square:
+                # The pawn taken en passant stands just behind the square moved to.
+                position.remove_piece(square=move_to + (8 if piece < 6 else -8))
+            state_key ^= EN_PASSANT_KEYS[self.en_passant_square & 7]
+            self.en_passant_square = None
+        if is_pawn and move_to - move_from in (16, -16):
+            skipped_square = (move_from + move_to) >> 1
+            # Only kept when an opponent pawn could capture, as in the Polyglot key.
+            if (
+                PAWN_ATTACKS[piece >= 6][skipped_square]
+                & position.pieces[PAWN if piece >= 6 else 6 + PAWN]
+            ):
+                self.en_passant_square = skipped_square
+                state_key ^= EN_PASSANT_KEYS[skipped_square & 7]
+        self.state_key = state_key
+        self.castle_rook_mover(piece=piece, move_from=move_from, move_to=move_to)
+        self.castling_rights_manager(move_from=move_from, move_to=move_to)
+        self.move_count += 1
+        if self.debug_checks:
+            self.zobrist_key_checker()
+
+    def unmake_move(self) -> None:
+        """
+        Takes back the last move made by make_move.
+        """
+        (
+            move,
+            piece,
+            captured,
+            self.castling_rights,
+            self.en_passant_square,
+            self.state_key,
+            self.legal_moves_cache,
+            self.halfmove_clock,
+        ) = self.undo_stack.pop()
+        self.key_history.pop()
+        move_from, move_to = move & 63, move >> 6 & 63
+        position = self.position
+        position.remove_piece(square=move_to)
+        position.put_piece(piece=piece, square=move_from)
+        if captured != EMPTY:
+            position.put_piece(piece=captured, square=move_to)
+        elif move_to == self.en_passant_square and piece % 6 == PAWN:
+            position.put_piece(
+                piece=PAWN if piece >= 6 else 6 + PAWN,
+                square=move_to + (8 if piece < 6 else -8),
+            )
+        self.castle_rook_mover(
+            piece=piece, move_from=move_from, move_to=move_to, undo=True
+        )
+        self.move_count -= 1
+        if self.debug_checks:
+            self.zobrist_key_checker()
+
+    def own_pieces_remover(
+        self,
+        to_filter: List[Tuple[INT_RANGE, INT_RANGE] | None],
+        move_count: int,
+    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
+        """
+        Filters out all the squares holding a piece of the side to move.
+
+        Parameters:
+        ----------
+        1. to_filter : List[Tuple[INT_RANGE, INT_RANGE] | None]
+            A address that is to be filtered.
+        2. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        List[Tuple[INT_RANGE, INT_RANGE] | None] :
+            The address without the squares holding own pieces.
+        """
+        own_pieces = self.position.colors[move_count % 2]
+        return [
+            locations
+            for locations in to_filter
+            if not own_pieces & SQUARE_BB[locations[1] * 8 + locations[0]]
+        ]
+
+    def squares_that_put_king_in_check_remover(
+        self,
+        piece_location: Tuple[INT_RANGE, INT_RANGE],
+        to_filter: List[Tuple[INT_RANGE, INT_RANGE] | None],
+        move_count: int,
+    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
+        """
+        Filters out all the squares that put king in check.
+
+        The functions removes all the squares to which the piece on the provided piece_location
+        if moves to puts their own king in check.
+
+        Parameters:
+        ----------
+        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
+            A location of the piece w.r.t the to_filter was made.
+        2. to_filter : List[Tuple[INT_RANGE, INT_RANGE] | None]
+            A address that was made w.r.t piece_location.
+        3. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        List[Tuple[INT_RANGE, INT_RANGE] | None] :
+            A single list of all the possible squares that piece on the provided piece_location
+            can finally move to.
+        """
+        for location in to_filter[:]:
+            self.make_move(move=encode_move(move_from=piece_location, move_to=location))
+            if self.is_own_king_attacked(move_count=move_count):
+                to_filter.remove(location)
+            self.unmake_move()
+        return to_filter
+
+    def legal_move_list_maker(self, move_count: int) -> List[int]:
+        """
+        Creates every legal move of the side to move without trying any of them.
+
+        The pieces giving check and the own pieces pinned to the king are worked out once,
+        then every piece only gets the destinations inside the check-evasion mask and, when
+        pinned, along the line of its pin. Gives the same moves as the move_list_mapping_table
+        functions of all the pieces put together.
+
+        Parameters:
+        ----------
+        1. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        List[int] :
+            All the legal moves packed like encode_move does.
+        """
+        position = self.position
+        pieces = position.pieces
+        occupancy = position.occupancy
+        own_color = move_count % 2
+        own_offset, opponent_offset = (0, 6) if own_color == 0 else (6, 0)
+        own_pieces = position.colors[own_color]
+        not_own_pieces = ~own_pieces & FULL_BB
+        opponent_pieces = position.colors[1 - own_color]
+        opponent_straight = (
+            pieces[opponent_offset + ROOK] | pieces[opponent_offset + QUEEN]
+        )
+        opponent_diagonal = (
+            pieces[opponent_offset + BISHOP] | pieces[opponent_offset + QUEEN]
+        )
+        opponent_knights = pieces[opponent_offset + KNIGHT]
+        opponent_pawns = pieces[opponent_offset + PAWN]
+        own_pawn_attacks = PAWN_ATTACKS[own_color]
+        king_square = lsb_index(pieces[own_offset + KING])
+        king_targets = KING_ATTACKS[king_square] & not_own_pieces
+        move_list = []
+
+        checkers = (
+            KNIGHT_ATTACKS[king_square] & opponent_knights
+            | own_pawn_attacks[king_square] & opponent_pawns
+            | rook_attacks(square=king_square, occupancy=occupancy) & opponent_straight
+            | bishop_attacks(square=king_square, occupancy=occupancy)
+            & opponent_diagonal
+        )
+        if position.pieces != self.synced_pieces:
+            # Bringing the attack map up to date costs more than looking at the few squares
+            # the king can reach, so it is only used when it is up to date already.
+            opponent_attacks = None
+            # The king is taken off the board so that it does not hide the squares behind
+            # it from a sliding piece attacking it.
+            occupancy_without_king = occupancy ^ SQUARE_BB[king_square]
+            for square in bitboard_squares(king_targets):
+                if not self.square_attacked(
+                    square=square,
+                    move_count=move_count,
+                    occupancy=occupancy_without_king,
+                ):
+                    move_list.append(king_square | square << 6)
+        else:
+            opponent_attacks = self.attack_map(index=13 - own_color)
+            # A sliding piece giving check also attacks the squares behind the king, which
+            # the king would no longer hide once it steps back along the line.
+            king_forbidden = opponent_attacks
+            for checker in bitboard_squares(
+                checkers & (opponent_straight | opponent_diagonal)
+            ):
+                king_forbidden |= LINE[king_square][checker] ^ SQUARE_BB[checker]
+            for square in bitboard_squares(king_targets & ~king_forbidden):
+                move_list.append(king_square | square << 6)
+
+        if checkers & (checkers - 1):
+            # Only the king can move out of a double check.
+            return move_list
+        if checkers:
+            # Either the checking piece is captured or the check is blocked.
+            check_mask = checkers | BETWEEN[king_square][lsb_index(checkers)]
+        else:
+            check_mask = FULL_BB
+            for castling_right, king_to, empty_mask, safe_mask in CASTLE_PATHS[
+                own_color
+            ]:
+                if (
+                    self.castling_rights & castling_right
+                    and not occupancy & empty_mask
+                    and not (
+                        opponent_attacks & safe_mask
+                        if opponent_attacks is not None
+                        else any(
+                            self.square_attacked(
+                                square=square,
+                                move_count=move_count,
+                                occupancy=occupancy,
+                            )
+                            for square in bitboard_squares(safe_mask)
+                        )
+                    )
+                ):
+                    move_list.append(king_square | king_to << 6)
+
+        # An own piece is pinned when it is the only piece between the king and an opponent
+        # sliding piece, it can then only move along that line.
+        pin_rays = {}
+        snipers = (
+            rook_attacks(square=king_square, occupancy=0) & opponent_straight
+            | bishop_attacks(square=king_square, occupancy=0) & opponent_diagonal
+        )
+        for sniper_square in bitboard_squares(snipers):
+            blockers = BETWEEN[king_square][sniper_square] & occupancy
+            if blockers & own_pieces and not blockers & (blockers - 1):
+                pin_rays[lsb_index(blockers)] = LINE[king_square][sniper_square]
+
+        target_mask = not_own_pieces & check_mask
+        for piece_type, attacks_maker in [
+            (KNIGHT, None),
+            (BISHOP, bishop_attacks),
+            (ROOK, rook_attacks),
+            (QUEEN, queen_attacks),
+        ]:
+            for square in bitboard_squares(pieces[own_offset + piece_type]):
+                targets = (
+                    KNIGHT_ATTACKS[square]
+                    if attacks_maker is None
+                    else attacks_maker(square=square, occupancy=occupancy)
+                ) & target_mask
+                if square in pin_rays:
+                    targets &= pin_rays[square]
+                for target in bitboard_squares(targets):
+                    move_list.append(square | target << 6)
+
+        empty_squares = ~occupancy & FULL_BB
+        own_pawns = pieces[own_offset + PAWN]
+        step, start_row, promotion_row = (-8, 6, 1) if own_color == 0 else (8, 1, 6)
+        for square in bitboard_squares(own_pawns):
+            targets = own_pawn_attacks[square] & opponent_pieces
+            push_square = square + step
+            if push_square in range(64) and empty_squares & SQUARE_BB[push_square]:
+                targets |= SQUARE_BB[push_square]
+                if (
+                    square >> 3 == start_row
+                    and empty_squares & SQUARE_BB[push_square + step]
+                ):
+                    targets |= SQUARE_BB[push_square + step]
+            targets &= check_mask
+            if square in pin_rays:
+                targets &= pin_rays[square]
+            if square >> 3 == promotion_row:
+                for target in bitboard_squares(targets):
+                    for promotion in PROMOTION_TYPES:
+                        move_list.append(square | target << 6 | promotion << 12)
+            else:
+                for target in bitboard_squares(targets):
+                    move_list.append(square | target << 6)
+
+        en_passant_square = self.en_passant_square
+        if en_passant_square is not None:
+            captured_bb = SQUARE_BB[en_passant_square - step]
+            # Two pawns leave the row of the king at once, so instead of the pins the
+            # position after the capture is checked for attacks on the king.
+            for square in bitboard_squares(
+                PAWN_ATTACKS[1 - own_color][en_passant_square] & own_pawns
+            ):
+                occupancy_after = (
+                    occupancy ^ SQUARE_BB[square] ^ captured_bb
+                ) | SQUARE_BB[en_passant_square]
+                if not (
+                    KNIGHT_ATTACKS[king_square] & opponent_knights
+                    or own_pawn_attacks[king_square] & opponent_pawns & ~captured_bb
+                    or rook_attacks(square=king_square, occupancy=occupancy_after)
+                    & opponent_straight
+                    or bishop_attacks(square=king_square, occupancy=occupancy_after)
+                    & opponent_diagonal
+                ):
+                    move_list.append(square | en_passant_square << 6)
+        return move_list
+
+    def pawn_move_list(
+        self, piece_location: Tuple[INT_RANGE, INT_RANGE], move_count: int
+    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
+        """
+        Creates all the possible locations a piece on provided piece_location can move to.
+
+        The general address of a pawn is filtered to remove squares holding the same side piece,
+        squares that put the king in check and finally gives the list of locations a pawn on the
+        provided piece_location can move to.
+
+        Parameters:
+        ----------
+        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
+            A location of the piece w.r.t the address is to be made.
+        2. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        List[Tuple[INT_RANGE, INT_RANGE] | None] :
+            A final list of locations that a pawn on the provided sq_index can move to.
+        """
+        own_color = "W" if move_count % 2 == 0 else "B"
+        moving_list, capturing_list = pawn_address(
+            sq_index=piece_location, move_count=move_count
+        )
+        if not moving_list or moving_list[0] in self.occupied_squares:
+            moving_list.clear()
+        elif len(moving_list) > 1 and (
+            moving_list[1] in self.occupied_squares
+            or not (
+                (piece_location[1] == 6 and own_color == "W")
+                or (piece_location[1] == 1 and own_color == "B")
+            )
+        ):
+            moving_list.pop(1)
+        # The en passant square is empty but can be captured on like an opponent piece.
+        capturable = self.position.colors[1 - move_count % 2] | (
+            0 if self.en_passant_square is None else SQUARE_BB[self.en_passant_square]
+        )
+        capturing_list = [
+            locations
+            for locations in capturing_list
+            if capturable & SQUARE_BB[locations[1] * 8 + locations[0]]
+        ]
+        return self.squares_that_put_king_in_check_remover(
+            piece_location=piece_location, to_filter=moving_list, move_count=move_count
+        ) + self.squares_that_put_king_in_check_remover(
+            piece_location=piece_location,
+            to_filter=capturing_list,
+            move_count=move_count,
+        )
+
+    def knight_move_list(
+        self, piece_location: Tuple[INT_RANGE, INT_RANGE], move_count: int
+    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
+        """
+        Creates all the possible locations a piece on provided piece_location can move to.
+
+        The general address of a knight is filtered to remove squares holding the same side piece,
+        squares that put the king in check and finally gives the list of locations a knight on the
+        provided piece_location can move to.
+
+        Parameters:
+        ----------
+        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
+            A location of the piece w.r.t the address is to be made.
+        2. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        List[Tuple[INT_RANGE, INT_RANGE] | None] :
+            A final list of locations that a knight on the provided sq_index can move to.
+        """
+        move_list = self.own_pieces_remover(
+            to_filter=knight_address(sq_index=piece_location), move_count=move_count
+        )
+        return self.squares_that_put_king_in_check_remover(
+            piece_location=piece_location, to_filter=move_list, move_count=move_count
+        )
+
+    def king_move_list(
+        self, piece_location: Tuple[INT_RANGE, INT_RANGE], move_count: int
+    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
+        """
+        Creates all the possible locations a piece on provided piece_location can move to.
+
+        The general address of a king is filtered to remove squares holding the same side piece,
+        squares that put the king in check and finally gives the list of locations a king on the
+        provided piece_location can move to.
+
+        Parameters:
+        ----------
+        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
+            A location of the piece w.r.t the address is to be made.
+        2. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        List[Tuple[INT_RANGE, INT_RANGE] | None] :
+            A final list of locations that a king on the provided sq_index can move to.
+        """
+
+        def castle_move_list_maker(
+            move_count: int,
+        ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
+            """
+            Creates those location where king moves to in a castle.
+
+            Creates the general move_list and then filters it out according to the
+            conditions of castling.
+
+            Parameters:
+            ----------
+            1. move_count : int
+                The move number going on.
+
+            Returns:
+            -------
+            List[Tuple[INT_RANGE, INT_RANGE] | None] :
+                A list of locations where the king can possibly castle to.
+            """
+            castle_table = {
+                "W": {
+                    (6, 7): [[(5, 7), (6, 7)], [(4, 7), (5, 7), (6, 7)]],
+                    (2, 7): [[(3, 7), (2, 7), (1, 7)], [(4, 7), (3, 7), (2, 7)]],
+                },
+                "B": {
+                    (6, 0): [[(5, 0), (6, 0)], [(4, 0), (5, 0), (6, 0)]],
+                    (2, 0): [[(3, 0), (2, 0), (1, 0)], [(4, 0), (3, 0), (2, 0)]],
+                },
+            }
+            short_right, long_right = (
+                (self.white_short_castle, self.white_long_castle)
+                if move_count % 2 == 0
+                else (
+                    self.black_short_castle,
+                    self.black_long_castle,
+                )
+            )
+            own_color = "W" if move_count % 2 == 0 else "B"
+            row = 7 if move_count % 2 == 0 else 0
+            move_list = [(6, row), (2, row)]
+            if not short_right:
+                move_list.pop(0)
+            if not long_right:
+                move_list.pop(-1)
+            castle_data = castle_table[own_color]
+            for locations in move_list[:]:
+                castle_type_data = castle_data[locations]
+                if any(
+                    squares in self.occupied_squares for squares in castle_type_data[0]
+                ) or any(
+                    self.attacked_by_king(
+                        location_to_check=squares, move_count=move_count
+                    )
+                    or self.attacked_by_non_sliding_pieces(
+                        location_to_check=squares, move_count=move_count
+                    )
+                    or self.attacked_by_sliding_pieces(
+                        location_to_check=squares, move_count=move_count
+                    )
+                    for squares in castle_type_data[1]
+                ):
+                    move_list.remove(locations)
+            return move_list
+
+        move_list = self.own_pieces_remover(
+            to_filter=king_address(sq_index=piece_location), move_count=move_count
+        )
+        # The king is really moved so that it no longer blocks the line of a sliding
+        # piece attacking it.
+        move_list = self.squares_that_put_king_in_check_remover(
+            piece_location=piece_location, to_filter=move_list, move_count=move_count
+        )
+        return move_list + castle_move_list_maker(move_count=move_count)
+
+    def sliding_pieces_move_list(
+        self,
+        piece_location: Tuple[INT_RANGE, INT_RANGE],
+        move_count: int,
+        piece_type: Literal["s", "d"],
+    ) -> List[Tuple[INT_RANGE, INT_RANGE] | None]:
+        """
+        Creates all the possible locations a piece on provided piece_location can move to.
+
+        The general address of a rook/queen/bishop is filtered to remove squares holding the same side piece,
+        squares that put the king in check and finally gives the list of locations a rook/queen/bishop on the
+        provided piece_location can move to.
+
+        Parameters:
+        ----------
+        1. piece_location : Tuple[INT_RANGE, INT_RANGE]
+            A location of the piece w.r.t the address is to be made.
+        2. move_count : int
+            The move number going on.
+
+        Returns:
+        -------
+        List[Tuple[INT_RANGE, INT_RANGE] | None] :
+            A final list of locations that a rook/queen/bishop on the provided sq_index can move to.
+        """
+        square = piece_location[1] * 8 + piece_location[0]
+        attacks = (
+            rook_attacks(square=square, occupancy=self.position.occupancy)
+            if piece_type == "s"
+            else bishop_attacks(square=square, occupancy=self.position.occupancy)
+        )
+        move_list = bitboard_to_locations(
+            attacks & ~self.position.colors[move_count % 2]
+        )
+        return self.squares_that_put_king_in_check_remover(
+            piece_location=piece_location,
+            to_filter=move_list,
+            move_count=move_count,
+        )
+
+
+class Main(MoveList):
+    """
+    This class is the main class that interfaces with the user input.
+
+    Attributes:
+    ----------
+    1. position : Position
+        The bitboards of all the pieces on the board.
+    2. occupied_squares : OccupiedSquares
+        A dictionary like view of the position mapping the occupied squares to the piece occupying that square.
+    3. white_king_location : Tuple[INT_RANGE, INT_RANGE]
+        The location of the white king.
+    4. black_king_location : Tuple[INT_RANGE, INT_RANGE]
+        The location of the black king.
+    5. move_count : int
+        The current move number going on.
+    6. white_short_castle : bool
+        The right of wether the white side can castle short.
+    7. white_long_castle : bool
+        The right of wether the white side can castle long.
+    8. black_short_castle : bool
+        The right of wether the black side can castle short.
+    9. black_long_castle : bool
+        The right of wether the black side can castle long.
+    10. move_list : List[Tuple[INT_RANGE, INT_RANGE] | None]
+        The locations of possible movable locations of a given piece.
+    11. undo_stack : List[Tuple]
+        One entry per made move holding everything unmake_move needs to take it back.
+    12. legal_moves_cache : Tuple[int, ...] | None
+        The legal moves of the current position once they have been generated.
+    13. castling_rights : int
+        The bitmask of the four castling rights above.
+    14. en_passant_square : int | None
+        The square index skipped by a pawn that just moved two squares, set only when an
+        opponent pawn stands next to it.
+    15. state_key : int
+        The Zobrist key of the side to move, castling rights and en passant square.
+    16. zobrist_key : int
+        The Zobrist key of the whole position.
+    17. move_list_cache : MoveListCache
+        The move lists given by logic keyed by position and square.
+    18. halfmove_clock : int
+        The plies played since the last capture or pawn move.
+    19. attacks_from : List[int]
+        The squares attacked by the piece standing on every square, 0 for an empty square.
+    20. synced_pieces : List[int]
+        The bitboards of all the pieces attacks_from was last brought up to date for.
+    21. attack_maps : List[int | None]
+        The squares attacked by every piece index, then by all the white and by all the
+        black pieces, None until asked for after a change.
+    22. key_history : List[int]
+        The Zobrist key of every position left by a made move, the oldest first.
+    """
+
+    def __init__(self, move_list_cache_bytes: int = MOVE_LIST_CACHE_BYTES) -> None:
+        """
+        Initializes an Main object.
+
+        Parameters:
+        ----------
+        1. move_list_cache_bytes : int
+            The memory cap of the move list cache.
+        """
+        starting_squares = {
+            (0, 6): "WPawn",
+            (1, 6): "WPawn",
+            (2, 6): "WPawn",
+            (3, 6): "WPawn",
+            (4, 6): "WPawn",
+            (5, 6): "WPawn",
+            (6, 6): "WPawn",
+            (7, 6): "WPawn",
+            (0, 7): "WRook",
+            (7, 7): "WRook",
+            (1, 7): "WKnight",
+            (6, 7): "WKnight",
+            (2, 7): "WBishop",
+            (5, 7): "WBishop",
+            (3, 7): "WQueen",
+            (4, 7): "WKing",
+            (0, 1): "BPawn",
+            (1, 1): "BPawn",
+            (2, 1): "BPawn",
+            (3, 1): "BPawn",
+            (4, 1): "BPawn",
+            (5, 1): "BPawn",
+            (6, 1): "BPawn",
+            (7, 1): "BPawn",
+            (0, 0): "BRook",
+            (7, 0): "BRook",
+            (1, 0): "BKnight",
+            (6, 0): "BKnight",
+            (2, 0): "BBishop",
+            (5, 0): "BBishop",
+            (3, 0): "BQueen",
+            (4, 0): "BKing",
+        }
+        self.move_list = []
+        self.move_list_cache = MoveListCache(max_bytes=move_list_cache_bytes)
+        self.move_list_mapping_table = self.move_list_mapping_table_maker()
+        super().__init__(position=Position(occupied_squares=starting_squares))
+
+    def move_list_mapping_table_maker(self) -> Dict[str, Callable]:
+        """
+        Creates the table mapping the piece types to the functions making their move lists.
+
+        Returns:
+        -------
+        Dict[str, Callable] :
+            The piece type mapped to a function taking (location, move_count).
+        """
+        return {
+            "Pawn": lambda location, move_count: self.pawn_move_list(
+                piece_location=location, move_count=move_count
+            ),
+            "Rook": lambda location, move_count: self.sliding_pieces_move_list(
+                piece_location=location,
+                move_count=move_count,
+                piece_type="s",
+            ),
+            "Knight": lambda location, move_count: self.knight_move_list(
+                piece_location=location, move_count=move_count
+            ),
+            "Bishop": lambda location, move_count: self.sliding_pieces_move_list(
+                piece_location=location,
+                move_count=move_count,
+                piece_type="d",
+            ),
+            "Queen": lambda location, move_count: self.sliding_pieces_move_list(
+                piece_location=location,
+                move_count=move_count,
+                piece_type="s",
+            )
+            + self.sliding_pieces_move_list(
+                piece_location=location,
+                move_count=move_count,
+                piece_type="d",
+            ),
+            "King": lambda location, move_count: self.king_move_list(
+                piece_location=location, move_count=move_count
+            ),
+        }
+
+    def __getstate__(self) -> Dict:
+        # The mapping table holds lambdas which can't be pickled, it is made again on loading.
+        # The move list cache only holds UI lookups so it is sent over empty.
+        state = self.__dict__.copy()
+        del state["move_list_mapping_table"]
+        state["move_list_cache"] = MoveListCache(
+            max_bytes=self.move_list_cache.max_bytes
+        )
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self.move_list_mapping_table = self.move_list_mapping_table_maker()
+
+    def logic(self, mouse_grid_pos: Tuple[INT_RANGE, INT_RANGE]) -> None:
+        """
+        This function takes in a user click pos and creates appropriate move list.
+
+        Takes the user click pos and determines if the click is valid to act upon,
+        if yes then then creates the appropriate move_list else the click is ignored.
+
+        Parameters:
+        ----------
+        1. mouse_grid_pos: Tuple[INT_RANGE, INT_RANGE]
+            The click of them user mapped to a certain square on the board.
+        """
+
+        own_color = "W" if self.move_count % 2 == 0 else "B"
+        if (
+            mouse_grid_pos not in self.occupied_squares
+            or self.occupied_squares[mouse_grid_pos][0] != own_color
+        ):
+            self.move_list = []
+        else:
+            from_square = mouse_grid_pos[1] * 8 + mouse_grid_pos[0]
+            move_list = self.move_list_cache.get(
+                zobrist_key=self.zobrist_key, square=from_square
+            )
+            if move_list is None:
+                # A promotion is one move per piece type but a single square to click.
+                move_list = tuple(
+                    dict.fromkeys(
+                        SQUARE_LOCATIONS[move >> 6 & 63]
+                        for move in self.generate_legal_moves()
+                        if move & 63 == from_square
+                    )
+                )
+                self.move_list_cache.put(
+                    zobrist_key=self.zobrist_key,
+                    square=from_square,
+                    move_list=move_list,
+                )
+            self.move_list = list(move_list)
+
+    def load_fen(self, fen: str) -> None:
+        """
+        Sets the board up from a FEN string.
+
+        Places the pieces and sets the side to move (through move_count), the castling
+        rights, the en passant square and the halfmove clock, the Zobrist key is recomputed.
+        The game history (undo_stack) is cleared. A position that can't be reached is
+        refused before the board is touched: every side needs exactly one king, no pawn
+        may stand on the first or last row and the side not to move can't be in check.
+
+        Parameters:
+        ----------
+        1. fen : str
+            The position in Forsyth-Edwards Notation, the fields after the piece placement
+            are optional.
+
+        Raises:
+        ------
+        ValueError :
+            If a field of the FEN can't be read or the position can't be reached.
+        """
+        fields = fen.split()
+        # The fields after the piece placement default to those of a new game.
+        fields += ["w", "-", "-", "0", "1"][len(fields) - 1 :]
+        placement, side_to_move, castling, en_passant = fields[:4]
+        rows = placement.split("/")
+        if len(rows) != 8 or side_to_move not in ("w", "b"):
+            raise ValueError(f"invalid FEN {fen!r}")
+        occupied_squares = {}
+        for y_pos, row in enumerate(rows):
+            x_pos = 0
+            for char in row:
+                if char.isdigit():
+                    x_pos += int(char)
+                    continue
+                if char.lower() not in FEN_PIECE_TYPES or x_pos > 7:
+                    raise ValueError(f"invalid FEN {fen!r}")
+                occupied_squares[(x_pos, y_pos)] = (
+                    "W" if char.isupper() else "B"
+                ) + FEN_PIECE_TYPES[char.lower()]
+                x_pos += 1
+            if x_pos != 8:
+                raise ValueError(
+                    f"invalid FEN {fen!r}, row {y_pos + 1} is not 8 squares"
+                )
+        pieces = list(occupied_squares.values())
+        if (
+            pieces.count("WKing") != 1
+            or pieces.count("BKing") != 1
+            or any(
+                piece[1:] == "Pawn" and y_pos in (0, 7)
+                for (_, y_pos), piece in occupied_squares.items()
+            )
+        ):
+            raise ValueError(f"invalid FEN {fen!r}")
+        # The side to move could take the king of the other side.
+        position = Position(occupied_squares=occupied_squares)
+        waiting_color = side_to_move == "w"
+        if IsAttacked(position=position).square_attacked(
+            square=lsb_index(position.pieces[6 * waiting_color + KING]),
+            move_count=waiting_color,
+            occupancy=position.occupancy,
+        ):
+            raise ValueError(f"invalid FEN {fen!r}")
+        self.load_position(
+            occupied_squares=occupied_squares,
+            move_count=max(int(fields[5]) - 1, 0) * 2 + (side_to_move == "b"),
+            castling_rights=sum(
+                castling_right
+                for castling_right, letter in CASTLING_LETTERS
+                if letter in castling
+            ),
+            en_passant_square=(
+                None if en_passant == "-" else SQUARE_NAMES.index(en_passant)
+            ),
+            halfmove_clock=int(fields[4]),
+        )
+
+    def load_position(
+        self,
+        occupied_squares: Dict[Tuple[INT_RANGE, INT_RANGE], str],
+        move_count: int,
+        castling_rights: int,
+        en_passant_square: int | None,
+        halfmove_clock: int,
+    ) -> None:
+        """
+        Sets the board up and clears the game history (undo_stack).
+
+        Parameters:
+        ----------
+        1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
+            A dictionary of all the occupied squares mapped to the piece occupying that square.
+        2. move_count : int
+            The move number going on, even when white is to move.
+        3. castling_rights : int
+            The castling rights bitmask, a right whose king or rook is not on its starting
+            square is dropped.
+        4. en_passant_square : int | None
+            The square index skipped by the last double pawn push, it is dropped when no pawn
+            of the side to move could capture there, as make_move does.
+        5. halfmove_clock : int
+            The plies played since the last capture or pawn move.
+        """
+        self.position.reset(occupied_squares=occupied_squares)
+        self.attacks_from = [0] * 64
+        self.synced_pieces = [0] * 12
+        self.move_count = move_count
+        mailbox = self.position.mailbox
+        castling_rights = sum(
+            castling_right
+            for castling_right, king_square, rook_square, color in CASTLING_HOMES
+            if castling_rights & castling_right
+            and mailbox[king_square] == 6 * color + KING
+            and mailbox[rook_square] == 6 * color + ROOK
+        )
+        self.castling_rights = castling_rights
+        self.halfmove_clock = halfmove_clock
+        side_to_move = move_count % 2
+        if en_passant_square is not None and not (
+            PAWN_ATTACKS[1 - side_to_move][en_passant_square]
+            & self.position.pieces[6 * side_to_move + PAWN]
+        ):
+            en_passant_square = None
+        self.en_passant_square = en_passant_square
+        self.state_key = (
+            CASTLING_KEYS[castling_rights]
+            ^ (SIDE_KEY if side_to_move else 0)
+            ^ (
+                0
+                if en_passant_square is None
+                else EN_PASSANT_KEYS[en_passant_square & 7]
+            )
+        )
+        self.undo_stack = []
+        self.key_history = []
+        self.legal_moves_cache = None
+        self.move_list = []
+
+    def export_fen(self) -> str:
+        """
+        Writes the position as a FEN string.
+
+        Returns:
+        -------
+        str :
+            The position in Forsyth-Edwards Notation. The en passant square is only written
+            when a pawn can capture there, the same rule the Zobrist key follows.
+        """
+        mailbox = self.position.mailbox
+        rows = []
+        for y_pos in range(8):
+            row, empty_squares = "", 0
+            for piece in mailbox[y_pos * 8 : y_pos * 8 + 8]:
+                if piece == EMPTY:
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    row += str(empty_squares)
+                    empty_squares = 0
+                row += FEN_PIECE_LETTERS[piece]
+            rows.append(row + (str(empty_squares) if empty_squares else ""))
+        castling = "".join(
+            letter
+            for castling_right, letter in CASTLING_LETTERS
+            if self.castling_rights & castling_right
+        )
+        return " ".join(
+            [
+                "/".join(rows),
+                "b" if self.move_count % 2 else "w",
+                castling or "-",
+                (
+                    "-"
+                    if self.en_passant_square is None
+                    else SQUARE_NAMES[self.en_passant_square]
+                ),
+                str(self.halfmove_clock),
+                str(self.move_count // 2 + 1),
+            ]
+        )
+
+    def generate_legal_moves(self) -> Tuple[int, ...]:
+        """
+        Gives every legal move of the side to move.
+
+        The moves are generated once per position and cached until the next make_move, an
+        unmake_move gives back the cached moves of the position it returns to. The position
+        has to be changed only through make_move/unmake_move for the cache to stay valid.
+
+        Returns:
+        -------
+        Tuple[int, ...] :
+            All the legal moves packed like encode_move does.
+        """
+        if self.legal_moves_cache is None:
+            self.legal_moves_cache = tuple(
+                self.legal_move_list_maker(move_count=self.move_count)
+            )
+        return self.legal_moves_cache
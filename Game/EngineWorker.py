@@ -0,0 +1,328 @@
+"""
+This module runs the engine jobs in a background thread so the window never stalls.
+
+The game hands jobs to an EngineWorker, the legal moves, the game-state and the
+best move of the position on the board, and goes back to waiting for events.
+Every job carries the position as a FEN and the Zobrist keys the repetition rule
+still looks at, so its size doesn't grow with the game, and the worker sets its
+own Main object up from them; it never touches the one the window draws. The
+worker takes the jobs from a queue one by one and posts every result as an
+ENGINE_RESULT_EVENT pygame event, which wakes the game loop up like a click does.
+
+When the position on the board changes the game calls cancel. The jobs still
+waiting are then dropped, a running search stops within a few thousand nodes
+and no result of the old position is posted any more. A thread is used rather
+than a process as a job needs no more than a copy of the position and posting
+pygame events is thread safe; the game loop sleeps in pygame.event.wait while
+the worker searches, so they hardly compete for the interpreter.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+from itertools import count
+from queue import Queue
+from threading import Thread
+from typing import Callable, Tuple
+
+import pygame
+from Engine import Main
+from OpeningBook import OpeningBook
+from Search import (
+    TIME_CHECK_MASK,
+    SearchAborted,
+    Searcher,
+    TranspositionTable,
+)
+from Tablebase import Tablebases
+
+
+# The pygame event type the results are posted as.
+ENGINE_RESULT_EVENT = pygame.event.custom_type()
+# The kinds of jobs, the result of each one is given after the colon.
+LEGAL_MOVES_JOB = "legal_moves"  # Tuple[int, ...] : every legal move, packed.
+GAME_STATE_JOB = "game_state"  # Tuple[int, str] : as given by game_state_determiner.
+BEST_MOVE_JOB = "best_move"  # int : the move to play, 0 if there is none.
+# Seconds a search of a BEST_MOVE_JOB may take unless the job says otherwise.
+DEFAULT_MOVE_TIME = 1.0
+
+
+def position_snapshot(main: Main) -> Tuple[str, Tuple[int, ...]]:
+    """
+    Takes what a copy of the position needs to follow the rules.
+
+    Nothing played before the last capture or pawn move can be repeated, so only the keys
+    of the positions since then are kept, as far back as the halfmove clock goes.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position.
+
+    Returns:
+    -------
+    Tuple[str, Tuple[int, ...]] :
+        The FEN of the position and the Zobrist keys of the positions before it.
+    """
+    key_history = main.key_history
+    return main.export_fen(), tuple(
+        key_history[max(len(key_history) - main.halfmove_clock, 0) :]
+    )
+
+
+def game_state_determiner(
+    main: Main, tablebases: Tablebases | None = None
+) -> Tuple[int, str]:
+    """
+    Determines the effect of the last move on the game-state.
+
+    Checks if the side to move is in checkmate or stalemate, then for a draw by the
+    50-move rule or threefold repetition. With tablebases an ending they know to be
+    drawn also ends the game.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position.
+    2. tablebases : Tablebases | None
+        The endgame tables judging small endings.
+
+    Returns:
+    -------
+    Tuple[int,str] :
+        The tuple contains the game_state_code and the appropriate side.
+        Codes:
+            0 : Normal
+            1 : Checkmate
+            2 : Stalemate
+            3 : Draw known from the tablebases
+            4 : Draw by the 50-move rule
+            5 : Draw by threefold repetition
+    """
+    own_color = "W" if main.move_count % 2 == 0 else "B"
+    opponent_color = "B" if own_color == "W" else "W"
+    # If even 1 legal move exists then no checkmate or stalemate.
+    if main.generate_legal_moves():
+        if main.halfmove_clock >= 100:
+            return (4, "NoSide")
+        if main.repetition_count() >= 3:
+            return (5, "NoSide")
+        if tablebases is not None:
+            result = tablebases.probe(main=main)
+            if result is not None and result[0] == "draw":
+                return (3, "NoSide")
+        return (0, "NoSide")
+    # If no piece can move and king is in check then checkmate.
+    if main.is_own_king_attacked(move_count=main.move_count):
+        return (1, opponent_color)
+    # Else stalemate.
+    return (2, own_color)
+
+
+class CancellableSearcher(Searcher):
+    """
+    This class is a Searcher that also stops when the job it runs for is cancelled.
+
+    Attributes:
+    ----------
+    1. cancelled : Callable[[], bool]
+        Gives True once the search has to stop.
+    """
+
+    def __init__(self, cancelled: Callable[[], bool], **kwargs) -> None:
+        """
+        Initializes a CancellableSearcher object.
+
+        Parameters:
+        ----------
+        1. cancelled : Callable[[], bool]
+            Gives True once the search has to stop.
+        2. kwargs :
+            Passed on to Searcher.
+        """
+        super().__init__(**kwargs)
+        self.cancelled = cancelled
+
+    def limits_checker(self) -> None:
+        if not self.nodes & TIME_CHECK_MASK and self.cancelled():
+            raise SearchAborted
+        super().limits_checker()
+
+
+class EngineWorker:
+    """
+    This class runs engine jobs in a background thread and posts their results as events.
+
+    Every result is posted as an ENGINE_RESULT_EVENT with the attributes kind, job_id,
+    generation and result. A job belongs to the generation it was submitted in, cancel
+    starts a new one.
+
+    Attributes:
+    ----------
+    1. tablebases : Tablebases | None
+        The endgame tables used by the game-state and best move jobs.
+    2. opening_book : OpeningBook | None
+        The book the best move is taken from while the game is in it.
+    3. transposition_table : TranspositionTable
+        The results of the searches, kept from one best move job to the next.
+    4. jobs : Queue
+        The (generation, job_id, kind, position snapshot, move time) jobs waiting, None
+        stops the thread.
+    5. generation : int
+        Counts the cancels, the jobs of an older generation are dropped.
+    6. job_ids : Iterator[int]
+        Numbers the jobs.
+    7. loaded_position : Tuple[str, Tuple[int, ...]] | None
+        The snapshot main was last set up from, the jobs of the same position share it.
+    8. main : Main
+        The worker's own copy of the position.
+    9. thread : Thread
+        The thread running the jobs.
+    """
+
+    def __init__(
+        self,
+        tablebases: Tablebases | None = None,
+        opening_book: OpeningBook | None = None,
+    ) -> None:
+        """
+        Initializes an EngineWorker object and starts its thread.
+
+        Parameters:
+        ----------
+        1. tablebases : Tablebases | None
+            The endgame tables used by the game-state and best move jobs.
+        2. opening_book : OpeningBook | None
+            The book the best move is taken from while the game is in it.
+        """
+        self.tablebases = tablebases
+        self.opening_book = opening_book
+        self.transposition_table = TranspositionTable()
+        self.jobs = Queue()
+        self.generation = 0
+        self.job_ids = count(1)
+        self.loaded_position = None
+        self.main = Main()
+        # A daemon thread, a search still running doesn't keep the game from closing.
+        self.thread = Thread(target=self.job_runner, name="EngineWorker", daemon=True)
+        self.thread.start()
+
+    def submit(
+        self, main: Main, kind: str, move_time: float = DEFAULT_MOVE_TIME
+    ) -> int:
+        """
+        Queues a job on a copy of the position held by a Main object.
+
+        Parameters:
+        ----------
+        1. main : Main
+            The engine holding the position, it can be changed right after the call.
+        2. kind : str
+            LEGAL_MOVES_JOB, GAME_STATE_JOB or BEST_MOVE_JOB.
+        3. move_time : float
+            The seconds the search of a BEST_MOVE_JOB may take.
+
+        Returns:
+        -------
+        int :
+            The job_id the result will be posted with.
+        """
+        job_id = next(self.job_ids)
+        self.jobs.put(
+            (self.generation, job_id, kind, position_snapshot(main=main), move_time)
+        )
+        return job_id
+
+    def cancel(self) -> None:
+        """
+        Drops every job submitted so far, stopping the one running.
+        """
+        self.generation += 1
+
+    def stop(self) -> None:
+        """
+        Cancels the jobs and waits for the thread to end.
+        """
+        self.cancel()
+        self.jobs.put(None)
+        self.thread.join()
+
+    def job_runner(self) -> None:
+        """
+        Runs the jobs from the queue until it gives None, runs inside the worker thread.
+        """
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return None
+            generation, job_id, kind, snapshot, move_time = job
+            if generation != self.generation:
+                continue
+            if self.loaded_position != snapshot:
+                fen, key_history = snapshot
+                self.main.load_fen(fen=fen)
+                self.main.key_history = list(key_history)
+                self.loaded_position = snapshot
+            result = self.job_result_maker(
+                main=self.main,
+                kind=kind,
+                generation=generation,
+                move_time=move_time,
+            )
+            # A search stopped by cancel gives a result that nobody wants any more.
+            if generation == self.generation:
+                pygame.event.post(
+                    pygame.event.Event(
+                        ENGINE_RESULT_EVENT,
+                        kind=kind,
+                        job_id=job_id,
+                        generation=generation,
+                        result=result,
+                    )
+                )
+
+    def job_result_maker(
+        self, main: Main, kind: str, generation: int, move_time: float
+    ) -> Tuple[int, ...] | Tuple[int, str] | int:
+        """
+        Does the work of a single job.
+
+        Parameters:
+        ----------
+        1. main : Main
+            The worker's copy of the position, given back unchanged.
+        2. kind : str
+            LEGAL_MOVES_JOB, GAME_STATE_JOB or BEST_MOVE_JOB.
+        3. generation : int
+            The generation of the job, a search stops once it is cancelled.
+        4. move_time : float
+            The seconds the search of a BEST_MOVE_JOB may take.
+
+        Returns:
+        -------
+        Tuple[int, ...] | Tuple[int, str] | int :
+            The result of the job, see the job kinds.
+        """
+        if kind == LEGAL_MOVES_JOB:
+            return main.generate_legal_moves()
+        if kind == GAME_STATE_JOB:
+            return game_state_determiner(main=main, tablebases=self.tablebases)
+        if kind == BEST_MOVE_JOB:
+            book_move = (
+                self.opening_book.choose_move(main=main) if self.opening_book else None
+            )
+            if book_move:
+                return book_move
+            searcher = CancellableSearcher(
+                cancelled=lambda: generation != self.generation,
+                main=main,
+                transposition_table=self.transposition_table,
+                tablebases=self.tablebases,
+            )
+            return searcher.search(time_limit=move_time).best_move
+        raise ValueError(f"unknown job kind {kind!r}")
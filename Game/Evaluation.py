@@ -0,0 +1,226 @@
+"""
+This module scores a position for the search, in centipawns.
+
+The score is the material of both sides plus a bonus or malus for the square
+every piece stands on (piece-square tables). The tables are written from the
+point of view of white, the first row being the 8th rank, the same order as the
+square indices of the engine. Black pieces read them mirrored.
+
+Every piece has a middlegame and an endgame value and the two are blended by
+the game phase, which drops from MAX_PHASE to 0 as the pieces other than pawns
+leave the board. The position keeps both sums and the phase up to date every
+time a piece is put or removed, so evaluate() does not look at the pieces.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from Bitboard import Position
+
+
+# Indexed by piece type (PAWN, ROOK, KNIGHT, BISHOP, QUEEN, KING).
+PIECE_VALUES = [100, 500, 320, 330, 900, 0]
+ENDGAME_PIECE_VALUES = [120, 530, 300, 320, 950, 0]
+# How much every piece counts towards the game phase, the start position has MAX_PHASE.
+PHASE_VALUES = [0, 2, 1, 1, 4, 0]
+MAX_PHASE = 24
+
+PAWN_TABLE = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+]  # fmt: skip
+ROOK_TABLE = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+]  # fmt: skip
+KNIGHT_TABLE = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]  # fmt: skip
+BISHOP_TABLE = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]  # fmt: skip
+QUEEN_TABLE = [
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+]  # fmt: skip
+KING_TABLE = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+]  # fmt: skip
+# In the endgame passed pawns are worth more the closer they are to promoting.
+PAWN_ENDGAME_TABLE = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    80, 80, 80, 80, 80, 80, 80, 80,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    30, 30, 30, 30, 30, 30, 30, 30,
+    15, 15, 15, 15, 15, 15, 15, 15,
+    5, 5, 5, 5, 5, 5, 5, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0,
+]  # fmt: skip
+# In the endgame the king belongs in the centre.
+KING_ENDGAME_TABLE = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+]  # fmt: skip
+PIECE_TABLES = [
+    PAWN_TABLE,
+    ROOK_TABLE,
+    KNIGHT_TABLE,
+    BISHOP_TABLE,
+    QUEEN_TABLE,
+    KING_TABLE,
+]
+ENDGAME_PIECE_TABLES = [
+    PAWN_ENDGAME_TABLE,
+    ROOK_TABLE,
+    KNIGHT_TABLE,
+    BISHOP_TABLE,
+    QUEEN_TABLE,
+    KING_ENDGAME_TABLE,
+]
+
+
+def piece_square_values_maker(
+    piece_values: List[int], piece_tables: List[List[int]]
+) -> List[List[int]]:
+    """
+    Creates the value of every piece index on every square.
+
+    Parameters:
+    ----------
+    1. piece_values : List[int]
+        The material value of every piece type.
+    2. piece_tables : List[List[int]]
+        The piece-square table of every piece type.
+
+    Returns:
+    -------
+    List[List[int]] :
+        Indexed [piece index][square index], positive for white and negative for black.
+    """
+    piece_square_values = []
+    for piece in range(12):
+        piece_type, is_black = piece % 6, piece >= 6
+        piece_square_values.append(
+            [
+                # Flipping the row (square ^ 56) mirrors the board for black.
+                (
+                    -(piece_values[piece_type] + piece_tables[piece_type][square ^ 56])
+                    if is_black
+                    else piece_values[piece_type] + piece_tables[piece_type][square]
+                )
+                for square in range(64)
+            ]
+        )
+    return piece_square_values
+
+
+MIDDLEGAME_PIECE_SQUARE_VALUES = piece_square_values_maker(
+    piece_values=PIECE_VALUES, piece_tables=PIECE_TABLES
+)
+ENDGAME_PIECE_SQUARE_VALUES = piece_square_values_maker(
+    piece_values=ENDGAME_PIECE_VALUES, piece_tables=ENDGAME_PIECE_TABLES
+)
+# Indexed by piece index.
+PIECE_PHASES = PHASE_VALUES * 2
+
+
+def tapered_score(middlegame_score: int, endgame_score: int, phase: int) -> int:
+    """
+    Blends the middlegame and the endgame scores by the game phase.
+
+    Parameters:
+    ----------
+    1. middlegame_score : int
+        The score with the middlegame values, positive when white is better.
+    2. endgame_score : int
+        The score with the endgame values, positive when white is better.
+    3. phase : int
+        The game phase, MAX_PHASE or more is a pure middlegame and 0 a pure endgame.
+
+    Returns:
+    -------
+    int :
+        The blended score, positive when white is better.
+    """
+    phase = min(phase, MAX_PHASE)
+    return (middlegame_score * phase + endgame_score * (MAX_PHASE - phase)) // MAX_PHASE
+
+
+def evaluate(position: "Position", move_count: int) -> int:
+    """
+    Scores the position from the point of view of the side to move.
+
+    Reads the running sums of the position so it takes the same time whatever is on the board.
+
+    Parameters:
+    ----------
+    1. position : Position
+        The bitboards of all the pieces on the board.
+    2. move_count : int
+        The move number going on.
+
+    Returns:
+    -------
+    int :
+        The score in centipawns, positive when the side to move is better.
+    """
+    score = tapered_score(
+        middlegame_score=position.middlegame_score,
+        endgame_score=position.endgame_score,
+        phase=position.phase,
+    )
+    return -score if move_count % 2 else score
@@ -11,8 +11,19 @@ __email__ = "anand6308anand@gmail.com"
 
 
 from sys import exit
-from Engine import Main
-from typing import List, Tuple, Literal, Dict
+from Bitboard import PAWN, QUEEN
+from BoardRenderer import BoardRenderer, board_layout
+from Engine import Main, encode_move
+from EngineWorker import (
+    BEST_MOVE_JOB,
+    ENGINE_RESULT_EVENT,
+    GAME_STATE_JOB,
+    LEGAL_MOVES_JOB,
+    EngineWorker,
+)
+from OpeningBook import OpeningBook
+from Tablebase import Tablebases
+from typing import Tuple, Literal
 
 import pygame
 import pygame.locals
@@ -21,6 +32,9 @@ import AssetsLoader
 
 pygame.init()
 main = Main()
+# Set to the directory of the tables made by Tablebase.py to play and judge small endings from them.
+TABLEBASE_DIRECTORY = None
+tablebases = Tablebases(directory=TABLEBASE_DIRECTORY) if TABLEBASE_DIRECTORY else None
 
 
 INT_RANGE = Literal[0, 1, 2, 3, 4, 5, 6, 7]
@@ -28,12 +42,12 @@ INT_RANGE = Literal[0, 1, 2, 3, 4, 5, 6, 7]
 
 def mouse_pos_to_square_mapper(
     mouse_pos: Tuple[int, int]
-) -> Tuple[INT_RANGE, INT_RANGE]:
+) -> Tuple[INT_RANGE | Literal[-1], INT_RANGE | Literal[-1]]:
     """
     Maps the user click to a square on the board.
 
     Takes the random click pos on the screen and maps it to an square coordinate
-    corresponding to a square.
+    corresponding to a square, wherever the board is drawn and however big it is.
 
     Parameters:
     ----------
@@ -42,145 +56,11 @@ def mouse_pos_to_square_mapper(
 
     Returns:
     -------
-    Tuple[INT_RANGE, INT_RANGE] :
-        The click coordinates mapped to a square on the chess board.
+    Tuple[INT_RANGE | Literal[-1], INT_RANGE | Literal[-1]] :
+        The click coordinates mapped to a square on the chess board, (-1, -1) for a
+        click beside the board.
     """
-    x_pos = (mouse_pos[0] - mouse_pos[0] % 100) // 100
-    y_pos = (mouse_pos[1] - mouse_pos[1] % 100) // 100
-    return x_pos, y_pos
-
-
-def piece_image_renderer(
-    occupied_squares: Dict[Tuple[int, int], str],
-    move_list: List[Tuple[int, int] | None],
-) -> None:
-    global screen
-    """
-    Places all the piece related images on the board.
-
-    Takes occupied_squares to determine what pieces should be on the board and
-    move_list for the locations to mark as movable.
-
-    Parameters:
-    ----------
-    1. occupied_squares : Dict[Tuple[INT_RANGE, INT_RANGE], str]
-        A dictionary of all the occupied squares mapped to the piece occupying that square.
-    2. move_list : List[Tuple[INT_RANGE, INT_RANGE] | None]
-        The locations of possible movable locations of a given piece.
-    """
-    SCALING_RATIO = 100
-    OFFSET = 17
-    for piece_location, piece_type in occupied_squares.items():
-        screen.blit(
-            AssetsLoader.LOADED_IMAGES[
-                AssetsLoader.PIECE_TYPE_TO_INDEX_TABLE[piece_type]
-            ],
-            (
-                (piece_location[0] * SCALING_RATIO) + OFFSET,
-                (piece_location[1] * SCALING_RATIO) + OFFSET,
-            ),
-        )
-    for locations in move_list:
-        screen.blit(
-            AssetsLoader.move_maker,
-            (
-                (locations[0] * SCALING_RATIO) + OFFSET,
-                (locations[1] * SCALING_RATIO) + OFFSET,
-            ),
-        )
-
-
-def game_state_determiner(move_count: int) -> Tuple[int, str]:
-    """
-    Determines the effect of the last move on the game-state.
-
-    Takes the move_number just after it has been incremented by 1 to check if the other side is
-    in checkmate or stalemate.
-
-    Parameters:
-    ----------
-    1. move_count : int
-            The move number going on.
-
-    Returns:
-    -------
-    Tuple[int,str] :
-        The tuple contains the game_state_code and the appropriate side.
-        Codes:
-            0 : Normal
-            1 : Checkmate
-            2 : Stalemate
-    """
-    own_color = "W" if move_count % 2 == 0 else "B"
-    opponent_color = "B" if own_color == "W" else "W"
-    for piece_location, piece_type in list(main.occupied_squares.items())[:]:
-        movable_location = []
-        if piece_type[0] == own_color:
-            movable_location = main.move_list_mapping_table[piece_type[1:]](
-                location=piece_location, move_count=move_count
-            )
-        # If movable_location is even filled with 1 location then no checkmate or stalemate.
-        # This breaks as soon as one location is found saving computation.
-        if movable_location:
-            return (0, "NoSide")
-    # If no piece can move and king is in check then checkmate.
-    if main.is_own_king_attacked(move_count=move_count):
-        return (1, opponent_color)
-    # Else stalemate.
-    return (2, own_color)
-
-
-def castling_rights_manager(
-    piece_that_has_to_move: Tuple[Tuple[INT_RANGE, INT_RANGE], str]
-) -> None:
-    """
-    Cancels the appropriate castling rights.
-
-    Cancels the rights if the king or rook of one side moves.
-
-    Parameters:
-    ----------
-    1. piece_that_has_to_be_moved : Tuple[Tuple[INT_RANGE, INT_RANGE] | None, str | None]
-        A empty list if no piece has to be moved else a [location, piece_type] item.
-    """
-    if piece_that_has_to_move[1] == "WKing":
-        main.white_long_castle = main.white_short_castle = False
-    elif piece_that_has_to_move[1] == "BKing":
-        main.black_long_castle = main.black_short_castle = False
-    elif piece_that_has_to_move[1] == "WRook":
-        if piece_that_has_to_move[0] == (0, 7):
-            main.white_long_castle = False
-        elif piece_that_has_to_move[0] == (7, 7):
-            main.white_short_castle = False
-    elif piece_that_has_to_move[1] == "BRook":
-        if piece_that_has_to_move[0] == (0, 0):
-            main.black_long_castle = False
-        elif piece_that_has_to_move[0] == (7, 0):
-            main.black_short_castle = False
-
-
-def castle_rook_mover(
-    move_count: int,
-    mouse_grid_pos: Tuple[INT_RANGE, INT_RANGE],
-    piece_that_has_to_move: Tuple[Tuple[INT_RANGE, INT_RANGE], str],
-) -> None:
-    row = 7 if move_count % 2 == 0 else 0
-    own_color = "W" if move_count % 2 == 0 else "B"
-    if piece_that_has_to_move[1][1:] != "King" or mouse_grid_pos not in [
-        (6, row),
-        (2, row),
-    ]:
-        return None
-    if mouse_grid_pos == (6, row):
-        main.occupied_squares.pop((7, row))
-        main.occupied_squares[(5, row)] = f"{own_color}Rook"
-    elif mouse_grid_pos == (2, row):
-        main.occupied_squares.pop((0, row))
-        main.occupied_squares[(3, row)] = f"{own_color}Rook"
-    if own_color == "W":
-        main.white_long_castle = main.white_short_castle = False
-    elif own_color == "B":
-        main.black_long_castle = main.black_short_castle = False
+    return renderer.square_finder(position=mouse_pos) or (-1, -1)
 
 
 def playing_logic(
@@ -191,9 +71,10 @@ def playing_logic(
     Tuple[Tuple[INT_RANGE, INT_RANGE] | None, str | None],
 ]:
     """
-    The main logic of moving the pieces and checking for checkmates/stalemates.
+    The main logic of selecting and moving the pieces.
 
     Takes the user click square and the piece that can be move currently and takes appropriate actions.
+    The effect of a move on the game-state is checked by the engine worker afterwards.
 
     Parameters:
     ----------
@@ -206,28 +87,28 @@ def playing_logic(
     -------
     Tuple[
     Tuple[INT_RANGE | Literal[-1], INT_RANGE | Literal[-1]],
-    Tuple[int, str],
     Tuple[Tuple[INT_RANGE, INT_RANGE] | None, str | None],
     ] :
         The updated versions of the arguments passed like :
-        (mouse_grid_pos, game_state_data, piece_that_has_to_move)
+        (mouse_grid_pos, piece_that_has_to_move)
     """
-    game_state_data = (0, "NoSide")
     if main.move_list:
         # If move_list exists and user want to move.
         if mouse_grid_pos in main.move_list:
-            main.occupied_squares.pop(piece_that_has_to_move[0])
-            main.occupied_squares[mouse_grid_pos] = piece_that_has_to_move[1]
-            castle_rook_mover(
-                move_count=main.move_count,
-                mouse_grid_pos=mouse_grid_pos,
-                piece_that_has_to_move=piece_that_has_to_move,
+            # Also moves the rook of a castle, takes a pawn en passant, updates the castling
+            # rights and passes the turn. A pawn reaching the last row becomes a queen.
+            promotes = main.position.mailbox[
+                piece_that_has_to_move[0][1] * 8 + piece_that_has_to_move[0][0]
+            ] % 6 == PAWN and mouse_grid_pos[1] in (0, 7)
+            main.make_move(
+                move=encode_move(
+                    move_from=piece_that_has_to_move[0],
+                    move_to=mouse_grid_pos,
+                    promotion=QUEEN if promotes else PAWN,
+                )
             )
-            castling_rights_manager(piece_that_has_to_move=piece_that_has_to_move)
             main.move_list = piece_that_has_to_move = []
             mouse_grid_pos = -1, -1
-            main.move_count += 1
-            game_state_data = game_state_determiner(move_count=main.move_count)
         # When user click pos is not somewhere moveable and also that the user has clicked somewhere after clicking the piece to move.
         elif mouse_grid_pos != piece_that_has_to_move[0]:
             main.logic(mouse_grid_pos=mouse_grid_pos)
@@ -249,57 +130,166 @@ def playing_logic(
             ]
         else:
             piece_that_has_to_move = []
+            mouse_grid_pos = -1, -1
+
+    return mouse_grid_pos, piece_that_has_to_move
+
+
+def frame_renderer(game_state_data: Tuple[int, str]) -> None:
+    """
+    Shows the pieces, the move markers and the result of a finished game on the screen.
+
+    Only the squares that changed since the last frame are drawn again.
 
-    return mouse_grid_pos, game_state_data, piece_that_has_to_move
+    Parameters:
+    ----------
+    1. game_state_data : Tuple[int, str]
+        The game_state_code and the appropriate side given by a GAME_STATE_JOB.
+    """
+    message = None
+    if game_state_data[0] == 2:
+        message = ("Draw due to Stalemate", (100, 350))
+    elif game_state_data[0] == 3:
+        message = ("Draw by Tablebase", (150, 350))
+    elif game_state_data[0] == 4:
+        message = ("Draw by 50-Move Rule", (100, 350))
+    elif game_state_data[0] == 5:
+        message = ("Draw by Repetition", (130, 350))
+    elif game_state_data[0] == 1:
+        message = (f"{game_state_data[1]} WINS!", (300, 350))
+    renderer.render(
+        occupied_squares=main.occupied_squares,
+        move_list=main.move_list,
+        message=message,
+    )
 
 
+# The starting size of the window, it can be resized and the board is fitted in it.
 SCREEN_SIZE = 800, 800
-screen = pygame.display.set_mode(SCREEN_SIZE)
+screen = pygame.display.set_mode(SCREEN_SIZE, pygame.RESIZABLE)
 pygame.display.set_caption("Chess Game")
 
-timer = pygame.time.Clock()
-FPS = 120
+# The game sleeps in pygame.event.wait until one of these events comes, so an idle game uses
+# no CPU. Mouse motion and the other events are not even queued.
+WAKE_UP_EVENTS = [
+    pygame.QUIT,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.WINDOWEXPOSED,
+    pygame.VIDEORESIZE,
+    ENGINE_RESULT_EVENT,
+]
+pygame.event.set_blocked(None)
+pygame.event.set_allowed(WAKE_UP_EVENTS)
+
+# The images and the font are loaded only now, converting the images needs the display
+# mode to be set. The starting size is kept on disk to start faster the next time.
+asset_cache = AssetsLoader.AssetCache()
+square_size, board_origin = board_layout(window_size=screen.get_size())
+renderer = BoardRenderer(
+    screen=screen,
+    assets=asset_cache.board_assets(square_size=square_size, keep_on_disk=True),
+    origin=board_origin,
+)
+
+# Set to "W" or "B" to let the engine play that side.
+COMPUTER_COLOR = None
+COMPUTER_MOVE_TIME = 1.0
+# Set to the path of a book made by OpeningBook.py to let the engine play its openings from it.
+OPENING_BOOK_PATH = None
+opening_book = OpeningBook(path=OPENING_BOOK_PATH) if OPENING_BOOK_PATH else None
+# Finds the game-state, the legal moves and the moves of the computer on a copy of the
+# position while the window keeps handling its events.
+worker = EngineWorker(tablebases=tablebases, opening_book=opening_book)
+
+
+def position_submitter() -> None:
+    """
+    Hands the jobs of the position on the board to the engine worker.
 
-# Font is initialized as it needs pygame to initialized.
-FONT_TYPE = pygame.font.Font(f"Assets{AssetsLoader.directory_path_separator}Font{AssetsLoader.directory_path_separator}JetBrainsMono.ttf", 50)
+    The jobs of the position before are cancelled, a search still running for it stops.
+    The legal moves come back first so the next click finds them ready.
+    """
+    worker.cancel()
+    worker.submit(main=main, kind=LEGAL_MOVES_JOB)
+    worker.submit(main=main, kind=GAME_STATE_JOB)
 
-BLACK = (0, 0, 0)
-BOARD_IMG_POS = 0, 0
 
 mouse_grid_pos = -1, -1
 piece_that_has_to_move = []
 # game_state_data[0] == 0 : Game should continue as normal.
 # game_state_data[0] == 1 : Check-mate delivered game ended.
 # game_state_data[0] == 2 : Game ended due to stalemate.
+# game_state_data[0] == 3 : Game ended as the tablebases know it is drawn.
+# game_state_data[0] == 4 : Game ended by the 50-move rule.
+# game_state_data[0] == 5 : Game ended by threefold repetition.
 game_state_data = (0, "NoSide")
-game_playing = True
+# Clicks wait while the game-state of the position on the board is not known yet, a move
+# could otherwise be played after the game ended.
+awaiting_game_state = True
+clicked_pos = None
+position_submitter()
+needs_redraw = True
 while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            exit()
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_grid_pos = mouse_pos_to_square_mapper(
-                mouse_pos=pygame.mouse.get_pos()
-            )
-    if game_playing:
-        mouse_grid_pos, game_state_data, piece_that_has_to_move = playing_logic(
-            mouse_grid_pos=mouse_grid_pos, piece_that_has_to_move=piece_that_has_to_move
+    if needs_redraw:
+        frame_renderer(game_state_data=game_state_data)
+        needs_redraw = False
+
+    event = pygame.event.wait()
+    computer_to_move = COMPUTER_COLOR == ("W" if main.move_count % 2 == 0 else "B")
+    if event.type == pygame.QUIT:
+        worker.stop()
+        pygame.quit()
+        exit()
+    if event.type == ENGINE_RESULT_EVENT:
+        # Results of an older position posted before it was cancelled are dropped.
+        if event.generation != worker.generation:
+            continue
+        if event.kind == LEGAL_MOVES_JOB and main.legal_moves_cache is None:
+            main.legal_moves_cache = event.result
+        elif event.kind == GAME_STATE_JOB:
+            game_state_data = event.result
+            awaiting_game_state = False
+            needs_redraw = game_state_data[0] != 0
+            if game_state_data[0] == 0 and computer_to_move:
+                worker.submit(
+                    main=main, kind=BEST_MOVE_JOB, move_time=COMPUTER_MOVE_TIME
+                )
+        elif event.kind == BEST_MOVE_JOB and event.result:
+            main.make_move(move=event.result)
+            main.move_list = piece_that_has_to_move = []
+            mouse_grid_pos = -1, -1
+            position_submitter()
+            awaiting_game_state = True
+            needs_redraw = True
+    elif event.type == pygame.MOUSEBUTTONDOWN:
+        clicked_pos = event.pos
+    elif event.type == pygame.VIDEORESIZE:
+        # Dragging the border sends a stream of these, only the last size is drawn.
+        pygame.event.get(eventtype=pygame.VIDEORESIZE)
+        screen = pygame.display.get_surface()
+        square_size, board_origin = board_layout(window_size=screen.get_size())
+        renderer.resize(
+            screen=screen,
+            assets=asset_cache.board_assets(square_size=square_size),
+            origin=board_origin,
         )
-    screen.fill(BLACK)
-    screen.blit(AssetsLoader.board_image, BOARD_IMG_POS)
-    piece_image_renderer(
-        occupied_squares=main.occupied_squares, move_list=main.move_list
-    )
-
-    if game_state_data[0] == 2:
-        msg = FONT_TYPE.render("Draw due to Stalemate", False, (0, 0, 0))
-        screen.blit(msg, (100, 350))
-        game_playing = False
-    elif game_state_data[0] == 1:
-        msg = FONT_TYPE.render(f"{game_state_data[1]} WINS!", False, (0, 0, 0))
-        screen.blit(msg, (300, 350))
-        game_playing = False
-
-    pygame.display.flip()
-    timer.tick(FPS)
+        needs_redraw = True
+    elif event.type == pygame.WINDOWEXPOSED:
+        renderer.invalidate()
+        needs_redraw = True
+
+    if clicked_pos is not None and not awaiting_game_state:
+        if game_state_data[0] == 0 and not computer_to_move:
+            shown_state = main.zobrist_key, main.move_list
+            mouse_grid_pos = mouse_pos_to_square_mapper(mouse_pos=clicked_pos)
+            mouse_grid_pos, piece_that_has_to_move = playing_logic(
+                mouse_grid_pos=mouse_grid_pos,
+                piece_that_has_to_move=piece_that_has_to_move,
+            )
+            if main.zobrist_key != shown_state[0]:
+                position_submitter()
+                awaiting_game_state = True
+            # A click that neither moves nor selects anything new leaves the screen as it is.
+            if (main.zobrist_key, main.move_list) != shown_state:
+                needs_redraw = True
+        clicked_pos = None
@@ -0,0 +1,147 @@
+"""
+This module holds a bounded cache of the move lists of single squares.
+
+Entries are keyed by the Zobrist key of the position and the square of the
+piece, so asking for the moves of the same piece in the same position again is
+a dictionary hit no matter how the position was reached.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+from collections import OrderedDict
+from sys import getsizeof
+from typing import Literal, Tuple
+
+
+INT_RANGE = Literal[0, 1, 2, 3, 4, 5, 6, 7]
+
+# Default memory cap of a cache, in bytes.
+MOVE_LIST_CACHE_BYTES = 1 << 20
+# Rough cost of an entry besides its move list: the (key, square) tuple, the two ints
+# and the slot in the ordered dictionary.
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class MoveListCache:
+    """
+    This class is a fixed size, Zobrist keyed cache of per square move lists.
+
+    When adding an entry would go over max_bytes the least recently used entries are
+    dropped first.
+
+    Attributes:
+    ----------
+    1. max_bytes : int
+        The memory cap of the cache.
+    2. used_bytes : int
+        The estimated memory the entries use.
+    3. entries : OrderedDict[Tuple[int, int], Tuple[Tuple[INT_RANGE, INT_RANGE], ...]]
+        The (zobrist key, square index) mapped to the move list, oldest use first.
+    4. hits : int
+        The number of lookups that found an entry.
+    5. misses : int
+        The number of lookups that did not.
+    """
+
+    def __init__(self, max_bytes: int = MOVE_LIST_CACHE_BYTES) -> None:
+        """
+        Initializes a MoveListCache object.
+
+        Parameters:
+        ----------
+        1. max_bytes : int
+            The memory cap of the cache.
+        """
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def entry_size(move_list: Tuple[Tuple[INT_RANGE, INT_RANGE], ...]) -> int:
+        """
+        Estimates the memory an entry takes.
+
+        The location tuples are shared with Bitboard.SQUARE_LOCATIONS so only the
+        move list itself is counted.
+
+        Parameters:
+        ----------
+        1. move_list : Tuple[Tuple[INT_RANGE, INT_RANGE], ...]
+            The move list of the entry.
+
+        Returns:
+        -------
+        int :
+            The estimated size in bytes.
+        """
+        return ENTRY_OVERHEAD_BYTES + getsizeof(move_list)
+
+    def get(
+        self, zobrist_key: int, square: int
+    ) -> Tuple[Tuple[INT_RANGE, INT_RANGE], ...] | None:
+        """
+        Looks up the move list of a square.
+
+        Parameters:
+        ----------
+        1. zobrist_key : int
+            The Zobrist key of the position.
+        2. square : int
+            The square index of the piece.
+
+        Returns:
+        -------
+        Tuple[Tuple[INT_RANGE, INT_RANGE], ...] | None :
+            The cached move list or None if it is not cached.
+        """
+        move_list = self.entries.get((zobrist_key, square))
+        if move_list is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end((zobrist_key, square))
+        return move_list
+
+    def put(
+        self,
+        zobrist_key: int,
+        square: int,
+        move_list: Tuple[Tuple[INT_RANGE, INT_RANGE], ...],
+    ) -> None:
+        """
+        Stores the move list of a square, evicting the least recently used entries if needed.
+
+        Parameters:
+        ----------
+        1. zobrist_key : int
+            The Zobrist key of the position.
+        2. square : int
+            The square index of the piece.
+        3. move_list : Tuple[Tuple[INT_RANGE, INT_RANGE], ...]
+            The move list to be stored.
+        """
+        size = self.entry_size(move_list=move_list)
+        if size > self.max_bytes:
+            return None
+        old_move_list = self.entries.pop((zobrist_key, square), None)
+        if old_move_list is not None:
+            self.used_bytes -= self.entry_size(move_list=old_move_list)
+        while self.used_bytes + size > self.max_bytes:
+            _, evicted_move_list = self.entries.popitem(last=False)
+            self.used_bytes -= self.entry_size(move_list=evicted_move_list)
+        self.entries[(zobrist_key, square)] = move_list
+        self.used_bytes += size
+
+    def clear(self) -> None:
+        """
+        Drops every entry.
+        """
+        self.entries.clear()
+        self.used_bytes = 0
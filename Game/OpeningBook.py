@@ -0,0 +1,365 @@
+"""
+This module reads and builds opening books so the engine can play known
+openings without searching.
+
+A book is a Polyglot style .bin file: 16 byte big endian entries of (key, move,
+weight, learn) sorted by key. The move uses the Polyglot layout (to file, to
+row, from file, from row, promotion piece, 3 bits each, rows counted from the
+1st rank) and a castle is written as the king taking its own rook. The key however is the
+engine's own Zobrist key, not the Polyglot one, so books made by other tools
+can't be read and the other way around.
+
+The file is opened with mmap and searched with a binary search so only the
+pages around the looked up position are read. A book is built in a single
+streaming pass over a PGN file, counting the moves of the first plies of every
+game weighted by the result.
+
+Usage:
+    python OpeningBook.py build games.pgn book.bin --plies 16
+    python OpeningBook.py probe book.bin --fen "<fen>"
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import argparse
+import mmap
+import struct
+from random import Random
+from typing import Dict, List, TextIO, Tuple
+from Bitboard import BISHOP, KING, KNIGHT, QUEEN, ROOK
+from Engine import CASTLE_ROOK_MOVES, START_FEN, Main, move_to_uci
+from PgnReplayer import pgn_games, pgn_parser, san_to_move
+
+
+BOOK_ENTRY_STRUCT = struct.Struct(">QHHI")
+BOOK_ENTRY_SIZE = BOOK_ENTRY_STRUCT.size
+BOOK_KEY_STRUCT = struct.Struct(">Q")
+MAX_WEIGHT = 0xFFFF
+# The (king from, rook from) square indices of a castle mapped to the king destination.
+CASTLE_KING_MOVES = {
+    (king_from, rook_from): king_to
+    for (king_from, king_to), (rook_from, _) in CASTLE_ROOK_MOVES.items()
+}
+# The Polyglot promotion code of every piece type, 0 for no promotion, and back.
+BOOK_PROMOTION_CODES = {ROOK: 3, KNIGHT: 1, BISHOP: 2, QUEEN: 4}
+BOOK_PROMOTION_TYPES = {
+    code: piece_type for piece_type, code in BOOK_PROMOTION_CODES.items()
+}
+# The weight a move gets for the result of the game, from the point of view of its side.
+RESULT_WEIGHTS = {"win": 2, "draw": 1, "loss": 0}
+
+
+def move_to_book_move(main: Main, move: int) -> int:
+    """
+    Converts a move of the position held by main into the Polyglot layout.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position the move is played in.
+    2. move : int
+        The move packed like encode_move does.
+
+    Returns:
+    -------
+    int :
+        The 16 bit book move.
+    """
+    move_from, move_to = move & 63, move >> 6 & 63
+    if main.position.mailbox[move_from] % 6 == KING and (move_from, move_to) in (
+        CASTLE_ROOK_MOVES
+    ):
+        move_to = CASTLE_ROOK_MOVES[(move_from, move_to)][0]
+    # Polyglot counts the rows from the 1st rank, the engine from the 8th.
+    return (
+        (move_to ^ 56)
+        | (move_from ^ 56) << 6
+        | BOOK_PROMOTION_CODES.get(move >> 12, 0) << 12
+    )
+
+
+def book_move_to_move(main: Main, book_move: int) -> int:
+    """
+    Converts a book move back into a move of the position held by main.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position the move is played in.
+    2. book_move : int
+        The 16 bit book move.
+
+    Returns:
+    -------
+    int :
+        The move packed like encode_move does, it still has to be checked for legality.
+    """
+    move_from, move_to = (book_move >> 6 & 63) ^ 56, (book_move & 63) ^ 56
+    if main.position.mailbox[move_from] % 6 == KING and (move_from, move_to) in (
+        CASTLE_KING_MOVES
+    ):
+        move_to = CASTLE_KING_MOVES[(move_from, move_to)]
+    return (
+        move_from
+        | move_to << 6
+        | BOOK_PROMOTION_TYPES.get(book_move >> 12 & 7, 0) << 12
+    )
+
+
+class OpeningBook:
+    """
+    This class looks moves up in a book file opened with mmap.
+
+    Attributes:
+    ----------
+    1. file : BinaryIO
+        The open book file.
+    2. mapping : mmap.mmap | None
+        The read only mapping of the file, None for an empty book.
+    3. size : int
+        The number of entries.
+    4. random : Random
+        Picks among the book moves, seed it for repeatable choices.
+    """
+
+    def __init__(self, path: str, seed: int | None = None) -> None:
+        """
+        Initializes an OpeningBook object.
+
+        Parameters:
+        ----------
+        1. path : str
+            The book file.
+        2. seed : int | None
+            The seed of the random choice of the moves.
+        """
+        self.file = open(path, "rb")
+        file_size = self.file.seek(0, 2)
+        self.size = file_size // BOOK_ENTRY_SIZE
+        self.mapping = (
+            mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size
+            else None
+        )
+        self.random = Random(seed)
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmaps and closes the book file.
+        """
+        if self.mapping is not None:
+            self.mapping.close()
+        self.file.close()
+
+    def entries(self, key: int) -> List[Tuple[int, int]]:
+        """
+        Finds every entry of a position.
+
+        Parameters:
+        ----------
+        1. key : int
+            The Zobrist key of the position.
+
+        Returns:
+        -------
+        List[Tuple[int, int]] :
+            The (book move, weight) of every entry, in file order.
+        """
+        if self.mapping is None:
+            return []
+        low, high = 0, self.size
+        # The first entry whose key is not smaller than the looked up one.
+        while low < high:
+            middle = (low + high) // 2
+            if (
+                BOOK_KEY_STRUCT.unpack_from(self.mapping, middle * BOOK_ENTRY_SIZE)[0]
+                < key
+            ):
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.size:
+            entry_key, book_move, weight, _ = BOOK_ENTRY_STRUCT.unpack_from(
+                self.mapping, low * BOOK_ENTRY_SIZE
+            )
+            if entry_key != key:
+                break
+            found.append((book_move, weight))
+            low += 1
+        return found
+
+    def moves(self, main: Main) -> List[Tuple[int, int]]:
+        """
+        Gives the legal book moves of the position held by main.
+
+        Parameters:
+        ----------
+        1. main : Main
+            The engine holding the position.
+
+        Returns:
+        -------
+        List[Tuple[int, int]] :
+            The (move, weight) of every legal book move.
+        """
+        legal_moves = main.generate_legal_moves()
+        moves = []
+        for book_move, weight in self.entries(key=main.zobrist_key):
+            move = book_move_to_move(main=main, book_move=book_move)
+            if move in legal_moves:
+                moves.append((move, weight))
+        return moves
+
+    def choose_move(self, main: Main) -> int | None:
+        """
+        Picks a book move at random, the chance of a move being its share of the weights.
+
+        Parameters:
+        ----------
+        1. main : Main
+            The engine holding the position.
+
+        Returns:
+        -------
+        int | None :
+            The chosen move or None if the position is not in the book.
+        """
+        moves = [(move, weight) for move, weight in self.moves(main=main) if weight]
+        if not moves:
+            return None
+        return self.random.choices(
+            [move for move, _ in moves], weights=[weight for _, weight in moves]
+        )[0]
+
+
+def book_builder(
+    input_file: TextIO, output_path: str, max_plies: int = 16, min_weight: int = 1
+) -> Tuple[int, int]:
+    """
+    Builds a book from the games of a PGN file in a single pass.
+
+    Only the first max_plies plies of every game are counted, so the memory used depends
+    on the number of different opening positions and not on the size of the file. A game
+    is followed up to its first illegal move.
+
+    Parameters:
+    ----------
+    1. input_file : TextIO
+        The PGN file.
+    2. output_path : str
+        The book file to be written.
+    3. max_plies : int
+        The number of plies of every game to count.
+    4. min_weight : int
+        Moves with a smaller total weight are left out of the book.
+
+    Returns:
+    -------
+    Tuple[int, int] :
+        The (number of games read, number of entries written).
+    """
+    main = Main()
+    weights: Dict[Tuple[int, int], int] = {}
+    game_count = 0
+    for game_text in pgn_games(input_file=input_file):
+        game_count += 1
+        tags, sans, result = pgn_parser(game_text=game_text)
+        try:
+            main.load_fen(fen=tags.get("FEN", START_FEN))
+        except (ValueError, KeyError, IndexError):
+            continue
+        for san in sans[:max_plies]:
+            try:
+                move = san_to_move(main=main, san=san)
+            except ValueError:
+                break
+            white_to_move = main.move_count % 2 == 0
+            if result == "1/2-1/2":
+                weight = RESULT_WEIGHTS["draw"]
+            elif result == ("1-0" if white_to_move else "0-1"):
+                weight = RESULT_WEIGHTS["win"]
+            else:
+                weight = RESULT_WEIGHTS["loss"]
+            entry = (main.zobrist_key, move_to_book_move(main=main, move=move))
+            weights[entry] = weights.get(entry, 0) + weight
+            main.make_move(move=move)
+
+    entries = sorted(
+        (
+            (key, book_move, weight)
+            for (key, book_move), weight in weights.items()
+            if weight >= min_weight
+        ),
+        key=lambda entry: (entry[0], -entry[2], entry[1]),
+    )
+    with open(output_path, "wb") as output_file:
+        for key, book_move, weight in entries:
+            output_file.write(
+                BOOK_ENTRY_STRUCT.pack(key, book_move, min(weight, MAX_WEIGHT), 0)
+            )
+    return game_count, len(entries)
+
+
+def main_runner() -> int:
+    """
+    The command line entry point.
+
+    Returns:
+    -------
+    int :
+        The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Build or look up an opening book.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="build a book from a PGN file")
+    build_parser.add_argument("pgn", help="the PGN file")
+    build_parser.add_argument("book", help="the book file to be written")
+    build_parser.add_argument(
+        "--plies", type=int, default=16, help="the plies of every game to count"
+    )
+    build_parser.add_argument(
+        "--min-weight", type=int, default=1, help="the smallest weight kept"
+    )
+    probe_parser = subparsers.add_parser(
+        "probe", help="list the book moves of a position"
+    )
+    probe_parser.add_argument("book", help="the book file")
+    probe_parser.add_argument("--fen", default=START_FEN, help="the position")
+    arguments = parser.parse_args()
+
+    if arguments.command == "build":
+        with open(arguments.pgn, errors="replace") as input_file:
+            game_count, entry_count = book_builder(
+                input_file=input_file,
+                output_path=arguments.book,
+                max_plies=arguments.plies,
+                min_weight=arguments.min_weight,
+            )
+        print(f"{game_count} games read, {entry_count} entries written")
+        return 0
+
+    main = Main()
+    main.load_fen(fen=arguments.fen)
+    with OpeningBook(path=arguments.book) as book:
+        moves = book.moves(main=main)
+    total_weight = sum(weight for _, weight in moves) or 1
+    for move, weight in moves:
+        print(f"{move_to_uci(move=move)} {weight} ({100 * weight / total_weight:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_runner())
@@ -0,0 +1,210 @@
+"""
+This module stores positions in a fixed size binary format of 32 bytes.
+
+The layout, little endian, is:
+
+    bytes  0-7   the occupancy bitboard
+    bytes  8-23  the piece index of every occupied square, 4 bits each, in square
+                 index order (a position holds at most 32 pieces)
+    byte   24    bit 0 the side to move (1 for black), bits 1-4 the castling rights
+    byte   25    the en passant square index or 255 if there is none
+    byte   26    the halfmove clock, capped at 255
+    bytes 27-28  the fullmove number, at most 65535
+    bytes 29-31  padding
+
+Because every record has the same size a file of them can be memory-mapped and
+the n-th position read straight from offset n * 32 without loading the file.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import mmap
+import struct
+from array import array
+from typing import BinaryIO, Iterable, Iterator
+from Bitboard import PIECE_NAMES, SQUARE_LOCATIONS, bitboard_squares
+from Engine import Main
+
+
+PACKED_POSITION_STRUCT = struct.Struct("<Q16sBBBH3x")
+PACKED_POSITION_SIZE = PACKED_POSITION_STRUCT.size
+NO_EN_PASSANT = 255
+# The fullmove number is an unsigned 16-bit field.
+MAX_FULLMOVE = 65535
+
+
+def position_packer(main: Main) -> bytes:
+    """
+    Packs the position held by a Main object.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position.
+
+    Returns:
+    -------
+    bytes :
+        The PACKED_POSITION_SIZE bytes of the position.
+
+    Raises:
+    ------
+    ValueError :
+        If the board holds more than 32 pieces or the fullmove number is above
+        MAX_FULLMOVE.
+    """
+    position = main.position
+    occupancy = position.occupancy
+    if occupancy.bit_count() > 32:
+        raise ValueError("a packed position holds at most 32 pieces")
+    fullmove = main.move_count // 2 + 1
+    if fullmove > MAX_FULLMOVE:
+        raise ValueError(
+            f"a packed position holds fullmove numbers up to {MAX_FULLMOVE}, not {fullmove}"
+        )
+    nibbles = array("B", bytes(16))
+    for index, square in enumerate(bitboard_squares(occupancy)):
+        nibbles[index >> 1] |= position.mailbox[square] << (4 * (index & 1))
+    return PACKED_POSITION_STRUCT.pack(
+        occupancy,
+        nibbles.tobytes(),
+        main.move_count % 2 | main.castling_rights << 1,
+        NO_EN_PASSANT if main.en_passant_square is None else main.en_passant_square,
+        min(main.halfmove_clock, 255),
+        fullmove,
+    )
+
+
+def packed_position_loader(main: Main, data: bytes) -> None:
+    """
+    Sets the board of a Main object up from a packed position.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine to be set up, its game history is cleared.
+    2. data : bytes
+        The PACKED_POSITION_SIZE bytes of the position, any buffer works.
+    """
+    occupancy, nibbles, flags, en_passant, halfmove_clock, fullmove = (
+        PACKED_POSITION_STRUCT.unpack(data)
+    )
+    occupied_squares = {}
+    for index, square in enumerate(bitboard_squares(occupancy)):
+        piece = nibbles[index >> 1] >> (4 * (index & 1)) & 15
+        if piece >= len(PIECE_NAMES):
+            raise ValueError(f"invalid piece {piece} in a packed position")
+        occupied_squares[SQUARE_LOCATIONS[square]] = PIECE_NAMES[piece]
+    main.load_position(
+        occupied_squares=occupied_squares,
+        move_count=max(fullmove - 1, 0) * 2 + (flags & 1),
+        castling_rights=flags >> 1 & 15,
+        en_passant_square=None if en_passant == NO_EN_PASSANT else en_passant,
+        halfmove_clock=halfmove_clock,
+    )
+
+
+def packed_positions_writer(
+    output_file: BinaryIO, packed_positions: Iterable[bytes]
+) -> int:
+    """
+    Writes packed positions one after the other.
+
+    Parameters:
+    ----------
+    1. output_file : BinaryIO
+        The file opened for binary writing.
+    2. packed_positions : Iterable[bytes]
+        The packed positions, consumed lazily.
+
+    Returns:
+    -------
+    int :
+        The number of positions written.
+    """
+    count = 0
+    for data in packed_positions:
+        output_file.write(data)
+        count += 1
+    return count
+
+
+class PackedPositionFile:
+    """
+    This class gives read access to a file of packed positions through mmap.
+
+    Only the pages of the positions actually read are loaded by the operating system.
+
+    Attributes:
+    ----------
+    1. file : BinaryIO
+        The open file.
+    2. mapping : mmap.mmap | None
+        The read only mapping of the file, None for an empty file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes a PackedPositionFile object.
+
+        Parameters:
+        ----------
+        1. path : str
+            The file of packed positions.
+        """
+        self.file = open(path, "rb")
+        size = self.file.seek(0, 2)
+        if size % PACKED_POSITION_SIZE:
+            self.file.close()
+            raise ValueError(f"{path} is not a file of packed positions")
+        self.mapping = (
+            mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        )
+
+    def __enter__(self) -> "PackedPositionFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return 0 if self.mapping is None else len(self.mapping) // PACKED_POSITION_SIZE
+
+    def __getitem__(self, index: int) -> bytes:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        offset = index * PACKED_POSITION_SIZE
+        return self.mapping[offset : offset + PACKED_POSITION_SIZE]
+
+    def __iter__(self) -> Iterator[bytes]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def load(self, main: Main, index: int) -> None:
+        """
+        Sets the board of a Main object up from the position at index.
+
+        Parameters:
+        ----------
+        1. main : Main
+            The engine to be set up.
+        2. index : int
+            The number of the position in the file.
+        """
+        packed_position_loader(main=main, data=self[index])
+
+    def close(self) -> None:
+        """
+        Unmaps and closes the file.
+        """
+        if self.mapping is not None:
+            self.mapping.close()
+        self.file.close()
@@ -0,0 +1,657 @@
+"""
+This module spreads the search over several processes so it can use every core.
+
+Two modes are offered:
+
+1. Root splitting: every iteration the best root move of the last one is
+   searched first with a full window, then the other root moves are handed out
+   to a pool of worker processes with a null window at its score, only to prove
+   they are not better. The few that are get searched again with an open
+   window. Every worker keeps its transposition table from one move and one
+   iteration to the next. With a node budget the table is cleared before every
+   move instead, so the result doesn't depend on how the moves were spread over
+   the workers and the same budget always gives the same move.
+2. Lazy SMP: every worker runs the whole iterative deepening search on the root
+   position while sharing one transposition table through shared memory. The
+   helpers fill the table with results the main worker finds for free, which
+   makes it deeper in the same time. The result depends on timing.
+
+Usage:
+    python ParallelSearch.py --workers 4 --depth 5
+    python ParallelSearch.py --mode lazy --workers 4 --time 10
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import argparse
+import pickle
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from os import cpu_count
+from time import perf_counter, time
+from typing import Callable, Dict, List, Tuple
+from Engine import Main
+from Search import (
+    INFINITY,
+    MATE_BOUND,
+    MATE_SCORE,
+    MAX_PLY,
+    TIME_CHECK_MASK,
+    TRANSPOSITION_TABLE_BYTES,
+    SearchAborted,
+    Searcher,
+    SearchResult,
+    TranspositionTable,
+    result_reporter,
+)
+
+
+# Every worker process of root splitting keeps a table of this size.
+ROOT_MOVE_TABLE_BYTES = 16 << 20
+# Bytes of a shared table slot, the key and the data as two 64-bit words.
+SHARED_ENTRY_BYTES = 16
+# Added to the score so it packs as an unsigned number.
+SCORE_OFFSET = 1 << 23
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    This class is a TranspositionTable kept in shared memory so several processes can use it.
+
+    Every slot is two 64-bit words, the packed data and the key XOR-ed with the data. A slot
+    half written by another process then fails the key check and reads as missing, so no
+    lock is needed.
+
+    Attributes:
+    ----------
+    1. size : int
+        The number of slots, a power of two.
+    2. shared : shared_memory.SharedMemory
+        The shared memory block holding the slots.
+    3. words : memoryview
+        The block seen as unsigned 64-bit words.
+    4. generation : int
+        Counts the searches made by this process, used to age the entries out.
+    """
+
+    def __init__(
+        self, max_bytes: int = TRANSPOSITION_TABLE_BYTES, name: str | None = None
+    ) -> None:
+        """
+        Initializes a SharedTranspositionTable object.
+
+        Parameters:
+        ----------
+        1. max_bytes : int
+            The memory cap of the table.
+        2. name : str | None
+            The name of a table created by another process to attach to, a new table is
+            created if it is not provided.
+        """
+        self.size = 1 << max((max_bytes // SHARED_ENTRY_BYTES).bit_length() - 1, 0)
+        if name is None:
+            self.shared = shared_memory.SharedMemory(
+                create=True, size=self.size * SHARED_ENTRY_BYTES
+            )
+        else:
+            self.shared = shared_memory.SharedMemory(name=name)
+        self.words = self.shared.buf.cast("Q")
+        self.generation = 0
+
+    def probe(self, key: int) -> Tuple[int, int, int, int, int, int] | None:
+        index = (key & (self.size - 1)) << 1
+        data = self.words[index + 1]
+        if not data or self.words[index] ^ data != key:
+            return None
+        return (
+            key,
+            data >> 16 & 255,
+            data >> 24 & 3,
+            (data >> 34 & 0xFFFFFF) - SCORE_OFFSET,
+            data & 0xFFFF,
+            data >> 26 & 255,
+        )
+
+    def store(self, key: int, depth: int, flag: int, score: int, move: int) -> None:
+        index = (key & (self.size - 1)) << 1
+        old_data = self.words[index + 1]
+        if (
+            old_data
+            and self.words[index] ^ old_data != key
+            and old_data >> 26 & 255 == self.generation & 255
+            and depth < old_data >> 16 & 255
+        ):
+            return None
+        data = (
+            move
+            | min(max(depth, 0), 255) << 16
+            | flag << 24
+            | (self.generation & 255) << 26
+            | (score + SCORE_OFFSET) << 34
+        )
+        self.words[index] = key ^ data
+        self.words[index + 1] = data
+
+    def clear(self) -> None:
+        self.shared.buf[:] = bytes(self.size * SHARED_ENTRY_BYTES)
+        self.generation = 0
+
+    def close(self, unlink: bool = False) -> None:
+        """
+        Detaches from the shared memory.
+
+        Parameters:
+        ----------
+        1. unlink : bool
+            Also frees the memory, only the process that created the table should do it.
+        """
+        self.words.release()
+        self.shared.close()
+        if unlink:
+            self.shared.unlink()
+
+
+class HelperSearcher(Searcher):
+    """
+    This class is a Searcher that also stops when another process raises a shared flag.
+
+    Attributes:
+    ----------
+    1. stop_flag : memoryview
+        A single shared byte, any value but 0 stops the search.
+    """
+
+    def __init__(self, stop_flag: memoryview, **kwargs) -> None:
+        """
+        Initializes a HelperSearcher object.
+
+        Parameters:
+        ----------
+        1. stop_flag : memoryview
+            A single shared byte, any value but 0 stops the search.
+        2. kwargs :
+            Passed on to Searcher.
+        """
+        super().__init__(**kwargs)
+        self.stop_flag = stop_flag
+
+    def limits_checker(self) -> None:
+        if not self.nodes & TIME_CHECK_MASK and self.stop_flag[0]:
+            raise SearchAborted
+        super().limits_checker()
+
+
+# The position last sent to this worker process, kept so it is unpickled only once.
+worker_state = (b"", None)
+# The transposition table of the root moves searched by this worker process.
+worker_transposition_table = None
+
+
+def worker_main_loader(main_bytes: bytes) -> Main:
+    """
+    Gives the Main object of a pickled position inside a worker process.
+
+    Parameters:
+    ----------
+    1. main_bytes : bytes
+        The pickled Main object.
+
+    Returns:
+    -------
+    Main :
+        The unpickled object, the same one as long as the same bytes are sent.
+    """
+    global worker_state
+    if worker_state[0] != main_bytes:
+        worker_state = (main_bytes, pickle.loads(main_bytes))
+    return worker_state[1]
+
+
+def root_move_worker(
+    main_bytes: bytes,
+    move: int,
+    depth: int,
+    alpha: int,
+    beta: int,
+    node_limit: int | None,
+    deadline: float | None,
+) -> Tuple[int, int | None, int]:
+    """
+    Searches a single root move within a window, runs inside a worker process.
+
+    Parameters:
+    ----------
+    1. main_bytes : bytes
+        The pickled Main object holding the root position.
+    2. move : int
+        The root move to be searched.
+    3. depth : int
+        The depth of the iteration, the root move counts as one ply.
+    4. alpha : int
+        The root score already reached, a move not beating it only gets an upper bound.
+    5. beta : int
+        The root score that is a bound high enough, a move reaching it only gets a lower
+        bound.
+    6. node_limit : int | None
+        The nodes the search of this move may visit, when given the search starts from
+        an empty transposition table so that its result is reproducible.
+    7. deadline : float | None
+        The time.time() the search has to stop at, moves waiting in the queue don't get
+        extra time.
+
+    Returns:
+    -------
+    Tuple[int, int | None, int] :
+        The (move, score for the side to move at the root, nodes searched), the score is
+        None when a limit was hit.
+    """
+    global worker_transposition_table
+    time_limit = None
+    if deadline is not None:
+        time_limit = deadline - time()
+        if time_limit <= 0:
+            return move, None, 0
+    main = worker_main_loader(main_bytes=main_bytes)
+    if worker_transposition_table is None:
+        worker_transposition_table = TranspositionTable(max_bytes=ROOT_MOVE_TABLE_BYTES)
+    elif node_limit is not None:
+        # The entries left by the moves this process searched before would change the nodes.
+        worker_transposition_table.clear()
+    searcher = Searcher(main=main, transposition_table=worker_transposition_table)
+    searcher.search_setup(time_limit=time_limit, node_limit=node_limit)
+    root_depth = len(main.undo_stack)
+    main.make_move(move=move)
+    try:
+        score = -searcher.negamax(depth=depth - 1, alpha=-beta, beta=-alpha, ply=1)
+    except SearchAborted:
+        score = None
+    while len(main.undo_stack) > root_depth:
+        main.unmake_move()
+    return move, score, searcher.nodes
+
+
+def lazy_smp_worker(
+    main_bytes: bytes,
+    index: int,
+    table_name: str,
+    table_bytes: int,
+    stop_name: str,
+    max_depth: int,
+    node_limit: int | None,
+    time_limit: float | None,
+) -> SearchResult:
+    """
+    Runs a whole search sharing the transposition table, runs inside a worker process.
+
+    Parameters:
+    ----------
+    1. main_bytes : bytes
+        The pickled Main object holding the root position.
+    2. index : int
+        The number of the worker, the worker 0 is the main one.
+    3. table_name : str
+        The name of the shared transposition table.
+    4. table_bytes : int
+        The memory cap the shared table was created with.
+    5. stop_name : str
+        The name of the shared stop flag.
+    6. max_depth : int
+        The deepest iteration to run.
+    7. node_limit : int | None
+        The nodes this worker may visit.
+    8. time_limit : float | None
+        The seconds this worker may take.
+
+    Returns:
+    -------
+    SearchResult :
+        The result of the search of this worker.
+    """
+    main = worker_main_loader(main_bytes=main_bytes)
+    transposition_table = SharedTranspositionTable(
+        max_bytes=table_bytes, name=table_name
+    )
+    stop_memory = shared_memory.SharedMemory(name=stop_name)
+    searcher = HelperSearcher(
+        stop_flag=stop_memory.buf,
+        main=main,
+        transposition_table=transposition_table,
+    )
+    # Odd helpers look one ply deeper so the workers don't all search the same tree.
+    result = searcher.search(
+        max_depth=max_depth + index % 2 if index else max_depth,
+        time_limit=time_limit,
+        node_limit=node_limit,
+    )
+    searcher.stop_flag = None
+    transposition_table.close()
+    stop_memory.close()
+    return result
+
+
+class ParallelSearcher:
+    """
+    This class searches the position held by a Main object with a pool of worker processes.
+
+    Attributes:
+    ----------
+    1. main : Main
+        The engine holding the position to be searched, it is never changed.
+    2. workers : int
+        The number of worker processes.
+    3. executor : ProcessPoolExecutor
+        The pool of worker processes, kept alive between searches.
+    4. reporter : Callable[[SearchResult], None] | None
+        Called with the result of every finished iteration of root splitting.
+    """
+
+    def __init__(
+        self,
+        main: Main,
+        workers: int | None = None,
+        reporter: Callable[[SearchResult], None] | None = None,
+    ) -> None:
+        """
+        Initializes a ParallelSearcher object.
+
+        Parameters:
+        ----------
+        1. main : Main
+            The engine holding the position to be searched.
+        2. workers : int | None
+            The number of worker processes, one per core if it is not provided.
+        3. reporter : Callable[[SearchResult], None] | None
+            Called with the result of every finished iteration of root splitting.
+        """
+        self.main = main
+        self.workers = workers or cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.reporter = reporter
+
+    def __enter__(self) -> "ParallelSearcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shuts the worker processes down.
+        """
+        self.executor.shutdown(cancel_futures=True)
+
+    def root_split_search(
+        self,
+        max_depth: int = MAX_PLY - 1,
+        time_limit: float | None = None,
+        node_limit: int | None = None,
+    ) -> SearchResult:
+        """
+        Searches deeper and deeper, the root moves of every iteration split over the workers.
+
+        The best move of the last iteration is searched alone first, its score is the
+        null window the other moves are searched with in parallel. A move failing high
+        on it is searched again with the window open above. Every search of a move may
+        visit an equal share of the node budget left at the start of the iteration, an
+        iteration where any search runs out of nodes or time is thrown away. Without a time
+        limit the result only depends on node_limit, not on the number of workers.
+
+        Parameters:
+        ----------
+        1. max_depth : int
+            The deepest iteration to run.
+        2. time_limit : float | None
+            The seconds the search may take.
+        3. node_limit : int | None
+            The nodes all the workers together may visit.
+
+        Returns:
+        -------
+        SearchResult :
+            The result of the deepest finished iteration.
+        """
+        start_time = perf_counter()
+        deadline = None if time_limit is None else time() + time_limit
+        main_bytes = pickle.dumps(self.main)
+        moves = list(self.main.generate_legal_moves())
+        result = SearchResult(
+            best_move=moves[0] if moves else 0,
+            score=0,
+            depth=0,
+            nodes=0,
+            seconds=0.0,
+            principal_variation=tuple(moves[:1]),
+        )
+        if not moves:
+            return result
+        nodes = 0
+        for depth in range(1, max_depth + 1):
+            if deadline is not None and time() >= deadline:
+                break
+            move_node_limit = None
+            if node_limit is not None:
+                move_node_limit = (node_limit - nodes) // len(moves)
+                if move_node_limit <= 0:
+                    break
+            search_options = dict(
+                main_bytes=main_bytes,
+                depth=depth,
+                node_limit=move_node_limit,
+                deadline=deadline,
+            )
+            scores, first_nodes = self.root_moves_searcher(
+                moves=moves[:1], alpha=-INFINITY, beta=INFINITY, **search_options
+            )
+            nodes += first_nodes
+            if scores is None:
+                break
+            alpha = scores[moves[0]]
+            other_scores, other_nodes = self.root_moves_searcher(
+                moves=moves[1:], alpha=alpha, beta=alpha + 1, **search_options
+            )
+            nodes += other_nodes
+            if other_scores is None:
+                break
+            scores.update(other_scores)
+            better_moves = [move for move in moves[1:] if scores[move] > alpha]
+            if better_moves:
+                better_scores, better_nodes = self.root_moves_searcher(
+                    moves=better_moves, alpha=alpha, beta=INFINITY, **search_options
+                )
+                nodes += better_nodes
+                if better_scores is None:
+                    break
+                scores.update(better_scores)
+            # A stable sort keeps the order of equal scores, the moves that only got an upper
+            # bound equal to the best score stay behind it.
+            moves.sort(key=lambda move: scores[move], reverse=True)
+            result = SearchResult(
+                best_move=moves[0],
+                score=scores[moves[0]],
+                depth=depth,
+                nodes=nodes,
+                seconds=perf_counter() - start_time,
+                principal_variation=(moves[0],),
+            )
+            if self.reporter is not None:
+                self.reporter(result)
+            if (
+                abs(result.score) > MATE_BOUND
+                and MATE_SCORE - abs(result.score) <= depth
+            ):
+                break
+        return result._replace(nodes=nodes, seconds=perf_counter() - start_time)
+
+    def root_moves_searcher(
+        self,
+        main_bytes: bytes,
+        moves: List[int],
+        depth: int,
+        alpha: int,
+        beta: int,
+        node_limit: int | None,
+        deadline: float | None,
+    ) -> Tuple[Dict[int, int] | None, int]:
+        """
+        Searches root moves in parallel, all within the same window.
+
+        Parameters:
+        ----------
+        1. main_bytes : bytes
+            The pickled Main object holding the root position.
+        2. moves : List[int]
+            The root moves to be searched.
+        3. depth : int
+            The depth of the iteration.
+        4. alpha : int
+            The lower end of the window.
+        5. beta : int
+            The upper end of the window.
+        6. node_limit : int | None
+            The nodes the search of every move may visit.
+        7. deadline : float | None
+            The time.time() the searches have to stop at.
+
+        Returns:
+        -------
+        Tuple[Dict[int, int] | None, int] :
+            The moves mapped to their scores, None when a limit was hit, and the nodes
+            searched.
+        """
+        futures = [
+            self.executor.submit(
+                root_move_worker,
+                main_bytes,
+                move,
+                depth,
+                alpha,
+                beta,
+                node_limit,
+                deadline,
+            )
+            for move in moves
+        ]
+        scores, nodes = {}, 0
+        for future in futures:
+            move, score, move_nodes = future.result()
+            nodes += move_nodes
+            scores[move] = score
+        if None in scores.values():
+            return None, nodes
+        return scores, nodes
+
+    def lazy_smp_search(
+        self,
+        max_depth: int = MAX_PLY - 1,
+        time_limit: float | None = None,
+        node_limit: int | None = None,
+        table_bytes: int = TRANSPOSITION_TABLE_BYTES,
+    ) -> SearchResult:
+        """
+        Runs the search on every worker at once sharing a single transposition table.
+
+        The result of the worker 0 is returned with the nodes of all the workers, the
+        helpers are stopped as soon as it is done.
+
+        Parameters:
+        ----------
+        1. max_depth : int
+            The deepest iteration the main worker runs.
+        2. time_limit : float | None
+            The seconds the search may take.
+        3. node_limit : int | None
+            The nodes every single worker may visit.
+        4. table_bytes : int
+            The memory cap of the shared transposition table.
+
+        Returns:
+        -------
+        SearchResult :
+            The result of the main worker.
+        """
+        start_time = perf_counter()
+        main_bytes = pickle.dumps(self.main)
+        transposition_table = SharedTranspositionTable(max_bytes=table_bytes)
+        stop_memory = shared_memory.SharedMemory(create=True, size=1)
+        stop_memory.buf[0] = 0
+        futures = []
+        try:
+            futures = [
+                self.executor.submit(
+                    lazy_smp_worker,
+                    main_bytes,
+                    index,
+                    transposition_table.shared.name,
+                    table_bytes,
+                    stop_memory.name,
+                    max_depth,
+                    node_limit,
+                    time_limit,
+                )
+                for index in range(self.workers)
+            ]
+            result = futures[0].result()
+            stop_memory.buf[0] = 1
+            nodes = result.nodes + sum(future.result().nodes for future in futures[1:])
+        finally:
+            # Also when the main worker failed, the helpers would otherwise search on with
+            # no limit and keep the pool busy. They are waited for before the shared memory
+            # goes away.
+            stop_memory.buf[0] = 1
+            wait(futures)
+            transposition_table.close(unlink=True)
+            stop_memory.close()
+            stop_memory.unlink()
+        return result._replace(nodes=nodes, seconds=perf_counter() - start_time)
+
+
+def main_runner() -> int:
+    """
+    The command line entry point.
+
+    Returns:
+    -------
+    int :
+        The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Search with several processes.")
+    parser.add_argument("--fen", help="the position to search, the start by default")
+    parser.add_argument(
+        "--mode", choices=["root", "lazy"], default="root", help="how to split the work"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="the number of processes, one per core by default"
+    )
+    parser.add_argument("--depth", type=int, default=4, help="the deepest iteration")
+    parser.add_argument("--time", type=float, help="the seconds the search may take")
+    parser.add_argument("--nodes", type=int, help="the nodes the search may visit")
+    arguments = parser.parse_args()
+
+    main = Main()
+    if arguments.fen:
+        main.load_fen(fen=arguments.fen)
+    with ParallelSearcher(
+        main=main, workers=arguments.workers, reporter=result_reporter
+    ) as parallel_searcher:
+        search = (
+            parallel_searcher.root_split_search
+            if arguments.mode == "root"
+            else parallel_searcher.lazy_smp_search
+        )
+        result = search(
+            max_depth=arguments.depth,
+            time_limit=arguments.time,
+            node_limit=arguments.nodes,
+        )
+    result_reporter(result)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_runner())
@@ -0,0 +1,241 @@
+"""
+This module counts the leaf nodes of the move tree of the engine (perft).
+
+The counts are compared against well known reference numbers to catch move
+generation bugs and the nodes per second are reported to measure the speed of
+the engine. It runs without pygame.
+
+Usage:
+    python Perft.py --depth 4
+    python Perft.py --fen "<fen>" --depth 3 --divide
+    python Perft.py --suite --max-nodes 1000000
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import argparse
+from time import perf_counter
+from typing import Dict, List, Tuple
+from Engine import START_FEN, Main, move_to_uci
+
+
+# (name, fen, expected node counts from depth 1 onwards).
+REFERENCE_POSITIONS: List[Tuple[str, str, List[int]]] = [
+    (
+        "Start position",
+        START_FEN,
+        [20, 400, 8902, 197281, 4865609, 119060324],
+    ),
+    (
+        "Kiwipete",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        [48, 2039, 97862, 4085603, 193690690],
+    ),
+    (
+        "Position 3",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        [14, 191, 2812, 43238, 674624, 11030083],
+    ),
+    (
+        "Position 4",
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        [6, 264, 9467, 422333, 15833292],
+    ),
+    (
+        "Position 5",
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        [44, 1486, 62379, 2103487, 89941194],
+    ),
+    (
+        "Position 6",
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        [46, 2079, 89890, 3894594, 164075551],
+    ),
+]
+
+
+def perft(main: Main, depth: int) -> int:
+    """
+    Counts the leaf nodes of the move tree below the current position.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position, it is left unchanged.
+    2. depth : int
+        The number of plies to look ahead.
+
+    Returns:
+    -------
+    int :
+        The number of positions reached after exactly depth plies.
+    """
+    moves = main.generate_legal_moves()
+    if depth <= 1:
+        # Bulk counting, the last ply doesn't need to be played.
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        main.make_move(move=move)
+        nodes += perft(main=main, depth=depth - 1)
+        main.unmake_move()
+    return nodes
+
+
+def divide(main: Main, depth: int) -> Dict[str, int]:
+    """
+    Breaks the perft count down per root move.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position, it is left unchanged.
+    2. depth : int
+        The number of plies to look ahead, the root move included.
+
+    Returns:
+    -------
+    Dict[str, int] :
+        The root moves in coordinate notation mapped to their leaf node count.
+    """
+    counts = {}
+    for move in main.generate_legal_moves():
+        main.make_move(move=move)
+        counts[move_to_uci(move=move)] = perft(main=main, depth=depth - 1)
+        main.unmake_move()
+    return counts
+
+
+def timed_perft(main: Main, depth: int) -> Tuple[int, float]:
+    """
+    Runs perft and measures how long it took.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position.
+    2. depth : int
+        The number of plies to look ahead.
+
+    Returns:
+    -------
+    Tuple[int, float] :
+        The (node count, seconds taken).
+    """
+    start_time = perf_counter()
+    nodes = perft(main=main, depth=depth)
+    return nodes, perf_counter() - start_time
+
+
+def nps_formatter(nodes: int, seconds: float) -> str:
+    """
+    Formats the speed of a perft run.
+
+    Parameters:
+    ----------
+    1. nodes : int
+        The number of counted nodes.
+    2. seconds : float
+        The time taken.
+
+    Returns:
+    -------
+    str :
+        A short "<nodes> nodes in <time>s (<nps> nps)" report.
+    """
+    return f"{nodes} nodes in {seconds:.3f}s ({nodes / max(seconds, 1e-9):,.0f} nps)"
+
+
+def suite_runner(max_nodes: int) -> bool:
+    """
+    Checks every reference position up to the deepest depth within max_nodes.
+
+    Parameters:
+    ----------
+    1. max_nodes : int
+        Depths whose expected count is larger than this are skipped.
+
+    Returns:
+    -------
+    bool :
+        True if every count matched its reference.
+    """
+    all_passed = True
+    main = Main()
+    total_nodes, total_seconds = 0, 0.0
+    for name, fen, expected_counts in REFERENCE_POSITIONS:
+        for depth, expected in enumerate(expected_counts, start=1):
+            if expected > max_nodes:
+                break
+            main.load_fen(fen=fen)
+            nodes, seconds = timed_perft(main=main, depth=depth)
+            total_nodes += nodes
+            total_seconds += seconds
+            passed = nodes == expected
+            all_passed = all_passed and passed
+            print(
+                f"{'ok  ' if passed else 'FAIL'} {name} depth {depth}: "
+                f"{nps_formatter(nodes=nodes, seconds=seconds)}"
+                + ("" if passed else f", expected {expected}")
+            )
+    print(f"Total: {nps_formatter(nodes=total_nodes, seconds=total_seconds)}")
+    return all_passed
+
+
+def main_runner() -> int:
+    """
+    The command line entry point.
+
+    Returns:
+    -------
+    int :
+        The exit code, 1 if a suite count did not match.
+    """
+    parser = argparse.ArgumentParser(description="Perft for the chess engine.")
+    parser.add_argument("--fen", default=START_FEN, help="the position to count from")
+    parser.add_argument("--depth", type=int, default=3, help="the number of plies")
+    parser.add_argument(
+        "--divide", action="store_true", help="break the count down per root move"
+    )
+    parser.add_argument(
+        "--suite", action="store_true", help="check the reference positions"
+    )
+    parser.add_argument(
+        "--check-hash",
+        action="store_true",
+        help="compare the incremental Zobrist key with a full recompute on every move",
+    )
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        default=200000,
+        help="the largest expected count the suite runs",
+    )
+    arguments = parser.parse_args()
+    Main.debug_checks = arguments.check_hash
+    if arguments.suite:
+        return 0 if suite_runner(max_nodes=arguments.max_nodes) else 1
+
+    main = Main()
+    main.load_fen(fen=arguments.fen)
+    start_time = perf_counter()
+    if arguments.divide:
+        counts = divide(main=main, depth=arguments.depth)
+        for move_name, nodes in sorted(counts.items()):
+            print(f"{move_name}: {nodes}")
+        nodes = sum(counts.values())
+        print(f"Moves: {len(counts)}")
+    else:
+        nodes = perft(main=main, depth=arguments.depth)
+    print(nps_formatter(nodes=nodes, seconds=perf_counter() - start_time))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_runner())
@@ -0,0 +1,367 @@
+"""
+This module replays the games of a PGN file through the engine to check them
+against its rules.
+
+The file is read one line at a time and every game is parsed on its own, so the
+memory used does not grow with the size of the file. Every move written in
+Standard Algebraic Notation (SAN) is matched against the legal moves of the
+position and played with make_move, which also moves the rook of a castle and
+updates the castling rights. The first move that is not legal stops the replay
+of its game and is reported. For every game one JSON line is written holding
+its tags, the number of plies played, the final position in FEN and its Zobrist
+key, optionally the key of every position. Games can be replayed by a pool of
+worker processes.
+
+Usage:
+    python PgnReplayer.py games.pgn --output report.jsonl
+    python PgnReplayer.py games.pgn --workers 4 --hashes
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import argparse
+import json
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from os import cpu_count
+from typing import Dict, Iterator, List, TextIO, Tuple
+from Bitboard import KING, PAWN, BISHOP, KNIGHT, QUEEN, ROOK, SQUARE_NAMES
+from Engine import START_FEN, Main
+
+
+# The number of games sent to a worker at once.
+CHUNK_SIZE = 32
+# The number of chunks waiting or running per worker.
+CHUNKS_PER_WORKER = 2
+
+SAN_PIECE_TYPES = {"K": KING, "Q": QUEEN, "R": ROOK, "B": BISHOP, "N": KNIGHT}
+SQUARE_INDEX_TABLE = {name: square for square, name in enumerate(SQUARE_NAMES)}
+RESULTS = {"1-0", "0-1", "1/2-1/2", "*"}
+SAN_PATTERN = re.compile(
+    r"^(?P<piece>[KQRBN])?(?P<file>[a-h])?(?P<rank>[1-8])?x?"
+    r"(?P<to>[a-h][1-8])(?:=?(?P<promotion>[QRBN]))?$"
+)
+TAG_PATTERN = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+# Comments, variations, numeric annotation glyphs and move numbers carry no moves.
+MOVETEXT_NOISE_PATTERN = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+|\d+\.(?:\.\.)?")
+
+# The engine of this process, created on the first game it replays.
+worker_main = None
+
+
+def pgn_games(input_file: TextIO) -> Iterator[str]:
+    """
+    Splits a PGN file into the text of its games without reading it all.
+
+    Parameters:
+    ----------
+    1. input_file : TextIO
+        The file to read from.
+
+    Returns:
+    -------
+    Iterator[str] :
+        The text of every game, tags and moves.
+    """
+    lines, in_movetext = [], False
+    for line in input_file:
+        if line.startswith("["):
+            # A tag after some moves starts the next game.
+            if in_movetext:
+                yield "".join(lines)
+                lines, in_movetext = [], False
+        elif line.strip() and not line.startswith("%"):
+            in_movetext = True
+        lines.append(line)
+    if any(line.strip() for line in lines):
+        yield "".join(lines)
+
+
+def pgn_parser(game_text: str) -> Tuple[Dict[str, str], List[str], str]:
+    """
+    Splits the text of a game into its tags, its moves and its result.
+
+    Parameters:
+    ----------
+    1. game_text : str
+        The text of a single game.
+
+    Returns:
+    -------
+    Tuple[Dict[str, str], List[str], str] :
+        The tag names mapped to their values, the SAN moves and the result, "*" if it is missing.
+    """
+    tags, movetext_lines = {}, []
+    for line in game_text.splitlines():
+        tag_match = TAG_PATTERN.match(line)
+        if tag_match:
+            tags[tag_match.group(1)] = tag_match.group(2)
+        elif not line.startswith("%"):
+            movetext_lines.append(line)
+    movetext = MOVETEXT_NOISE_PATTERN.sub(" ", "\n".join(movetext_lines))
+    # Variations can be nested so they are dropped by counting the brackets.
+    depth, kept = 0, []
+    for char in movetext:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif not depth:
+            kept.append(char)
+    sans, result = [], tags.get("Result", "*")
+    for token in "".join(kept).split():
+        if token in RESULTS:
+            result = token
+        else:
+            sans.append(token)
+    return tags, sans, result
+
+
+def san_to_move(main: Main, san: str) -> int:
+    """
+    Finds the legal move written in SAN.
+
+    Parameters:
+    ----------
+    1. main : Main
+        The engine holding the position the move is played in.
+    2. san : str
+        The move e.g. "Nbd7", "exd5", "e8=Q", "O-O" or "Qh4#".
+
+    Returns:
+    -------
+    int :
+        The legal move packed like encode_move does.
+
+    Raises:
+    ------
+    ValueError :
+        If the SAN can't be read, matches no legal move or matches more than one.
+    """
+    san = san.rstrip("+#!?")
+    side_offset = 6 * (main.move_count % 2)
+    mailbox = main.position.mailbox
+    if san in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        king_from = 60 if not side_offset else 4
+        king_to = king_from + (2 if len(san) == 3 else -2)
+        candidates = [
+            move
+            for move in main.generate_legal_moves()
+            if move & 63 == king_from
+            and move >> 6 & 63 == king_to
+            and mailbox[king_from] == side_offset + KING
+        ]
+    else:
+        san_match = SAN_PATTERN.match(san)
+        if san_match is None:
+            raise ValueError(f"can't read the move {san!r}")
+        promotion = san_match.group("promotion")
+        promotion_type = SAN_PIECE_TYPES[promotion] if promotion else PAWN
+        piece = side_offset + SAN_PIECE_TYPES.get(san_match.group("piece"), PAWN)
+        move_to = SQUARE_INDEX_TABLE[san_match.group("to")]
+        from_file, from_rank = san_match.group("file"), san_match.group("rank")
+        candidates = [
+            move
+            for move in main.generate_legal_moves()
+            if move >> 6 & 63 == move_to
+            and move >> 12 == promotion_type
+            and mailbox[move & 63] == piece
+            and (from_file is None or SQUARE_NAMES[move & 63][0] == from_file)
+            and (from_rank is None or SQUARE_NAMES[move & 63][1] == from_rank)
+        ]
+    if not candidates:
+        raise ValueError(f"{san} is not a legal move")
+    if len(candidates) > 1:
+        raise ValueError(f"{san} is ambiguous")
+    return candidates[0]
+
+
+def game_replayer(game_text: str, keep_hashes: bool = False) -> Dict[str, object]:
+    """
+    Replays a single game and reports the first illegal move, if any.
+
+    Parameters:
+    ----------
+    1. game_text : str
+        The text of the game.
+    2. keep_hashes : bool
+        Also report the Zobrist key of the position after every ply.
+
+    Returns:
+    -------
+    Dict[str, object] :
+        The JSON record of the game.
+    """
+    global worker_main
+    if worker_main is None:
+        worker_main = Main()
+    main = worker_main
+    tags, sans, result = pgn_parser(game_text=game_text)
+    record = {"tags": tags, "result": result}
+    try:
+        main.load_fen(fen=tags.get("FEN", START_FEN))
+    except (ValueError, KeyError, IndexError) as error:
+        record.update(valid=False, plies=0, error={"ply": 0, "reason": str(error)})
+        return record
+    hashes = [f"{main.zobrist_key:016x}"]
+    record["valid"] = True
+    for ply, san in enumerate(sans, start=1):
+        try:
+            move = san_to_move(main=main, san=san)
+        except ValueError as error:
+            record["valid"] = False
+            record["error"] = {"ply": ply, "san": san, "reason": str(error)}
+            break
+        main.make_move(move=move)
+        if keep_hashes:
+            hashes.append(f"{main.zobrist_key:016x}")
+    record["plies"] = len(main.undo_stack)
+    record["final_fen"] = main.export_fen()
+    record["final_key"] = f"{main.zobrist_key:016x}"
+    if keep_hashes:
+        record["hashes"] = hashes
+    return record
+
+
+def chunk_replayer(game_texts: List[str], keep_hashes: bool) -> List[Dict[str, object]]:
+    """
+    Replays a chunk of games, runs inside a worker process.
+
+    Parameters:
+    ----------
+    1. game_texts : List[str]
+        The text of every game.
+    2. keep_hashes : bool
+        Also report the Zobrist key of the position after every ply.
+
+    Returns:
+    -------
+    List[Dict[str, object]] :
+        The record of every game in the same order.
+    """
+    return [
+        game_replayer(game_text=game_text, keep_hashes=keep_hashes)
+        for game_text in game_texts
+    ]
+
+
+def pgn_validator(
+    input_file: TextIO,
+    output_file: TextIO,
+    workers: int,
+    keep_hashes: bool = False,
+) -> Tuple[int, int]:
+    """
+    Replays every game of the input and writes the JSON lines to the output.
+
+    Parameters:
+    ----------
+    1. input_file : TextIO
+        The PGN file.
+    2. output_file : TextIO
+        The file to write the JSON lines to.
+    3. workers : int
+        The number of worker processes, 1 replays in this process.
+    4. keep_hashes : bool
+        Also report the Zobrist key of the position after every ply.
+
+    Returns:
+    -------
+    Tuple[int, int] :
+        The (number of games, number of games holding an illegal move).
+    """
+    games = pgn_games(input_file=input_file)
+    chunks = iter(lambda: list(islice(games, CHUNK_SIZE)), [])
+    game_count = invalid_count = 0
+
+    def chunk_writer(records: List[Dict[str, object]]) -> None:
+        nonlocal game_count, invalid_count
+        for record in records:
+            game_count += 1
+            invalid_count += not record["valid"]
+            output_file.write(json.dumps(record) + "\n")
+
+    if workers <= 1:
+        for chunk in chunks:
+            chunk_writer(
+                records=chunk_replayer(game_texts=chunk, keep_hashes=keep_hashes)
+            )
+        return game_count, invalid_count
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(chunk_replayer, chunk, keep_hashes))
+            # Waiting on the oldest chunk keeps the output in order and the memory bounded.
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                chunk_writer(records=pending.popleft().result())
+        while pending:
+            chunk_writer(records=pending.popleft().result())
+    return game_count, invalid_count
+
+
+def main_runner() -> int:
+    """
+    The command line entry point.
+
+    Returns:
+    -------
+    int :
+        The exit code, 1 if any game holds an illegal move.
+    """
+    parser = argparse.ArgumentParser(
+        description="Replay and check the games of a PGN file."
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="the PGN file, the standard input by default",
+    )
+    parser.add_argument(
+        "--output", default="-", help="the JSONL file, the standard output by default"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="the number of processes, one per core by default"
+    )
+    parser.add_argument(
+        "--hashes",
+        action="store_true",
+        help="report the Zobrist key of the position after every ply",
+    )
+    arguments = parser.parse_args()
+
+    input_file = (
+        sys.stdin if arguments.input == "-" else open(arguments.input, errors="replace")
+    )
+    output_file = sys.stdout if arguments.output == "-" else open(arguments.output, "w")
+    try:
+        game_count, invalid_count = pgn_validator(
+            input_file=input_file,
+            output_file=output_file,
+            workers=arguments.workers or cpu_count() or 1,
+            keep_hashes=arguments.hashes,
+        )
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(
+        f"{game_count} games replayed, {invalid_count} with an illegal move",
+        file=sys.stderr,
+    )
+    return 1 if invalid_count else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_runner())
@@ -0,0 +1,761 @@
+"""
+This module finds the best move of a position so the engine can play either side.
+
+It runs a negamax alpha-beta search with iterative deepening. Every iteration is
+one ply deeper than the last and reuses what the previous ones stored in the
+transposition table, which gives the best move to try first. The other moves
+are tried captures and promotions first (most valuable victim, least valuable
+attacker), then the killer moves of the ply, then by the history heuristic. The
+leaves are extended with a captures only quiescence search so the score is not
+taken in the middle of an exchange. Repetitions and the 50-move rule are scored
+as draws from the Zobrist key history of the game.
+
+The search stops on hard time and node limits and reports the depth, nodes and
+nodes per second of every finished iteration. It runs without pygame. With
+endgame tablebases the positions they hold are scored exactly without a search.
+
+Usage:
+    python Search.py --time 5
+    python Search.py --fen "<fen>" --depth 6 --nodes 200000
+    python Search.py --fen "8/8/8/4k3/8/8/8/KQ6 w - - 0 1" --tablebases Tablebases
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import argparse
+from time import perf_counter
+from typing import Callable, List, NamedTuple, Tuple
+from Bitboard import EMPTY, KING, QUEEN, lsb_index
+from Engine import Main, move_to_uci
+from Evaluation import PIECE_VALUES, evaluate
+from Tablebase import Tablebases
+
+
+MATE_SCORE = 100000
+# Scores beyond this are mates, their distance to the root is kept in the score.
+MATE_BOUND = MATE_SCORE - 1000
+INFINITY = MATE_SCORE + 1
+MAX_PLY = 128
+# The kind of score stored in the transposition table.
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+# Default memory cap of a transposition table, in bytes.
+TRANSPOSITION_TABLE_BYTES = 16 << 20
+# Rough cost of a table slot and its entry tuple.
+TRANSPOSITION_ENTRY_BYTES = 120
+# The clock is read once every this many nodes (minus one, used as a mask).
+TIME_CHECK_MASK = 1023
+# Move ordering scores, from the first tried to the last.
+TT_MOVE_ORDER = 1 << 30
+CAPTURE_ORDER = 1 << 24
+KILLER_ORDER = 1 << 22
+
+
+class SearchAborted(Exception):
+    """
+    Raised inside the search when the time or the node limit is hit.
+    """
+
+
+class SearchResult(NamedTuple):
+    """
+    The outcome of an iteration of the search.
+
+    Attributes:
+    ----------
+    1. best_move : int
+        The best move found, packed like encode_move does, 0 if there is no legal move.
+    2. score : int
+        The score of the best move in centipawns for the side to move.
+    3. depth : int
+        The depth of the last finished iteration.
+    4. nodes : int
+        The nodes searched so far, quiescence nodes included.
+    5. seconds : float
+        The time taken so far.
+    6. principal_variation : Tuple[int, ...]
+        The expected line of play starting with best_move.
+    """
+
+    best_move: int
+    score: int
+    depth: int
+    nodes: int
+    seconds: float
+    principal_variation: Tuple[int, ...]
+
+    @property
+    def nps(self) -> int:
+        return int(self.nodes / max(self.seconds, 1e-9))
+
+
+class TranspositionTable:
+    """
+    This class is a fixed size table of search results keyed by Zobrist key.
+
+    Every key maps to a single slot. A slot is replaced when it is empty, holds the same
+    position, was written by an older search or was searched less deep.
+
+    Attributes:
+    ----------
+    1. size : int
+        The number of slots, a power of two.
+    2. slots : List[Tuple[int, int, int, int, int, int] | None]
+        The (key, depth, flag, score, move, generation) entries.
+    3. generation : int
+        Counts the searches made, used to age the entries out.
+    """
+
+    def __init__(self, max_bytes: int = TRANSPOSITION_TABLE_BYTES) -> None:
+        """
+        Initializes a TranspositionTable object.
+
+        Parameters:
+        ----------
+        1. max_bytes : int
+            The memory cap of the table.
+        """
+        self.size = 1 << max(
+            (max_bytes // TRANSPOSITION_ENTRY_BYTES).bit_length() - 1, 0
+        )
+        self.slots = [None] * self.size
+        self.generation = 0
+
+    def probe(self, key: int) -> Tuple[int, int, int, int, int, int] | None:
+        """
+        Looks a position up.
+
+        Parameters:
+        ----------
+        1. key : int
+            The Zobrist key of the position.
+
+        Returns:
+        -------
+        Tuple[int, int, int, int, int, int] | None :
+            The (key, depth, flag, score, move, generation) entry or None if it is not stored.
+        """
+        entry = self.slots[key & (self.size - 1)]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, flag: int, score: int, move: int) -> None:
+        """
+        Stores the result of searching a position, if the replacement policy allows it.
+
+        Parameters:
+        ----------
+        1. key : int
+            The Zobrist key of the position.
+        2. depth : int
+            The depth the position was searched to.
+        3. flag : int
+            EXACT, LOWER_BOUND or UPPER_BOUND.
+        4. score : int
+            The score, mate scores counted from the position not from the root.
+        5. move : int
+            The best move found or 0.
+        """
+        index = key & (self.size - 1)
+        entry = self.slots[index]
+        if (
+            entry is None
+            or entry[0] == key
+            or entry[5] != self.generation
+            or depth >= entry[1]
+        ):
+            self.slots[index] = (key, depth, flag, score, move, self.generation)
+
+    def clear(self) -> None:
+        """
+        Drops every entry.
+        """
+        self.slots = [None] * self.size
+        self.generation = 0
+
+
+class Searcher:
+    """
+    This class searches the position held by a Main object for the best move.
+
+    The position is changed only through make_move/unmake_move and is given back as it
+    was, even when the search is stopped by a limit.
+
+    Attributes:
+    ----------
+    1. main : Main
+        The engine holding the position to be searched.
+    2. transposition_table : TranspositionTable
+        The results of the positions searched, kept between searches.
+    3. reporter : Callable[[SearchResult], None] | None
+        Called with the result of every finished iteration.
+    4. nodes : int
+        The nodes searched by the running search.
+    5. killers : List[List[int]]
+        Per ply the two last quiet moves that caused a beta cutoff.
+    6. history : List[int]
+        Per (from, to) square pair how often a quiet move caused a beta cutoff, weighted by depth.
+    7. node_limit : int | None
+        The nodes the running search may visit.
+    8. deadline : float | None
+        The perf_counter time the running search has to stop at.
+    9. root_best_move : int
+        The best root move found so far by the running iteration.
+    10. tablebases : Tablebases | None
+        The endgame tables probed below the root.
+    """
+
+    def __init__(
+        self,
+        main: Main,
+        transposition_table: TranspositionTable | None = None,
+        reporter: Callable[[SearchResult], None] | None = None,
+        tablebases: Tablebases | None = None,
+    ) -> None:
+        """
+        Initializes a Searcher object.
+
+        Parameters:
+        ----------
+        1. main : Main
+            The engine holding the position to be searched.
+        2. transposition_table : TranspositionTable | None
+            The table to be used, a new one of the default size is created if it is not provided.
+        3. reporter : Callable[[SearchResult], None] | None
+            Called with the result of every finished iteration.
+        4. tablebases : Tablebases | None
+            The endgame tables probed below the root.
+        """
+        self.main = main
+        self.transposition_table = transposition_table or TranspositionTable()
+        self.reporter = reporter
+        self.nodes = 0
+        self.node_limit = None
+        self.deadline = None
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [0] * 4096
+        self.root_best_move = 0
+        self.tablebases = tablebases
+
+    def search(
+        self,
+        max_depth: int = MAX_PLY - 1,
+        time_limit: float | None = None,
+        node_limit: int | None = None,
+    ) -> SearchResult:
+        """
+        Searches deeper and deeper until max_depth is done or a limit is hit.
+
+        Parameters:
+        ----------
+        1. max_depth : int
+            The deepest iteration to run.
+        2. time_limit : float | None
+            The seconds the search may take.
+        3. node_limit : int | None
+            The nodes the search may visit, a fixed node limit always gives the same result.
+
+        Returns:
+        -------
+        SearchResult :
+            The result of the deepest finished iteration, or the best move of the
+            interrupted one when it already beat the previous iteration.
+        """
+        main = self.main
+        start_time = perf_counter()
+        self.search_setup(time_limit=time_limit, node_limit=node_limit)
+        root_depth = len(main.undo_stack)
+        moves = main.generate_legal_moves()
+        result = SearchResult(
+            best_move=moves[0] if moves else 0,
+            score=0 if moves or not self.in_check() else -MATE_SCORE,
+            depth=0,
+            nodes=0,
+            seconds=0.0,
+            principal_variation=moves[:1],
+        )
+        if not moves:
+            return result
+        for depth in range(1, max_depth + 1):
+            self.root_best_move = 0
+            try:
+                score = self.negamax(depth=depth, alpha=-INFINITY, beta=INFINITY, ply=0)
+            except SearchAborted:
+                while len(main.undo_stack) > root_depth:
+                    main.unmake_move()
+                if self.root_best_move:
+                    result = result._replace(
+                        best_move=self.root_best_move,
+                        principal_variation=(self.root_best_move,),
+                    )
+                return result._replace(
+                    nodes=self.nodes, seconds=perf_counter() - start_time
+                )
+            result = SearchResult(
+                best_move=self.root_best_move,
+                score=score,
+                depth=depth,
+                nodes=self.nodes,
+                seconds=perf_counter() - start_time,
+                principal_variation=self.principal_variation_maker(depth=depth),
+            )
+            if self.reporter is not None:
+                self.reporter(result)
+            # A found mate can't get any shorter by searching deeper.
+            if abs(score) > MATE_BOUND and MATE_SCORE - abs(score) <= depth:
+                break
+            # The next iteration would not finish in the time left anyway.
+            if self.deadline is not None and (
+                perf_counter() - start_time > (self.deadline - start_time) / 2
+            ):
+                break
+        return result
+
+    def search_setup(self, time_limit: float | None, node_limit: int | None) -> None:
+        """
+        Resets the counters and the move ordering tables and sets the limits of a new search.
+
+        Parameters:
+        ----------
+        1. time_limit : float | None
+            The seconds the search may take from now on.
+        2. node_limit : int | None
+            The nodes the search may visit.
+        """
+        self.nodes = 0
+        self.node_limit = node_limit
+        self.deadline = None if time_limit is None else perf_counter() + time_limit
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [0] * 4096
+        self.root_best_move = 0
+        self.transposition_table.generation += 1
+
+    def limits_checker(self) -> None:
+        """
+        Raises SearchAborted when the node limit is reached or the time is up.
+        """
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchAborted
+        if (
+            self.deadline is not None
+            and not self.nodes & TIME_CHECK_MASK
+            and perf_counter() >= self.deadline
+        ):
+            raise SearchAborted
+
+    def in_check(self) -> bool:
+        """
+        Checks if the side to move is in check.
+
+        Returns:
+        -------
+        bool :
+            True if the king of the side to move is attacked.
+        """
+        main = self.main
+        position = main.position
+        return main.square_attacked(
+            square=lsb_index(position.pieces[KING + 6 * (main.move_count % 2)]),
+            move_count=main.move_count,
+            occupancy=position.occupancy,
+        )
+
+    def move_orderer(self, moves: Tuple[int, ...], tt_move: int, ply: int) -> List[int]:
+        """
+        Sorts the moves from the most to the least promising.
+
+        Parameters:
+        ----------
+        1. moves : Tuple[int, ...]
+            The legal moves of the position.
+        2. tt_move : int
+            The best move stored in the transposition table or 0.
+        3. ply : int
+            The distance from the root, used to find the killer moves.
+
+        Returns:
+        -------
+        List[int] :
+            The moves in the order they should be searched.
+        """
+        mailbox = self.main.position.mailbox
+        killers = self.killers[ply]
+        history = self.history
+
+        def move_order(move: int) -> int:
+            if move == tt_move:
+                return TT_MOVE_ORDER
+            if move >> 12:
+                # Promotions are tried with the captures, as if they took the piece they make.
+                return CAPTURE_ORDER + PIECE_VALUES[move >> 12] * 16
+            captured = mailbox[move >> 6 & 63]
+            if captured != EMPTY:
+                # The most valuable victim first, for equal victims the least valuable attacker.
+                return (
+                    CAPTURE_ORDER
+                    + PIECE_VALUES[captured % 6] * 16
+                    - PIECE_VALUES[mailbox[move & 63] % 6] // 100
+                )
+            if move == killers[0]:
+                return KILLER_ORDER + 1
+            if move == killers[1]:
+                return KILLER_ORDER
+            return history[move & 4095]
+
+        return sorted(moves, key=move_order, reverse=True)
+
+    def negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """
+        Scores the position with an alpha-beta search.
+
+        Parameters:
+        ----------
+        1. depth : int
+            The plies left to search before the quiescence search takes over.
+        2. alpha : int
+            The score the side to move is already sure of.
+        3. beta : int
+            The score the opponent is already sure of, reaching it ends the search of the node.
+        4. ply : int
+            The distance from the root.
+
+        Returns:
+        -------
+        int :
+            The score for the side to move.
+        """
+        main = self.main
+        self.nodes += 1
+        self.limits_checker()
+        key = main.zobrist_key
+        # A position reached before since the last capture or pawn move, in the game or
+        # along the line, is scored as a draw, as is one reaching the 50-move limit.
+        if ply and main.is_draw_by_rule(repetitions=2):
+            return 0
+        tablebases = self.tablebases
+        if (
+            ply
+            and tablebases is not None
+            and main.position.occupancy.bit_count() <= tablebases.max_pieces
+        ):
+            result = tablebases.probe(main=main)
+            if result is not None:
+                return tablebase_score(result=result, ply=ply)
+        in_check = self.in_check()
+        if in_check:
+            depth += 1
+        if depth <= 0 or ply >= MAX_PLY - 1:
+            return self.quiescence(alpha=alpha, beta=beta, ply=ply)
+
+        transposition_table = self.transposition_table
+        entry = transposition_table.probe(key=key)
+        tt_move = 0
+        if entry is not None:
+            tt_move = entry[4]
+            if ply and entry[1] >= depth:
+                score = score_from_table(score=entry[3], ply=ply)
+                flag = entry[2]
+                if (
+                    flag == EXACT
+                    or (flag == LOWER_BOUND and score >= beta)
+                    or (flag == UPPER_BOUND and score <= alpha)
+                ):
+                    return score
+
+        moves = main.generate_legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply if in_check else 0
+
+        alpha_original = alpha
+        best_score, best_move = -INFINITY, 0
+        mailbox = main.position.mailbox
+        for move in self.move_orderer(moves=moves, tt_move=tt_move, ply=ply):
+            is_quiet = mailbox[move >> 6 & 63] == EMPTY and not move >> 12
+            main.make_move(move=move)
+            score = -self.negamax(
+                depth=depth - 1, alpha=-beta, beta=-alpha, ply=ply + 1
+            )
+            main.unmake_move()
+            if score > best_score:
+                best_score, best_move = score, move
+                if not ply:
+                    self.root_best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if is_quiet:
+                    killers = self.killers[ply]
+                    if killers[0] != move:
+                        killers[1], killers[0] = killers[0], move
+                    self.history[move & 4095] += depth * depth
+                break
+
+        if best_score <= alpha_original:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        transposition_table.store(
+            key=key,
+            depth=depth,
+            flag=flag,
+            score=score_to_table(score=best_score, ply=ply),
+            move=best_move,
+        )
+        return best_score
+
+    def quiescence(self, alpha: int, beta: int, ply: int) -> int:
+        """
+        Scores the position searching only captures and queen promotions, or every move when
+        in check.
+
+        Parameters:
+        ----------
+        1. alpha : int
+            The score the side to move is already sure of.
+        2. beta : int
+            The score the opponent is already sure of.
+        3. ply : int
+            The distance from the root.
+
+        Returns:
+        -------
+        int :
+            The score for the side to move.
+        """
+        main = self.main
+        self.nodes += 1
+        self.limits_checker()
+        in_check = self.in_check()
+        moves = main.generate_legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply if in_check else 0
+        if ply >= MAX_PLY - 1:
+            return evaluate(position=main.position, move_count=main.move_count)
+        mailbox = main.position.mailbox
+        if not in_check:
+            # The side to move can usually do at least as well as the static score.
+            stand_pat = evaluate(position=main.position, move_count=main.move_count)
+            if stand_pat >= beta:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            moves = [
+                move
+                for move in moves
+                if mailbox[move >> 6 & 63] != EMPTY or move >> 12 == QUEEN
+            ]
+        for move in self.move_orderer(moves=moves, tt_move=0, ply=ply):
+            main.make_move(move=move)
+            score = -self.quiescence(alpha=-beta, beta=-alpha, ply=ply + 1)
+            main.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def principal_variation_maker(self, depth: int) -> Tuple[int, ...]:
+        """
+        Follows the best moves stored in the transposition table from the root.
+
+        Parameters:
+        ----------
+        1. depth : int
+            The longest line to be followed.
+
+        Returns:
+        -------
+        Tuple[int, ...] :
+            The moves of the expected line of play.
+        """
+        main = self.main
+        principal_variation = []
+        seen_keys = set()
+        while len(principal_variation) < depth:
+            key = main.zobrist_key
+            entry = self.transposition_table.probe(key=key)
+            if (
+                entry is None
+                or key in seen_keys
+                or entry[4] not in main.generate_legal_moves()
+            ):
+                break
+            seen_keys.add(key)
+            principal_variation.append(entry[4])
+            main.make_move(move=entry[4])
+        for _ in principal_variation:
+            main.unmake_move()
+        if not principal_variation or principal_variation[0] != self.root_best_move:
+            return (self.root_best_move,)
+        return tuple(principal_variation)
+
+
+def score_to_table(score: int, ply: int) -> int:
+    """
+    Makes a mate score count from the stored position instead of the root.
+
+    Parameters:
+    ----------
+    1. score : int
+        The score found at the given ply.
+    2. ply : int
+        The distance from the root.
+
+    Returns:
+    -------
+    int :
+        The score to be stored.
+    """
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    """
+    Undoes score_to_table for a position found at the given ply.
+
+    Parameters:
+    ----------
+    1. score : int
+        The stored score.
+    2. ply : int
+        The distance from the root.
+
+    Returns:
+    -------
+    int :
+        The score counted from the root.
+    """
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def tablebase_score(result: Tuple[str, int], ply: int) -> int:
+    """
+    Converts a tablebase result into a search score.
+
+    Parameters:
+    ----------
+    1. result : Tuple[str, int]
+        The ("win", "draw" or "loss", plies to mate) given by Tablebases.probe.
+    2. ply : int
+        The distance of the probed position from the root.
+
+    Returns:
+    -------
+    int :
+        The score for the side to move, a mate score for a win or a loss.
+    """
+    outcome, plies = result
+    if outcome == "win":
+        return MATE_SCORE - ply - plies
+    if outcome == "loss":
+        return -MATE_SCORE + ply + plies
+    return 0
+
+
+def score_formatter(score: int) -> str:
+    """
+    Writes a score like UCI does, "cp <centipawns>" or "mate <moves>".
+
+    Parameters:
+    ----------
+    1. score : int
+        The score for the side to move.
+
+    Returns:
+    -------
+    str :
+        The formatted score, a negative mate means the side to move gets mated.
+    """
+    if abs(score) > MATE_BOUND:
+        moves_to_mate = (MATE_SCORE - abs(score) + 1) // 2
+        return f"mate {moves_to_mate if score > 0 else -moves_to_mate}"
+    return f"cp {score}"
+
+
+def result_reporter(result: SearchResult) -> None:
+    """
+    Prints an iteration of the search on one line.
+
+    Parameters:
+    ----------
+    1. result : SearchResult
+        The result of the finished iteration.
+    """
+    print(
+        f"depth {result.depth} score {score_formatter(score=result.score)} "
+        f"nodes {result.nodes} nps {result.nps} time {result.seconds:.3f} "
+        f"pv {' '.join(move_to_uci(move=move) for move in result.principal_variation)}"
+    )
+
+
+def main_runner() -> int:
+    """
+    The command line entry point.
+
+    Returns:
+    -------
+    int :
+        The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Search for the best move.")
+    parser.add_argument("--fen", help="the position to search, the start by default")
+    parser.add_argument(
+        "--depth", type=int, default=MAX_PLY - 1, help="the deepest iteration"
+    )
+    parser.add_argument("--time", type=float, help="the seconds the search may take")
+    parser.add_argument("--nodes", type=int, help="the nodes the search may visit")
+    parser.add_argument(
+        "--hash",
+        type=int,
+        default=TRANSPOSITION_TABLE_BYTES >> 20,
+        help="the transposition table size in MiB",
+    )
+    parser.add_argument("--tablebases", help="the directory of the endgame tables")
+    arguments = parser.parse_args()
+    if (
+        arguments.time is None
+        and arguments.nodes is None
+        and arguments.depth >= MAX_PLY - 1
+    ):
+        arguments.depth = 5
+
+    main = Main()
+    if arguments.fen:
+        main.load_fen(fen=arguments.fen)
+    searcher = Searcher(
+        main=main,
+        transposition_table=TranspositionTable(max_bytes=arguments.hash << 20),
+        reporter=result_reporter,
+        tablebases=(
+            Tablebases(directory=arguments.tablebases) if arguments.tablebases else None
+        ),
+    )
+    result = searcher.search(
+        max_depth=arguments.depth,
+        time_limit=arguments.time,
+        node_limit=arguments.nodes,
+    )
+    print(
+        f"bestmove {move_to_uci(move=result.best_move) if result.best_move else '(none)'}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_runner())
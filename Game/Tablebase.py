@@ -0,0 +1,1032 @@
+"""
+This module generates and probes endgame tablebases of 3 and 4 pieces.
+
+A table holds one byte for every placement of its pieces and side to move,
+telling whether the side to move wins, draws or loses and in how many plies
+the game ends in mate with best play (distance to mate). Tables are solved by
+retrograde analysis: starting from the checkmates, positions are walked
+backwards through un-moves, a position that can move into a lost one is won
+and a position all of whose moves go into won ones is lost. Captures and
+promotions lead into smaller tables, which are generated first.
+
+A table is named after its material, white first, e.g. "KQvK" or "KRvKN", and
+is stored as "<name>.tb": a 16 byte header followed by the bytes indexed by
+(side to move, king pair, other white pieces, other black pieces) with 6 bits
+per square of the other pieces. The board is mirrored and turned so that only
+one of the symmetric placements is stored: without pawns the white king stands
+on the a1-d1-d4 triangle, and the black king on or below the a1-h8 diagonal when
+the white king is on it, which leaves 462 king pairs. Pawns only allow mirroring
+the files, the white king stands on the files a to d and 1806 king pairs are
+left. A 3 piece table then takes 58 or 226 KB and a 4 piece one 3.6 or 14.1 MB
+without or with pawns. The value byte is 0 for a draw, 255 for an illegal
+placement or an index no placement is stored under, and otherwise the plies to
+mate plus one, even for a win of the side to move and odd for a loss. Tables
+are probed through mmap so only the pages looked at are read.
+
+Positions with castling rights or an en passant square are not probed and
+tables ignore en passant. Pawns promote to any piece.
+
+Usage:
+    python Tablebase.py generate --pieces 3 --directory Tablebases
+    python Tablebase.py generate KQvK KRvK KPvK --workers 4
+    python Tablebase.py probe --fen "8/8/8/4k3/8/8/8/KQ6 w - - 0 1"
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+import argparse
+import mmap
+import os
+import struct
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations_with_replacement
+from typing import Dict, Iterator, List, Set, Tuple
+from Attacks import KING_ATTACKS, PAWN_ATTACKS, piece_attacks
+from Bitboard import KING, PAWN, PROMOTION_TYPES, SQUARE_BB, bitboard_squares
+from Engine import Main
+
+
+TABLEBASE_DIRECTORY = "Tablebases"
+TABLE_HEADER_STRUCT = struct.Struct("<4sBB10x")
+TABLE_MAGIC = b"CHTB"
+TABLE_VERSION = 2
+MAX_TABLE_PIECES = 4
+DRAW, ILLEGAL = 0, 255
+WIN, LOSS = "win", "loss"
+# The letters of the piece types, a side's pieces are written in the order of PIECE_ORDER.
+PIECE_LETTERS = "PRNBQK"
+PIECE_ORDER = "KQRBNP"
+# Material that can't mate whatever happens, its "table" is all draws.
+DRAWN_SIGNATURES = {"KvK", "KBvK", "KNvK", "KvKB", "KvKN"}
+# The bits of the generation flags of a position.
+HAS_DRAW, HAS_WIN = 1, 2
+
+
+def square_transformer(
+    square: int, transpose: bool, flip_files: bool, flip_ranks: bool
+) -> int:
+    """
+    Moves a square by one of the symmetries of the board.
+
+    Parameters:
+    ----------
+    1. square : int
+        The square index.
+    2. transpose : bool
+        Reflects the board in the a1-h8 diagonal first.
+    3. flip_files : bool
+        Then mirrors the files, a to h.
+    4. flip_ranks : bool
+        Then mirrors the ranks, 1 to 8.
+
+    Returns:
+    -------
+    int :
+        The square index it is moved to.
+    """
+    x_pos, y_pos = square & 7, square >> 3
+    if transpose:
+        x_pos, y_pos = 7 - y_pos, 7 - x_pos
+    if flip_files:
+        x_pos ^= 7
+    if flip_ranks:
+        y_pos ^= 7
+    return y_pos * 8 + x_pos
+
+
+# The 8 symmetries of the board as square lookups, the first two, the identity and the
+# mirror of the files, are the only ones keeping the direction of the pawns.
+SYMMETRIES = [
+    [
+        square_transformer(
+            square=square,
+            transpose=transpose,
+            flip_files=flip_files,
+            flip_ranks=flip_ranks,
+        )
+        for square in range(64)
+    ]
+    for transpose in (False, True)
+    for flip_ranks in (False, True)
+    for flip_files in (False, True)
+]
+
+
+def king_pairs_maker(has_pawns: bool) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """
+    Lists the king placements a table is indexed by, one for every placement up to symmetry.
+
+    With pawns the white king stands on the files a to d. Without pawns it stands on the
+    a1-d1-d4 triangle and, when it is on the a1-h8 diagonal, the black king stands on or
+    below that diagonal. Kings standing next to each other are left out.
+
+    Parameters:
+    ----------
+    1. has_pawns : bool
+        Whether the tables have pawns.
+
+    Returns:
+    -------
+    Tuple[List[Tuple[int, int]], List[int]] :
+        The (white king, black king) square indices of every king pair, and the position of
+        every pair in that list indexed by white king * 64 + black king, -1 for the others.
+    """
+    king_pairs = []
+    pair_positions = [-1] * 4096
+    for white_king in range(64):
+        file, rank = white_king & 7, 7 - (white_king >> 3)
+        if file > 3 or not has_pawns and rank > file:
+            continue
+        for black_king in range(64):
+            if (
+                black_king == white_king
+                or KING_ATTACKS[white_king] & SQUARE_BB[black_king]
+                or not has_pawns
+                and rank == file
+                and 7 - (black_king >> 3) > black_king & 7
+            ):
+                continue
+            pair_positions[white_king << 6 | black_king] = len(king_pairs)
+            king_pairs.append((white_king, black_king))
+    return king_pairs, pair_positions
+
+
+# The king pairs of the tables without pawns then of the ones with pawns.
+KING_PAIRS = [king_pairs_maker(has_pawns=False), king_pairs_maker(has_pawns=True)]
+
+
+def side_letters(piece_types: List[int]) -> str:
+    """
+    Writes the pieces of one side in the order used by the table names.
+
+    Parameters:
+    ----------
+    1. piece_types : List[int]
+        The piece types of the side, the king included.
+
+    Returns:
+    -------
+    str :
+        The piece letters e.g. "KRN".
+    """
+    return "".join(
+        sorted(
+            (PIECE_LETTERS[piece_type] for piece_type in piece_types),
+            key=PIECE_ORDER.index,
+        )
+    )
+
+
+def signature_pieces(signature: str) -> List[int]:
+    """
+    Gives the piece indices a table is indexed by, in index order.
+
+    Parameters:
+    ----------
+    1. signature : str
+        The table name e.g. "KQvKR".
+
+    Returns:
+    -------
+    List[int] :
+        The white king, the black king, the other white pieces then the other black pieces.
+    """
+    white, black = signature.split("v")
+    return (
+        [KING, 6 + KING]
+        + [PIECE_LETTERS.index(letter) for letter in white[1:]]
+        + [6 + PIECE_LETTERS.index(letter) for letter in black[1:]]
+    )
+
+
+def placement_signature(pieces: List[int]) -> str:
+    """
+    Names the material of a list of pieces.
+
+    Parameters:
+    ----------
+    1. pieces : List[int]
+        The piece indices on the board.
+
+    Returns:
+    -------
+    str :
+        The name with white first, it may not be the name the table is stored under.
+    """
+    return (
+        side_letters([piece for piece in pieces if piece < 6])
+        + "v"
+        + side_letters([piece - 6 for piece in pieces if piece >= 6])
+    )
+
+
+def canonical_signature(signature: str) -> Tuple[str, bool]:
+    """
+    Gives the name a material is stored under, the side with more material being white.
+
+    Parameters:
+    ----------
+    1. signature : str
+        The name of the material with white first.
+
+    Returns:
+    -------
+    Tuple[str, bool] :
+        The stored name and True if the colors have to be swapped to read it.
+    """
+    white, black = signature.split("v")
+
+    def strength(letters: str) -> Tuple[int, List[int]]:
+        return len(letters), [-PIECE_ORDER.index(letter) for letter in letters]
+
+    if strength(black) > strength(white):
+        return f"{black}v{white}", True
+    return signature, False
+
+
+def table_size(piece_count: int, has_pawns: bool) -> int:
+    """
+    Gives the number of bytes of a table after the header.
+
+    Parameters:
+    ----------
+    1. piece_count : int
+        The number of pieces of the table.
+    2. has_pawns : bool
+        Whether the table has pawns.
+
+    Returns:
+    -------
+    int :
+        The size of the table.
+    """
+    return 2 * len(KING_PAIRS[has_pawns][0]) << 6 * (piece_count - 2)
+
+
+def placement_index(side: int, squares: List[int], has_pawns: bool) -> int | None:
+    """
+    Gives the index of a placement in its table.
+
+    The board is turned by every symmetry that brings the kings to one of the king pairs,
+    the smallest index is taken so that all the symmetric placements share it.
+
+    Parameters:
+    ----------
+    1. side : int
+        The side to move.
+    2. squares : List[int]
+        The square index of every piece in the order of signature_pieces.
+    3. has_pawns : bool
+        Whether the table has pawns.
+
+    Returns:
+    -------
+    int | None :
+        The byte offset of the placement after the header, None if the kings stand next
+        to each other.
+    """
+    king_pairs, pair_positions = KING_PAIRS[has_pawns]
+    best_index = None
+    for symmetry in SYMMETRIES[:2] if has_pawns else SYMMETRIES:
+        pair_position = pair_positions[symmetry[squares[0]] << 6 | symmetry[squares[1]]]
+        if pair_position < 0:
+            continue
+        index = side * len(king_pairs) + pair_position
+        for square in squares[2:]:
+            index = index << 6 | symmetry[square]
+        if best_index is None or index < best_index:
+            best_index = index
+    return best_index
+
+
+def value_to_result(value: int) -> Tuple[str, int] | None:
+    """
+    Decodes a table byte.
+
+    Parameters:
+    ----------
+    1. value : int
+        The table byte.
+
+    Returns:
+    -------
+    Tuple[str, int] | None :
+        The ("win", "draw" or "loss" for the side to move, plies to mate), None if the
+        placement is illegal.
+    """
+    if value == ILLEGAL:
+        return None
+    if value == DRAW:
+        return "draw", 0
+    return (WIN if value % 2 == 0 else LOSS), value - 1
+
+
+class Tablebases:
+    """
+    This class probes the tables found in a directory.
+
+    Attributes:
+    ----------
+    1. directory : str
+        The directory holding the .tb files.
+    2. tables : Dict[str, mmap.mmap | None]
+        The opened tables by name, None for the ones that are missing.
+    3. max_pieces : int
+        The most pieces, kings included, any table can have.
+    """
+
+    def __init__(self, directory: str = TABLEBASE_DIRECTORY) -> None:
+        """
+        Initializes a Tablebases object.
+
+        Parameters:
+        ----------
+        1. directory : str
+            The directory holding the .tb files.
+        """
+        self.directory = directory
+        self.tables = {}
+        self.max_pieces = MAX_TABLE_PIECES
+
+    def table(self, signature: str) -> mmap.mmap | None:
+        """
+        Opens a table the first time it is needed.
+
+        Parameters:
+        ----------
+        1. signature : str
+            The stored name of the table.
+
+        Returns:
+        -------
+        mmap.mmap | None :
+            The mapping of the table file or None if there is no such file.
+        """
+        if signature not in self.tables:
+            path = os.path.join(self.directory, f"{signature}.tb")
+            mapping = None
+            if os.path.exists(path):
+                with open(path, "rb") as table_file:
+                    mapping = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, piece_count = TABLE_HEADER_STRUCT.unpack_from(mapping)
+                if (
+                    magic != TABLE_MAGIC
+                    or version != TABLE_VERSION
+                    or piece_count != len(signature_pieces(signature=signature))
+                ):
+                    mapping.close()
+                    raise ValueError(f"{path} is not a table of this version")
+            self.tables[signature] = mapping
+        return self.tables[signature]
+
+    def placement_value(
+        self, pieces: List[int], squares: List[int], side: int
+    ) -> int | None:
+        """
+        Looks a placement up whatever the order of its pieces and the colors of the table.
+
+        Parameters:
+        ----------
+        1. pieces : List[int]
+            The piece indices on the board.
+        2. squares : List[int]
+            The square index of every piece.
+        3. side : int
+            The side to move.
+
+        Returns:
+        -------
+        int | None :
+            The table byte or None if there is no table for the material.
+        """
+        signature = placement_signature(pieces=pieces)
+        if signature in DRAWN_SIGNATURES:
+            return DRAW
+        stored_signature, swap_colors = canonical_signature(signature=signature)
+        mapping = self.table(signature=stored_signature)
+        if mapping is None:
+            return None
+        if swap_colors:
+            # Swapping the colors also mirrors the board so the pawns keep their direction.
+            pieces = [(piece + 6) % 12 for piece in pieces]
+            squares = [square ^ 56 for square in squares]
+            side ^= 1
+        # Pieces of the same kind are interchangeable so any matching one is fine.
+        remaining = list(zip(pieces, squares))
+        ordered_squares = []
+        for piece in signature_pieces(signature=stored_signature):
+            for position, (other_piece, square) in enumerate(remaining):
+                if other_piece == piece:
+                    ordered_squares.append(square)
+                    del remaining[position]
+                    break
+        index = placement_index(
+            side=side, squares=ordered_squares, has_pawns="P" in stored_signature
+        )
+        if index is None:
+            return ILLEGAL
+        return mapping[TABLE_HEADER_STRUCT.size + index]
+
+    def probe(self, main: Main) -> Tuple[str, int] | None:
+        """
+        Looks the position held by main up.
+
+        Parameters:
+        ----------
+        1. main : Main
+            The engine holding the position.
+
+        Returns:
+        -------
+        Tuple[str, int] | None :
+            The ("win", "draw" or "loss" for the side to move, plies to mate), None when
+            the position has too many pieces, castling rights, an en passant square or
+            no table.
+        """
+        position = main.position
+        if (
+            position.occupancy.bit_count() > self.max_pieces
+            or main.castling_rights
+            or main.en_passant_square is not None
+        ):
+            return None
+        squares = list(bitboard_squares(position.occupancy))
+        value = self.placement_value(
+            pieces=[position.mailbox[square] for square in squares],
+            squares=squares,
+            side=main.move_count % 2,
+        )
+        if value is None:
+            return None
+        return value_to_result(value=value)
+
+    def close(self) -> None:
+        """
+        Unmaps every opened table.
+        """
+        for mapping in self.tables.values():
+            if mapping is not None:
+                mapping.close()
+        self.tables = {}
+
+
+def square_attacked(
+    square: int, by_side: int, pieces: List[int], squares: List[int], occupancy: int
+) -> bool:
+    """
+    Checks if any piece of a side attacks the square.
+
+    Parameters:
+    ----------
+    1. square : int
+        The square index to be checked.
+    2. by_side : int
+        The attacking side.
+    3. pieces : List[int]
+        The piece indices on the board.
+    4. squares : List[int]
+        The square index of every piece, None for a captured one.
+    5. occupancy : int
+        The bitboard of all the occupied squares.
+
+    Returns:
+    -------
+    bool :
+        True if the square is attacked.
+    """
+    bit = SQUARE_BB[square]
+    for piece, piece_square in zip(pieces, squares):
+        if piece_square is None or (piece >= 6) != by_side:
+            continue
+        if piece_attacks(piece=piece, square=piece_square, occupancy=occupancy) & bit:
+            return True
+    return False
+
+
+def placement_moves(
+    pieces: List[int], squares: List[int], side: int
+) -> Iterator[Tuple[int, int, int | None, int | None]]:
+    """
+    Yields the legal moves of a placement.
+
+    Parameters:
+    ----------
+    1. pieces : List[int]
+        The piece indices of the table.
+    2. squares : List[int]
+        The square index of every piece.
+    3. side : int
+        The side to move.
+
+    Returns:
+    -------
+    Iterator[Tuple[int, int, int | None, int | None]] :
+        The (moving piece position in the lists, destination, captured piece position or
+        None, promotion piece type or None) of every legal move.
+    """
+    occupancy = own = 0
+    for piece, square in zip(pieces, squares):
+        occupancy |= SQUARE_BB[square]
+        if (piece >= 6) == side:
+            own |= SQUARE_BB[square]
+    king_position = 1 if side else 0
+    for mover, (piece, square) in enumerate(zip(pieces, squares)):
+        if (piece >= 6) != side:
+            continue
+        if piece % 6 == PAWN:
+            step = 8 if side else -8
+            targets = PAWN_ATTACKS[side][square] & occupancy & ~own
+            if not occupancy & SQUARE_BB[square + step]:
+                targets |= SQUARE_BB[square + step]
+                start_row = 1 if side else 6
+                if (
+                    square >> 3 == start_row
+                    and not occupancy & SQUARE_BB[square + 2 * step]
+                ):
+                    targets |= SQUARE_BB[square + 2 * step]
+        else:
+            targets = piece_attacks(piece=piece, square=square, occupancy=occupancy)
+            targets &= ~own
+        for target in bitboard_squares(targets):
+            captured = None
+            if occupancy & SQUARE_BB[target]:
+                captured = squares.index(target)
+            new_squares = list(squares)
+            new_squares[mover] = target
+            if captured is not None:
+                new_squares[captured] = None
+            new_occupancy = (occupancy ^ SQUARE_BB[square]) | SQUARE_BB[target]
+            if square_attacked(
+                square=new_squares[king_position],
+                by_side=side ^ 1,
+                pieces=pieces,
+                squares=new_squares,
+                occupancy=new_occupancy,
+            ):
+                continue
+            if piece % 6 == PAWN and target >> 3 in (0, 7):
+                for promotion in PROMOTION_TYPES:
+                    yield mover, target, captured, promotion
+            else:
+                yield mover, target, captured, None
+
+
+def placement_unmoves(
+    pieces: List[int], squares: List[int], side: int
+) -> Iterator[List[int]]:
+    """
+    Yields the placements the side not to move could have come from without capturing
+    or promoting.
+
+    Parameters:
+    ----------
+    1. pieces : List[int]
+        The piece indices of the table.
+    2. squares : List[int]
+        The square index of every piece.
+    3. side : int
+        The side to move.
+
+    Returns:
+    -------
+    Iterator[List[int]] :
+        The squares of every earlier placement, the other side being to move in it.
+    """
+    occupancy = 0
+    for square in squares:
+        occupancy |= SQUARE_BB[square]
+    mover_side = side ^ 1
+    for mover, (piece, square) in enumerate(zip(pieces, squares)):
+        if (piece >= 6) != mover_side:
+            continue
+        if piece % 6 == PAWN:
+            step = -8 if mover_side else 8
+            sources = 0
+            if 0 <= square + step < 64 and not occupancy & SQUARE_BB[square + step]:
+                if (square + step) >> 3 not in (0, 7):
+                    sources |= SQUARE_BB[square + step]
+                # A pawn on its 4th rank may have come with a double step.
+                if square >> 3 == (3 if mover_side else 4) and not (
+                    occupancy & SQUARE_BB[square + 2 * step]
+                ):
+                    sources |= SQUARE_BB[square + 2 * step]
+        else:
+            sources = piece_attacks(piece=piece, square=square, occupancy=occupancy)
+            sources &= ~occupancy
+        for source in bitboard_squares(sources):
+            new_squares = list(squares)
+            new_squares[mover] = source
+            yield new_squares
+
+
+def placement_decoder(
+    index: int, piece_count: int, has_pawns: bool
+) -> Tuple[int, List[int]]:
+    """
+    Undoes placement_index.
+
+    Parameters:
+    ----------
+    1. index : int
+        The index of the placement.
+    2. piece_count : int
+        The number of pieces of the table.
+    3. has_pawns : bool
+        Whether the table has pawns.
+
+    Returns:
+    -------
+    Tuple[int, List[int]] :
+        The (side to move, square index of every piece), the kings as the king pair has
+        them.
+    """
+    king_pairs = KING_PAIRS[has_pawns][0]
+    squares = [0] * piece_count
+    for position in range(piece_count - 1, 1, -1):
+        squares[position] = index & 63
+        index >>= 6
+    side, pair_position = divmod(index, len(king_pairs))
+    squares[0], squares[1] = king_pairs[pair_position]
+    return side, squares
+
+
+def table_dependencies(signature: str) -> Set[str]:
+    """
+    Gives the tables captures and promotions of a table lead into.
+
+    Parameters:
+    ----------
+    1. signature : str
+        The stored name of the table.
+
+    Returns:
+    -------
+    Set[str] :
+        The stored names of the tables needed to generate it, drawn material left out.
+    """
+    pieces = signature_pieces(signature=signature)
+    reached = set()
+    for position, piece in enumerate(pieces):
+        if piece % 6 == KING:
+            continue
+        reached.add(
+            placement_signature(pieces=pieces[:position] + pieces[position + 1 :])
+        )
+        if piece % 6 == PAWN:
+            for promotion in PROMOTION_TYPES:
+                promoted = list(pieces)
+                promoted[position] = piece - PAWN + promotion
+                reached.add(placement_signature(pieces=promoted))
+                # A promotion can also capture.
+                for other_position, other_piece in enumerate(promoted):
+                    if other_piece % 6 != KING and (other_piece >= 6) != (piece >= 6):
+                        reached.add(
+                            placement_signature(
+                                pieces=promoted[:other_position]
+                                + promoted[other_position + 1 :]
+                            )
+                        )
+    return {
+        canonical_signature(signature=reached_signature)[0]
+        for reached_signature in reached
+        if reached_signature not in DRAWN_SIGNATURES
+    }
+
+
+def table_generator(signature: str, directory: str = TABLEBASE_DIRECTORY) -> str:
+    """
+    Solves a table by retrograde analysis and writes it to the directory.
+
+    The tables its captures and promotions lead into have to be in the directory already.
+
+    Parameters:
+    ----------
+    1. signature : str
+        The stored name of the table.
+    2. directory : str
+        The directory to write the .tb file to.
+
+    Returns:
+    -------
+    str :
+        The name of the generated table.
+    """
+    pieces = signature_pieces(signature=signature)
+    piece_count = len(pieces)
+    has_pawns = "P" in signature
+    size = table_size(piece_count=piece_count, has_pawns=has_pawns)
+    values = bytearray(size)
+    flags = bytearray(size)
+    # The longest mate an opponent wins by after a capture or a promotion.
+    external_loss = bytearray(size)
+    levels: Dict[int, List[Tuple[int, str]]] = {}
+    sub_tables = Tablebases(directory=directory)
+
+    def external_value(
+        squares: List[int],
+        side: int,
+        mover: int,
+        captured: int | None,
+        promotion: int | None,
+    ) -> int:
+        # The value after a capture or a promotion, for the side to move after it.
+        new_pieces, new_squares = [], []
+        for position, (piece, square) in enumerate(zip(pieces, squares)):
+            if position == captured:
+                continue
+            if position == mover and promotion is not None:
+                piece = piece - PAWN + promotion
+            new_pieces.append(piece)
+            new_squares.append(square)
+        value = sub_tables.placement_value(
+            pieces=new_pieces, squares=new_squares, side=side ^ 1
+        )
+        if value is None:
+            raise FileNotFoundError(
+                f"{placement_signature(pieces=new_pieces)} is needed to make {signature}"
+            )
+        return value
+
+    def quiet_moves_lost(index: int) -> bool:
+        # Whether every move neither capturing nor promoting goes into a position already
+        # solved as won for the opponent. The moves are looked at again rather than counted
+        # down, as a placement and its symmetric ones share an index.
+        side, squares = placement_decoder(
+            index=index, piece_count=piece_count, has_pawns=has_pawns
+        )
+        for mover, target, captured, promotion in placement_moves(
+            pieces=pieces, squares=squares, side=side
+        ):
+            if captured is not None or promotion is not None:
+                continue
+            new_squares = list(squares)
+            new_squares[mover] = target
+            value = values[
+                placement_index(side=side ^ 1, squares=new_squares, has_pawns=has_pawns)
+            ]
+            if value == DRAW or value % 2:
+                return False
+        return True
+
+    for index in range(size):
+        side, squares = placement_decoder(
+            index=index, piece_count=piece_count, has_pawns=has_pawns
+        )
+        occupancy = 0
+        for square in squares:
+            occupancy |= SQUARE_BB[square]
+        if (
+            occupancy.bit_count() != piece_count
+            or any(
+                piece % 6 == PAWN and square >> 3 in (0, 7)
+                for piece, square in zip(pieces, squares)
+            )
+            # The side not to move can't be in check.
+            or square_attacked(
+                square=squares[0 if side else 1],
+                by_side=side,
+                pieces=pieces,
+                squares=squares,
+                occupancy=occupancy,
+            )
+            # The placement is kept under the index of a symmetric one.
+            or placement_index(side=side, squares=squares, has_pawns=has_pawns) != index
+        ):
+            values[index] = ILLEGAL
+            continue
+        quiet_moves = has_moves = 0
+        best_win = None
+        for mover, target, captured, promotion in placement_moves(
+            pieces=pieces, squares=squares, side=side
+        ):
+            has_moves = 1
+            if captured is None and promotion is None:
+                quiet_moves += 1
+                continue
+            new_squares = list(squares)
+            new_squares[mover] = target
+            result = value_to_result(
+                value=external_value(
+                    squares=new_squares,
+                    side=side,
+                    mover=mover,
+                    captured=captured,
+                    promotion=promotion,
+                )
+            )
+            if result[0] == "draw":
+                flags[index] |= HAS_DRAW
+            elif result[0] == LOSS:
+                if best_win is None or result[1] + 1 < best_win:
+                    best_win = result[1] + 1
+            else:
+                external_loss[index] = max(external_loss[index], result[1] + 1)
+        if not has_moves:
+            in_check = square_attacked(
+                square=squares[1 if side else 0],
+                by_side=side ^ 1,
+                pieces=pieces,
+                squares=squares,
+                occupancy=occupancy,
+            )
+            if in_check:
+                levels.setdefault(0, []).append((index, LOSS))
+            continue
+        if best_win is not None:
+            flags[index] |= HAS_WIN
+            levels.setdefault(best_win, []).append((index, WIN))
+        elif not quiet_moves and not flags[index] & HAS_DRAW:
+            levels.setdefault(external_loss[index], []).append((index, LOSS))
+
+    level = 0
+    while levels:
+        for index, outcome in levels.pop(level, []):
+            if values[index]:
+                continue
+            values[index] = level + 1
+            side, squares = placement_decoder(
+                index=index, piece_count=piece_count, has_pawns=has_pawns
+            )
+            for earlier_squares in placement_unmoves(
+                pieces=pieces, squares=squares, side=side
+            ):
+                earlier = placement_index(
+                    side=side ^ 1, squares=earlier_squares, has_pawns=has_pawns
+                )
+                if earlier is None or values[earlier]:
+                    continue
+                if outcome == LOSS:
+                    levels.setdefault(level + 1, []).append((earlier, WIN))
+                    continue
+                if not flags[earlier] and quiet_moves_lost(index=earlier):
+                    levels.setdefault(
+                        max(level + 1, external_loss[earlier]), []
+                    ).append((earlier, LOSS))
+        level += 1
+    sub_tables.close()
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{signature}.tb")
+    with open(path + ".tmp", "wb") as table_file:
+        table_file.write(
+            TABLE_HEADER_STRUCT.pack(TABLE_MAGIC, TABLE_VERSION, piece_count)
+        )
+        table_file.write(values)
+    os.replace(path + ".tmp", path)
+    return signature
+
+
+def all_signatures(piece_count: int) -> List[str]:
+    """
+    Lists the stored names of every table with the given number of pieces.
+
+    Parameters:
+    ----------
+    1. piece_count : int
+        The number of pieces, kings included, 3 or 4.
+
+    Returns:
+    -------
+    List[str] :
+        The names, drawn material left out.
+    """
+    signatures = set()
+    for extra_pieces in combinations_with_replacement(PIECE_ORDER[1:], piece_count - 2):
+        for white_count in range(len(extra_pieces) + 1):
+            for white in combinations_with_replacement(extra_pieces, white_count):
+                black = list(extra_pieces)
+                for letter in white:
+                    black.remove(letter)
+                signature = (
+                    "K"
+                    + "".join(sorted(white, key=PIECE_ORDER.index))
+                    + "vK"
+                    + "".join(sorted(black, key=PIECE_ORDER.index))
+                )
+                if signature not in DRAWN_SIGNATURES:
+                    signatures.add(canonical_signature(signature=signature)[0])
+    return sorted(signatures)
+
+
+def tablebases_generator(
+    signatures: List[str], directory: str = TABLEBASE_DIRECTORY, workers: int = 1
+) -> List[str]:
+    """
+    Generates tables and the smaller ones they need, several at once.
+
+    Parameters:
+    ----------
+    1. signatures : List[str]
+        The names of the tables wanted.
+    2. directory : str
+        The directory to write the .tb files to, tables already there are kept.
+    3. workers : int
+        The number of tables generated at the same time, each in its own process.
+
+    Returns:
+    -------
+    List[str] :
+        The names of the generated tables in the order they were finished.
+    """
+    needed, to_visit = {}, [
+        canonical_signature(signature=name)[0] for name in signatures
+    ]
+    while to_visit:
+        signature = to_visit.pop()
+        if signature in needed:
+            continue
+        needed[signature] = table_dependencies(signature=signature)
+        to_visit.extend(needed[signature])
+    done = {
+        signature
+        for signature in needed
+        if os.path.exists(os.path.join(directory, f"{signature}.tb"))
+    }
+    finished = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while len(done) < len(needed):
+            for signature, dependencies in needed.items():
+                if (
+                    signature not in done
+                    and signature not in running.values()
+                    and dependencies <= done
+                ):
+                    running[executor.submit(table_generator, signature, directory)] = (
+                        signature
+                    )
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                done.add(future.result())
+                finished.append(running.pop(future))
+                print(f"{finished[-1]} generated")
+    return finished
+
+
+def main_runner() -> int:
+    """
+    The command line entry point.
+
+    Returns:
+    -------
+    int :
+        The exit code.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate or probe endgame tablebases."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate_parser = subparsers.add_parser("generate", help="generate tables")
+    generate_parser.add_argument(
+        "signatures", nargs="*", help='the tables to generate e.g. "KQvK"'
+    )
+    generate_parser.add_argument(
+        "--pieces",
+        type=int,
+        choices=[3, 4],
+        help="generate every table with up to this many pieces",
+    )
+    generate_parser.add_argument(
+        "--workers", type=int, help="the number of processes, one per core by default"
+    )
+    probe_parser = subparsers.add_parser("probe", help="probe a position")
+    probe_parser.add_argument("--fen", required=True, help="the position")
+    for subparser in [generate_parser, probe_parser]:
+        subparser.add_argument(
+            "--directory",
+            default=TABLEBASE_DIRECTORY,
+            help="the directory of the tables",
+        )
+    arguments = parser.parse_args()
+
+    if arguments.command == "generate":
+        signatures = list(arguments.signatures)
+        for piece_count in range(3, (arguments.pieces or 0) + 1):
+            signatures += all_signatures(piece_count=piece_count)
+        tablebases_generator(
+            signatures=signatures,
+            directory=arguments.directory,
+            workers=arguments.workers or os.cpu_count() or 1,
+        )
+        return 0
+
+    main = Main()
+    main.load_fen(fen=arguments.fen)
+    tablebases = Tablebases(directory=arguments.directory)
+    result = tablebases.probe(main=main)
+    tablebases.close()
+    if result is None:
+        print("not in the tablebases")
+        return 1
+    print(f"{result[0]} in {result[1]} plies" if result[0] != "draw" else "draw")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_runner())
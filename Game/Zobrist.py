@@ -0,0 +1,76 @@
+"""
+This module holds the Zobrist keys used to identify a position with a single
+64-bit number.
+
+The key of a position is the XOR of one random number per (piece, square), one
+for the side to move being black, one per set of castling rights and one per
+file of the en passant square. Because XOR undoes itself the engine keeps the
+key up to date by XOR-ing in and out only what a move changes.
+
+The random numbers come from a fixed seed so keys are the same in every run and
+every process, which lets them be stored on disk.
+
+Author: Anand Maurya
+Github: Syntax-Programmer
+Email: anand6308anand@gmail.com
+"""
+
+__author__ = "Anand Maurya/ Syntax-Programmer"
+__email__ = "anand6308anand@gmail.com"
+
+
+from random import Random
+from typing import List
+
+
+ZOBRIST_SEED = 20240601
+
+random_generator = Random(ZOBRIST_SEED)
+# PIECE_KEYS[piece index][square index].
+PIECE_KEYS = [[random_generator.getrandbits(64) for _ in range(64)] for _ in range(12)]
+SIDE_KEY = random_generator.getrandbits(64)
+# One key per castling right, CASTLING_KEYS[rights] is the XOR of the keys of the set rights.
+castling_right_keys = [random_generator.getrandbits(64) for _ in range(4)]
+CASTLING_KEYS = [0] * 16
+for rights in range(16):
+    for bit in range(4):
+        if rights & (1 << bit):
+            CASTLING_KEYS[rights] ^= castling_right_keys[bit]
+EN_PASSANT_KEYS = [random_generator.getrandbits(64) for _ in range(8)]
+
+
+def zobrist_key_maker(
+    mailbox: List[int],
+    move_count: int,
+    castling_rights: int,
+    en_passant_square: int | None,
+) -> int:
+    """
+    Computes the Zobrist key of a position from scratch.
+
+    Parameters:
+    ----------
+    1. mailbox : List[int]
+        The piece index standing on each of the 64 squares or a negative number if empty.
+    2. move_count : int
+        The move number going on.
+    3. castling_rights : int
+        The castling rights bitmask.
+    4. en_passant_square : int | None
+        The square index a pawn can be captured en passant on, if any.
+
+    Returns:
+    -------
+    int :
+        The Zobrist key of the position.
+    """
+    key = 0
+    for square, piece in enumerate(mailbox):
+        if piece >= 0:
+            key ^= PIECE_KEYS[piece][square]
+    if move_count % 2:
+        key ^= SIDE_KEY
+    key ^= CASTLING_KEYS[castling_rights]
+    if en_passant_square is not None:
+        key ^= EN_PASSANT_KEYS[en_passant_square % 8]
+    return key